@@ -0,0 +1,42 @@
+"""Add precomputed file_size_display to documents
+
+Revision ID: a6d41f7c93e2
+Revises: f3a9d2c64e18
+Create Date: 2025-06-24 10:12:37.418906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.utils.formatting import format_file_size
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d41f7c93e2'
+down_revision = 'f3a9d2c64e18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('file_size_display', sa.String(length=20), nullable=True))
+
+    # Backfill with the same formatter the upload path uses, one UPDATE per distinct size
+    bind = op.get_bind()
+    documents = sa.table(
+        'documents',
+        sa.column('file_size', sa.BigInteger),
+        sa.column('file_size_display', sa.String)
+    )
+    sizes = bind.execute(sa.select(documents.c.file_size).distinct()).scalars().all()
+    if sizes:
+        bind.execute(
+            documents.update()
+            .where(documents.c.file_size == sa.bindparam('size'))
+            .values(file_size_display=sa.bindparam('display')),
+            [{'size': size, 'display': format_file_size(size)} for size in sizes]
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'file_size_display')
@@ -0,0 +1,62 @@
+"""Consolidate the owner indexes on documents
+
+Revision ID: a7e4c2d91f56
+Revises: d5a19c7e3b40
+Create Date: 2025-06-26 15:22:41.308174
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e4c2d91f56'
+down_revision = 'd5a19c7e3b40'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status != 'DELETED'")
+
+
+def upgrade() -> None:
+    # The partial index gains the id tiebreaker and takes over the keyset list
+    op.drop_index('ix_documents_owner_active', table_name='documents')
+    op.create_index(
+        'ix_documents_owner_active',
+        'documents',
+        ['owner_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=ACTIVE,
+        sqlite_where=ACTIVE
+    )
+    # Covered by ix_documents_owner_active and ix_documents_owner_status_type
+    op.drop_index('ix_documents_owner_status_created_id', table_name='documents')
+    # The duplicate probe uses ix_documents_owner_active_size
+    op.drop_index('ix_documents_owner_size_head', table_name='documents')
+    # Leading column of ix_documents_owner_status_type
+    op.drop_index(op.f('ix_documents_owner_id'), table_name='documents')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_documents_owner_id'), 'documents', ['owner_id'], unique=False)
+    op.create_index(
+        'ix_documents_owner_size_head',
+        'documents',
+        ['owner_id', 'file_size', 'head_sha256'],
+        unique=False
+    )
+    op.create_index(
+        'ix_documents_owner_status_created_id',
+        'documents',
+        ['owner_id', 'status', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.drop_index('ix_documents_owner_active', table_name='documents')
+    op.create_index(
+        'ix_documents_owner_active',
+        'documents',
+        ['owner_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=ACTIVE,
+        sqlite_where=ACTIVE
+    )
@@ -0,0 +1,37 @@
+"""Add head_sha256 and a size + head dedup index on documents
+
+Revision ID: b3e7c05f9a12
+Revises: c8f2b61e4d97
+Create Date: 2025-06-25 09:27:44.610382
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e7c05f9a12'
+down_revision = 'c8f2b61e4d97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The full hash is now only computed when a size + head match makes it necessary
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('head_sha256', sa.String(length=64), nullable=True))
+        batch_op.alter_column('file_hash', existing_type=sa.String(length=64), nullable=True)
+    op.create_index(
+        'ix_documents_owner_size_head',
+        'documents',
+        ['owner_id', 'file_size', 'head_sha256'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_owner_size_head', table_name='documents')
+    # Fails if any document was uploaded without a full hash
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.alter_column('file_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.drop_column('head_sha256')
@@ -0,0 +1,28 @@
+"""Add denormalized document_count to users
+
+Revision ID: b81f0c4e6d29
+Revises: 728be9a2c3a6
+Create Date: 2025-06-20 14:38:51.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f0c4e6d29'
+down_revision = '728be9a2c3a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('document_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE users SET document_count = "
+        "(SELECT COUNT(*) FROM documents WHERE documents.owner_id = users.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'document_count')
@@ -0,0 +1,44 @@
+"""Add partial sort indexes and a covering stats index on documents
+
+Revision ID: c8f2b61e4d97
+Revises: a6d41f7c93e2
+Create Date: 2025-06-24 15:41:08.226731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f2b61e4d97'
+down_revision = 'a6d41f7c93e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for name, column in (
+        ('ix_documents_owner_active_title', 'title'),
+        ('ix_documents_owner_active_size', 'file_size'),
+    ):
+        op.create_index(
+            name,
+            'documents',
+            ['owner_id', column, 'id'],
+            unique=False,
+            postgresql_where=sa.text("status != 'DELETED'"),
+            sqlite_where=sa.text("status != 'DELETED'")
+        )
+    op.create_index(
+        'ix_documents_owner_status_type',
+        'documents',
+        ['owner_id', 'status', 'document_type'],
+        unique=False,
+        postgresql_include=['file_size']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_owner_status_type', table_name='documents')
+    op.drop_index('ix_documents_owner_active_size', table_name='documents')
+    op.drop_index('ix_documents_owner_active_title', table_name='documents')
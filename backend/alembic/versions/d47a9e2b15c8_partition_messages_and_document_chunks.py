@@ -0,0 +1,71 @@
+"""Partition messages and document_chunks by hash of their parent id
+
+Revision ID: d47a9e2b15c8
+Revises: b81f0c4e6d29
+Create Date: 2025-06-21 09:54:17.230461
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd47a9e2b15c8'
+down_revision = 'b81f0c4e6d29'
+branch_labels = None
+depends_on = None
+
+PARTITION_COUNT = 16
+
+# table -> (partition key, referenced parent table, secondary indexed columns)
+PARTITIONED_TABLES = {
+    'messages': ('conversation_id', 'conversations', []),
+    'document_chunks': ('document_id', 'documents', ['vector_id']),
+}
+
+
+def _rebuild_table(table: str, key: str, parent: str, indexed: list, partitioned: bool) -> None:
+    old = f"{table}_old"
+    seq = f"{table}_id_seq"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    # Keep the id sequence alive when the old table is dropped
+    op.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+
+    if partitioned:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY HASH ({key})")
+        # A partitioned table's primary key must contain the partition key
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})")
+        for remainder in range(PARTITION_COUNT):
+            op.execute(
+                f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {remainder})"
+            )
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+
+    op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY ({key}) REFERENCES {parent} (id)")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.execute(f"DROP TABLE {old}")
+    op.execute(f"ALTER SEQUENCE {seq} OWNED BY {table}.id")
+
+    for column in ['id', key, *indexed]:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+
+def upgrade() -> None:
+    # Declarative partitioning is PostgreSQL-only; SQLite dev databases keep plain tables
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, (key, parent, indexed) in PARTITIONED_TABLES.items():
+        _rebuild_table(table, key, parent, indexed, partitioned=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, (key, parent, indexed) in PARTITIONED_TABLES.items():
+        _rebuild_table(table, key, parent, indexed, partitioned=False)
@@ -0,0 +1,32 @@
+"""Recount users.document_count over non-deleted documents only
+
+Revision ID: d5a19c7e3b40
+Revises: b3e7c05f9a12
+Create Date: 2025-06-26 11:03:18.552907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a19c7e3b40'
+down_revision = 'b3e7c05f9a12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The counter backs unfiltered list totals, which exclude soft-deleted documents
+    op.execute(
+        "UPDATE users SET document_count = "
+        "(SELECT COUNT(*) FROM documents WHERE documents.owner_id = users.id "
+        "AND documents.status != 'DELETED')"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE users SET document_count = "
+        "(SELECT COUNT(*) FROM documents WHERE documents.owner_id = users.id)"
+    )
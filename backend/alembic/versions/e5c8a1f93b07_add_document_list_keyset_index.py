@@ -0,0 +1,29 @@
+"""Add composite index for keyset-paginated document lists
+
+Revision ID: e5c8a1f93b07
+Revises: d47a9e2b15c8
+Create Date: 2025-06-23 10:12:40.318846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c8a1f93b07'
+down_revision = 'd47a9e2b15c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_documents_owner_status_created_id',
+        'documents',
+        ['owner_id', 'status', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_owner_status_created_id', table_name='documents')
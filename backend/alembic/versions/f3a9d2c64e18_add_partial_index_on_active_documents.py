@@ -0,0 +1,31 @@
+"""Add partial index on non-deleted documents per owner
+
+Revision ID: f3a9d2c64e18
+Revises: e5c8a1f93b07
+Create Date: 2025-06-23 16:05:12.604219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9d2c64e18'
+down_revision = 'e5c8a1f93b07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_documents_owner_active',
+        'documents',
+        ['owner_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text("status != 'DELETED'"),
+        sqlite_where=sa.text("status != 'DELETED'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_owner_active', table_name='documents')
@@ -16,9 +16,12 @@ class Settings(BaseSettings):
     # Database settings
     database_url: str = Field(default="sqlite:///Users/hzmhezhiming/projects/opensource-projects/hezm-smartchat/backend/smartchat_debug.db", description="Database URL")
     database_echo: bool = Field(default=False, description="Echo SQL queries")
+    database_pool_size: int = Field(default=20, description="Persistent connections kept in the SQLAlchemy pool (non-SQLite)")
+    database_query_cache_size: int = Field(default=1200, description="Number of compiled SQL statements SQLAlchemy keeps cached per engine")
     
     # Redis settings
     redis_url: str = Field(default="redis://localhost:6379", description="Redis URL")
+    query_cache_max_history_chars: int = Field(default=8192, description="Skip the query result cache when conversation history exceeds this many characters")
     
     # Qdrant settings
     qdrant_url: str = Field(default="http://localhost:6333", description="Qdrant URL")
@@ -38,6 +41,8 @@ class Settings(BaseSettings):
     # File upload settings
     max_file_size: int = Field(default=100 * 1024 * 1024, description="Maximum file size in bytes (100MB)")
     upload_chunk_size: int = Field(default=5 * 1024 * 1024, description="Upload chunk size in bytes (5MB)")
+    max_concurrent_uploads: int = Field(default=8, description="Uploads copied to disk at once per worker; others wait for a slot")
+    upload_slot_timeout: float = Field(default=10.0, description="Seconds an upload waits for a slot before getting a 503")
     allowed_file_types: list = Field(default=["pdf", "epub", "txt", "docx"], description="Allowed file types")
     
     # Storage settings
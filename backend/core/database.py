@@ -1,7 +1,14 @@
+import threading
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Iterable, List, Optional, TypeVar
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
 from backend.core.config import get_settings
 
 settings = get_settings()
@@ -14,29 +21,116 @@ if settings.database_url.startswith("sqlite"):
         poolclass=StaticPool,
         pool_pre_ping=True,
         echo=settings.debug,
+        query_cache_size=settings.database_query_cache_size,
     )
 else:
     engine = create_engine(
         settings.database_url,
         pool_pre_ping=True,
         pool_recycle=300,
+        pool_size=settings.database_pool_size,
         echo=settings.debug,
+        query_cache_size=settings.database_query_cache_size,
     )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessions for read-only endpoints: statements run in autocommit mode, so no
+# transaction is opened and closing the session needs no ROLLBACK round-trip
+ReadOnlySessionLocal = sessionmaker(
+    autoflush=False,
+    bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+)
+
+# Request-bound session registry. The scope key lives in a context variable so
+# it follows the request into child tasks and threadpool workers.
+_session_scope: ContextVar[Optional[str]] = ContextVar("db_session_scope", default=None)
+
+
+def _current_session_scope():
+    scope = _session_scope.get()
+    return scope if scope is not None else threading.get_ident()
+
+
+ScopedSession = scoped_session(SessionLocal, scopefunc=_current_session_scope)
+
 # Create Base class for models
 Base = declarative_base()
 
-# Dependency to get database session
-def get_db():
+
+@asynccontextmanager
+async def request_session_scope():
+    """Bind one session to the enclosed request and release it on exit."""
+    token = _session_scope.set(uuid.uuid4().hex)
+    try:
+        yield
+    finally:
+        # Closing returns the connection to the pool, whose reset-on-return
+        # ROLLBACK is a network round-trip, so it runs off the event loop
+        if ScopedSession.registry.has():
+            session = ScopedSession.registry()
+            ScopedSession.registry.clear()
+            await run_in_threadpool(session.close)
+        _session_scope.reset(token)
+
+
+@contextmanager
+def db_session():
+    """Context-managed session for code running outside the request cycle."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+
+# Largest IN list per dialect: below the bind-parameter limits (999 on Oracle
+# and older SQLite builds, 2100 on SQL Server) with headroom for the rest of the
+# statement. Dialects not listed accept any size.
+_MAX_IN_LIST_SIZE = {"oracle": 900, "mssql": 2000, "sqlite": 900}
+
+T = TypeVar("T")
+
+
+def in_list_chunks(session, values: Iterable[T]) -> List[List[T]]:
+    """Split values for an IN (...) predicate into chunks the session's dialect accepts (none if empty)."""
+    values = list(values)
+    if not values:
+        return []
+    size = _MAX_IN_LIST_SIZE.get(session.get_bind().dialect.name)
+    if size is None or len(values) <= size:
+        return [values]
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+# Dependency to get database session. The session dependencies are async
+# generators: creating a session does no I/O (it connects on first use), so
+# FastAPI runs them on the event loop instead of a threadpool round-trip per
+# request. Closing does I/O (the pool's reset-on-return ROLLBACK), so the
+# teardown is handed to the threadpool. Code outside the request cycle should
+# use db_session() instead.
+async def get_db():
+    if _session_scope.get() is not None:
+        # Shared per-request session; DBSessionMiddleware releases it
+        yield ScopedSession()
+        return
+
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def get_db_ro():
+    """Dependency for read-only endpoints; never use it for writes (nothing is committed)."""
+    db = ReadOnlySessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
 # Create all tables
 def create_tables():
     # Import models to register them with Base metadata
@@ -4,6 +4,8 @@ from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from backend.core.database import request_session_scope
 from backend.core.logging import log_api_request, log_error
 
 
@@ -116,4 +118,23 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
             if request_id:
                 response.headers["X-Request-ID"] = request_id
                 
-            return response 
\ No newline at end of file
+            return response
+
+
+class DBSessionMiddleware:
+    """Pure ASGI middleware binding a single database session to each request.
+
+    The session is created lazily on first use and removed once the response
+    has been sent, so handlers share one pooled connection per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        async with request_session_scope():
+            await self.app(scope, receive, send)
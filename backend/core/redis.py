@@ -5,12 +5,12 @@ This module provides Redis client initialization, connection management,
 health checks, and FastAPI dependency injection.
 """
 
-import json
 import asyncio
-from typing import Optional, Any, Dict, Union, List
+from typing import Optional, Any, AsyncIterator, Dict, Union, List, Tuple
 from functools import lru_cache
 from contextlib import asynccontextmanager
 
+import orjson
 import redis.asyncio as redis
 from redis.asyncio import Redis
 from redis.exceptions import ConnectionError, TimeoutError, RedisError
@@ -22,6 +22,11 @@ from backend.core.logging import get_app_logger
 logger = get_app_logger()
 
 
+def _dumps_json(value: Any) -> bytes:
+    """Encode a cache value; non-JSON types fall back to str() as before."""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
 class CacheConfig(BaseModel):
     """Cache configuration with TTL settings for different data types."""
     
@@ -146,6 +151,34 @@ class RedisClient:
             logger.error(f"Redis SET error for key '{key}': {str(e)}")
             return False
     
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[str], int]:
+        """Get a value and its remaining TTL in one round-trip (TTL -2 when the key is missing)."""
+        if not self._client or not self._is_connected:
+            logger.warning("Redis not connected, skipping cache get")
+            return None, -2
+            
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.ttl(key)
+                value, ttl = await pipe.execute()
+            return value, ttl
+        except Exception as e:
+            logger.error(f"Redis GET/TTL error for key '{key}': {str(e)}")
+            return None, -2
+    
+    async def set_nx(self, key: str, value: str, ttl: int) -> bool:
+        """Set key only if it does not exist (SET NX EX); True when this caller created it."""
+        if not self._client or not self._is_connected:
+            logger.warning("Redis not connected, skipping cache set")
+            return False
+            
+        try:
+            return bool(await self._client.set(key, value, nx=True, ex=ttl))
+        except Exception as e:
+            logger.error(f"Redis SET NX error for key '{key}': {str(e)}")
+            return False
+    
     async def get_json(self, key: str) -> Optional[Dict[str, Any]]:
         """Get JSON value from Redis."""
         value = await self.get(key)
@@ -153,8 +186,8 @@ class RedisClient:
             return None
             
         try:
-            return json.loads(value)
-        except json.JSONDecodeError as e:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError as e:
             logger.error(f"JSON decode error for key '{key}': {str(e)}")
             return None
     
@@ -166,7 +199,7 @@ class RedisClient:
     ) -> bool:
         """Set JSON value in Redis."""
         try:
-            json_value = json.dumps(value, default=str)
+            json_value = _dumps_json(value)
             return await self.set(key, json_value, ttl)
         except (TypeError, ValueError) as e:
             logger.error(f"JSON encode error for key '{key}': {str(e)}")
@@ -186,18 +219,107 @@ class RedisClient:
             return False
     
     async def delete_pattern(self, pattern: str) -> int:
-        """Delete keys matching pattern."""
+        """
+        Delete keys matching pattern with UNLINK.
+        
+        Keys are found with incremental SCAN and UNLINKed in pipelined batches,
+        so the server is never blocked for a full keyspace walk (on a
+        standalone server even a {hashtag}-scoped pattern has to scan every key).
+        """
+        return await self.delete_patterns([pattern])
+    
+    async def delete_many(self, keys: List[str]) -> int:
+        """UNLINK several keys with a single command; returns how many existed."""
+        if not keys:
+            return 0
+        if not self._client or not self._is_connected:
+            logger.warning("Redis not connected, skipping cache delete")
+            return 0
+            
+        try:
+            return await self._client.unlink(*keys)
+        except Exception as e:
+            logger.error(f"Redis UNLINK error for {len(keys)} keys: {str(e)}")
+            return 0
+    
+    async def delete_patterns(self, patterns: List[str]) -> int:
+        """
+        Delete keys matching any of several patterns.
+        
+        Each pattern is SCANned incrementally; matches from all patterns share
+        the pipelined UNLINK batches.
+        """
+        if not patterns:
+            return 0
         if not self._client or not self._is_connected:
             logger.warning("Redis not connected, skipping pattern delete")
             return 0
+        
+        deleted = 0
+        batch: List[str] = []
+        for pattern in patterns:
+            try:
+                async for key in self._client.scan_iter(match=pattern, count=1000):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        deleted += await self._unlink_batch(batch)
+                        batch = []
+            except Exception as e:
+                logger.error(f"Redis pattern delete error for pattern '{pattern}': {str(e)}")
+        if batch:
+            try:
+                deleted += await self._unlink_batch(batch)
+            except Exception as e:
+                logger.error(f"Redis UNLINK error for {len(batch)} keys: {str(e)}")
+        return deleted
+    
+    async def _unlink_batch(self, keys: List[str]) -> int:
+        """UNLINK a batch of keys in one pipelined round-trip (memory is freed off-thread)."""
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.unlink(key)
+            results = await pipe.execute()
+        return sum(results)
+    
+    async def publish(self, channel: str, message: str) -> int:
+        """Publish a message on a pub/sub channel; returns the number of receivers."""
+        if not self._client or not self._is_connected:
+            return 0
+            
+        try:
+            return await self._client.publish(channel, message)
+        except Exception as e:
+            logger.error(f"Redis PUBLISH error for channel '{channel}': {str(e)}")
+            return 0
+    
+    async def listen(self, channel: str) -> AsyncIterator[str]:
+        """
+        Yield messages published on `channel` until cancelled.
+        
+        The subscription holds its own connection; errors propagate so the
+        caller can decide how to resubscribe. Yields nothing when Redis is not
+        connected.
+        """
+        if not self._client or not self._is_connected:
+            return
             
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
         try:
-            keys = await self._client.keys(pattern)
-            if keys:
-                return await self._client.delete(*keys)
+            async for message in pubsub.listen():
+                yield message["data"]
+        finally:
+            await pubsub.aclose()
+    
+    async def dbsize(self) -> int:
+        """Total number of keys in the current database (O(1))."""
+        if not self._client or not self._is_connected:
             return 0
+            
+        try:
+            return await self._client.dbsize()
         except Exception as e:
-            logger.error(f"Redis pattern delete error for pattern '{pattern}': {str(e)}")
+            logger.error(f"Redis DBSIZE error: {str(e)}")
             return 0
     
     async def exists(self, key: str) -> bool:
@@ -228,12 +350,56 @@ class RedisClient:
             return 0
             
         try:
-            keys = await self._client.keys(pattern)
-            return len(keys)
+            count = 0
+            async for _ in self._client.scan_iter(match=pattern, count=1000):
+                count += 1
+            return count
         except Exception as e:
             logger.error(f"Redis count keys error for pattern '{pattern}': {str(e)}")
             return 0
     
+    async def scan_keys(
+        self,
+        pattern: str = "*",
+        limit: Optional[int] = None,
+        count: int = 1000,
+        key_type: Optional[str] = None
+    ) -> List[str]:
+        """
+        Collect keys matching pattern with cursor-based SCAN.
+        
+        Unlike KEYS this never blocks the server for the whole keyspace; iteration
+        stops as soon as `limit` keys have been collected. `key_type` pushes a
+        TYPE filter down to the server.
+        """
+        if not self._client or not self._is_connected:
+            return []
+            
+        keys: List[str] = []
+        try:
+            async for key in self._client.scan_iter(match=pattern, count=count, _type=key_type):
+                keys.append(key)
+                if limit is not None and len(keys) >= limit:
+                    break
+        except Exception as e:
+            logger.error(f"Redis SCAN error for pattern '{pattern}': {str(e)}")
+        return keys
+    
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False):
+        """
+        Non-transactional pipeline for batching round-trips.
+        
+        Commands queued on the yielded pipeline are sent in one flush by
+        `await pipe.execute()`. Yields None when Redis is not connected.
+        """
+        if not self._client or not self._is_connected:
+            yield None
+            return
+            
+        async with self._client.pipeline(transaction=transaction) as pipe:
+            yield pipe
+    
     async def get_memory_usage(self, key: str) -> int:
         """Get memory usage for a specific key."""
         if not self._client or not self._is_connected:
@@ -342,7 +508,7 @@ class RedisClient:
             }
             
             for pattern in patterns:
-                keys = await self._client.keys(pattern)
+                keys = await self.scan_keys(pattern)
                 pattern_stats = {
                     "key_count": len(keys),
                     "total_memory": 0,
@@ -452,6 +618,27 @@ def get_redis_client() -> Optional[RedisClient]: # Change return type to Optiona
 
 
 # Cache key generators
+def user_hashtag(user_id: int) -> str:
+    """
+    Redis hashtag scoping keys to a user.
+    
+    Keys sharing a hashtag land in the same cluster slot, and a SCAN whose
+    MATCH pattern starts with a literal prefix plus the hashtag is restricted
+    to that slot instead of walking the whole keyspace.
+    """
+    return f"{{u:{user_id}}}"
+
+
+def document_hashtag(document_id: int) -> str:
+    """Redis hashtag scoping keys to a document (see user_hashtag)."""
+    return f"{{d:{document_id}}}"
+
+
+def conversation_hashtag(conversation_id: Union[int, str]) -> str:
+    """Redis hashtag scoping keys to a conversation (see user_hashtag)."""
+    return f"{{c:{conversation_id}}}"
+
+
 def make_document_key(document_id: int) -> str:
     """Generate cache key for document metadata."""
     return f"doc:meta:{document_id}"
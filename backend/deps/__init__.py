@@ -0,0 +1 @@
+# Shared FastAPI dependencies
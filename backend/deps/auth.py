@@ -0,0 +1,58 @@
+from fastapi import HTTPException, status
+from fastapi.requests import HTTPConnection
+from jose import JWTError, jwt
+
+from backend.core.config import get_settings
+
+# Used when a request carries no bearer token (single-user mode until login lands)
+DEFAULT_USER_ID = 1
+
+
+def _user_id_from_token(token: str) -> int:
+    settings = get_settings()
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+async def get_current_user_id(connection: HTTPConnection) -> int:
+    """
+    Resolve the id of the user making the request.
+    
+    Reads the `sub` claim of an `Authorization: Bearer` token and falls back to
+    DEFAULT_USER_ID when no token is sent. The result is memoized on
+    `request.state.user_id`, so the header is parsed once per request (and the
+    request logging middleware picks the id up from there).
+    """
+    user_id = getattr(connection.state, "user_id", None)
+    if user_id is not None:
+        return user_id
+    
+    scheme, _, token = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        user_id = _user_id_from_token(token)
+    else:
+        user_id = DEFAULT_USER_ID
+    
+    connection.state.user_id = user_id
+    return user_id
+
+
+async def reject_user_id_param(connection: HTTPConnection) -> None:
+    """
+    Refuse requests that try to pick the user through a `user_id` query parameter.
+    
+    The user always comes from get_current_user_id; silently ignoring the
+    parameter would answer for a different user than the caller asked about.
+    """
+    if "user_id" in connection.query_params:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="user_id is taken from the request credentials and cannot be passed as a parameter"
+        )
@@ -0,0 +1,17 @@
+from typing import Any, Dict
+
+from fastapi.requests import HTTPConnection
+
+
+async def get_request_cache(connection: HTTPConnection) -> Dict[Any, Any]:
+    """
+    Dict for memoizing lookups within a single request.
+    
+    Stored on `request.state.cache`, so middleware, dependencies and the
+    endpoint share it; it is dropped with the request, so entries never need
+    invalidating.
+    """
+    cache = getattr(connection.state, "cache", None)
+    if cache is None:
+        cache = connection.state.cache = {}
+    return cache
@@ -4,10 +4,11 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from pathlib import Path
+import asyncio
 import uvicorn
 from backend.core.config import get_settings
 from backend.core.database import create_tables
-from backend.core.middleware import RequestLoggingMiddleware, ErrorHandlingMiddleware
+from backend.core.middleware import RequestLoggingMiddleware, ErrorHandlingMiddleware, DBSessionMiddleware
 from backend.core.logging import get_app_logger
 from backend.core.redis import init_redis, close_redis, get_redis_client
 from backend.core.exceptions import (
@@ -18,6 +19,8 @@ from backend.core.exceptions import (
     general_exception_handler
 )
 from backend.routers import upload, search, dialogue, documents
+from backend.services.document_cache import document_cache
+from backend.services.websocket_service import websocket_manager
 
 settings = get_settings()
 logger = get_app_logger()
@@ -38,6 +41,7 @@ app.add_exception_handler(Exception, general_exception_handler)
 import traceback
 
 # Add logging and error handling middleware
+app.add_middleware(DBSessionMiddleware)
 app.add_middleware(ErrorHandlingMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 
@@ -291,6 +295,14 @@ async def startup_event():
             health = await redis_client.health_check()
             logger.info(f"🗄️  Redis connected: {health['status']} (v{health.get('version', 'unknown')})")
             print(f"🗄️  Redis connected: {health['status']} (v{health.get('version', 'unknown')})")
+            # Keep this worker's in-process document cache in sync with the others
+            app.state.document_invalidation_listener = asyncio.create_task(
+                document_cache.listen_for_invalidations()
+            )
+            # Forward processing progress published by Celery workers to WebSocket clients
+            app.state.progress_listener = asyncio.create_task(
+                websocket_manager.listen_for_progress(redis_client)
+            )
         else:
             logger.warning("⚠️  Redis connection failed - caching disabled")
             print("⚠️  Redis connection failed - caching disabled")
@@ -326,6 +338,11 @@ async def shutdown_event():
     print("🛑 Shutting down SmartChat application...")
     
     try:
+        for name in ("document_invalidation_listener", "progress_listener"):
+            listener = getattr(app.state, name, None)
+            if listener:
+                listener.cancel()
+        
         # Close Redis connection
         await close_redis()
         logger.info("🗄️  Redis connection closed")
@@ -43,6 +43,8 @@ class Conversation(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    # On PostgreSQL the table is hash-partitioned by conversation_id (16 partitions,
+    # see migration d47a9e2b15c8); filter by conversation_id to get partition pruning.
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True, index=True)
@@ -1,10 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, BigInteger, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, BigInteger, Float, Index, event, inspect, update
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from backend.core.database import Base
-from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from backend.core.database import Base
+from backend.models.user import User
 
 # Define DocumentStatus and DocumentType as simple strings for database storage
 # These will be used as string values directly in the database,
@@ -36,10 +34,17 @@ class Document(Base):
     original_filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_size = Column(BigInteger, nullable=False)  # Size in bytes
-    file_hash = Column(String(64), nullable=False, index=True)  # SHA-256 hash
+    file_size_display = Column(String(20), nullable=True)  # Formatted file_size, set at upload
+    file_hash = Column(String(64), nullable=True, index=True)  # SHA-256 hash, computed only when a size + head match needs it
+    head_sha256 = Column(String(64), nullable=True)  # SHA-256 of the first 4KB
     mime_type = Column(String(100), nullable=False)
     document_type = Column(String(50), nullable=False) # Stored as string
-    status = Column(String(50), default=DOCUMENT_STATUS_UPLOADING, nullable=False, index=True) # Stored as string
+    # active_history loads the previous value on assignment, so the document_count
+    # listener below can tell whether a document left or re-entered DELETED
+    status = column_property(
+        Column(String(50), default=DOCUMENT_STATUS_UPLOADING, nullable=False, index=True), # Stored as string
+        active_history=True
+    )
     category = Column(String(100), nullable=True, index=True) # New category field
     
     # Processing information
@@ -57,13 +62,92 @@ class Document(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Foreign keys
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Indexed through the leading column of ix_documents_owner_status_type
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     def __repr__(self):
         return f"<Document(id={self.id}, title='{self.title}', status='{self.status}')>"
 
+
+# Partial indexes over non-deleted documents, matching the owner + "status != DELETED"
+# filter used by every document endpoint; one per keyset sort key, with id as the
+# cursor tiebreaker. The default list (newest first) is served without a sort step.
+Index(
+    "ix_documents_owner_active",
+    Document.owner_id,
+    Document.created_at.desc(),
+    Document.id.desc(),
+    postgresql_where=Document.status != DOCUMENT_STATUS_DELETED,
+    sqlite_where=Document.status != DOCUMENT_STATUS_DELETED
+)
+Index(
+    "ix_documents_owner_active_title",
+    Document.owner_id,
+    Document.title,
+    Document.id,
+    postgresql_where=Document.status != DOCUMENT_STATUS_DELETED,
+    sqlite_where=Document.status != DOCUMENT_STATUS_DELETED
+)
+# Also serves the upload duplicate probe (owner, size, non-deleted)
+Index(
+    "ix_documents_owner_active_size",
+    Document.owner_id,
+    Document.file_size,
+    Document.id,
+    postgresql_where=Document.status != DOCUMENT_STATUS_DELETED,
+    sqlite_where=Document.status != DOCUMENT_STATUS_DELETED
+)
+
+
+# Covers the stats summary (GROUP BY status, document_type with SUM(file_size));
+# on PostgreSQL the INCLUDE column makes it an index-only scan. Its owner_id and
+# (owner_id, status) prefixes serve owner lookups and status-filtered lists.
+Index(
+    "ix_documents_owner_status_type",
+    Document.owner_id,
+    Document.status,
+    Document.document_type,
+    postgresql_include=["file_size"]
+)
+
+
+# users.document_count counts the owner's non-deleted documents. ORM inserts,
+# deletes and status changes keep it in sync here; Core/bulk statements that
+# bypass these events adjust it themselves (see routers/documents.py).
+def _adjust_owner_document_count(connection, owner_id: int, delta: int) -> None:
+    connection.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id == owner_id)
+        .values(document_count=User.__table__.c.document_count + delta)
+    )
+
+
+@event.listens_for(Document, "after_insert")
+def _document_after_insert(mapper, connection, target):
+    if target.status != DOCUMENT_STATUS_DELETED:
+        _adjust_owner_document_count(connection, target.owner_id, 1)
+
+
+@event.listens_for(Document, "after_update")
+def _document_after_update(mapper, connection, target):
+    history = inspect(target).attrs.status.history
+    if not history.deleted:
+        return
+    was_active = history.deleted[0] != DOCUMENT_STATUS_DELETED
+    is_active = target.status != DOCUMENT_STATUS_DELETED
+    if was_active != is_active:
+        _adjust_owner_document_count(connection, target.owner_id, 1 if is_active else -1)
+
+
+@event.listens_for(Document, "after_delete")
+def _document_after_delete(mapper, connection, target):
+    if target.status != DOCUMENT_STATUS_DELETED:
+        _adjust_owner_document_count(connection, target.owner_id, -1)
+
 class DocumentChunk(Base):
     __tablename__ = "document_chunks"
+    # On PostgreSQL the table is hash-partitioned by document_id (16 partitions,
+    # see migration d47a9e2b15c8); filter by document_id to get partition pruning.
     __table_args__ = {'extend_existing': True}
     
     id = Column(Integer, primary_key=True, index=True)
@@ -9,22 +9,42 @@ This router provides comprehensive cache management endpoints for:
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
-from datetime import datetime
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Optional, List, Dict, Any
+import asyncio
 import logging
+import random
+import orjson
 
 from backend.services.cache_monitor import get_cache_monitor
 from backend.services.document_cache import get_document_cache
 from backend.services.search_cache import get_search_cache
 from backend.services.conversation_cache import get_conversation_cache
 from backend.core.redis import get_redis_client
+from backend.utils.ttl_memo import async_ttl_cache
+from backend.utils.clock import now_iso
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/cache", tags=["Cache Management"])
+router = APIRouter(
+    prefix="/api/cache",
+    tags=["Cache Management"],
+    default_response_class=ORJSONResponse
+)
+
+# Seconds dashboard-polled endpoints are served from process memory
+DASHBOARD_CACHE_TTL = 2.0
+
+# Keys sized per pattern in /memory/usage, and how long estimates are reused
+MEMORY_SAMPLE_SIZE = 50
+MEMORY_ESTIMATE_CACHE_TTL = 30.0
+
+# Keys analyzed per pipeline flush in /keys/info
+KEYS_INFO_PIPELINE_BATCH = 200
 
 
 @router.get("/stats/comprehensive")
+@async_ttl_cache(ttl=DASHBOARD_CACHE_TTL)
 async def get_comprehensive_cache_stats():
     """Get comprehensive statistics from all cache services and Redis server."""
     try:
@@ -42,6 +62,7 @@ async def get_comprehensive_cache_stats():
 
 
 @router.get("/performance/analysis")
+@async_ttl_cache(ttl=DASHBOARD_CACHE_TTL)
 async def analyze_cache_performance():
     """Analyze cache performance and get optimization recommendations."""
     try:
@@ -100,6 +121,7 @@ async def get_detailed_cache_health():
 
 
 @router.get("/redis/info")
+@async_ttl_cache(ttl=DASHBOARD_CACHE_TTL)
 async def get_redis_server_info():
     """Get detailed Redis server information and statistics."""
     try:
@@ -154,50 +176,53 @@ async def clear_cache_selective(
 ):
     """Selectively clear cache services based on specified criteria."""
     try:
-        cleared_services = []
-        total_cleared = 0
+        # The services own disjoint key namespaces, so their clears run concurrently
+        services = []
+        tasks = []
         
         # Clear document cache if requested
         if document_cache:
             doc_cache = get_document_cache()
             if document_id:
-                cleared = await doc_cache.invalidate_document_cache(document_id)
-                total_cleared += cleared
+                tasks.append(doc_cache.invalidate_document_cache(document_id))
             elif user_id:
-                cleared = await doc_cache.invalidate_user_list_cache(user_id)
-                total_cleared += cleared
+                tasks.append(doc_cache.invalidate_user_list_cache(user_id))
             else:
                 # Clear all document cache
-                redis_client = get_redis_client()
-                cleared = await redis_client.delete_pattern("doc:*")
-                total_cleared += cleared
-            cleared_services.append("document_cache")
+                tasks.append(get_redis_client().delete_pattern("doc:*"))
+            services.append("document_cache")
         
         # Clear search cache if requested
         if search_cache:
             search_cache_service = get_search_cache()
             if document_id:
-                cleared = await search_cache_service.invalidate_document_search_cache(document_id)
-                total_cleared += cleared
+                tasks.append(search_cache_service.invalidate_document_search_cache(document_id))
             elif user_id:
-                cleared = await search_cache_service.invalidate_user_search_cache(user_id)
-                total_cleared += cleared
+                tasks.append(search_cache_service.invalidate_user_search_cache(user_id))
             else:
                 # Clear all search cache
-                redis_client = get_redis_client()
-                cleared = await redis_client.delete_pattern("search:*")
-                total_cleared += cleared
-            cleared_services.append("search_cache")
+                tasks.append(get_redis_client().delete_pattern("search:*"))
+            services.append("search_cache")
         
         # Clear conversation cache if requested
         if conversation_cache:
             conv_cache = get_conversation_cache()
-            cleared = await conv_cache.invalidate_conversation_caches(
+            tasks.append(conv_cache.invalidate_conversation_caches(
                 user_id=user_id,
                 document_id=document_id
-            )
-            total_cleared += cleared
-            cleared_services.append("conversation_cache")
+            ))
+            services.append("conversation_cache")
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        cleared_services = []
+        total_cleared = 0
+        for service, result in zip(services, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error clearing {service}: {result}")
+                continue
+            total_cleared += result
+            cleared_services.append(service)
         
         return {
             "status": "success",
@@ -205,7 +230,7 @@ async def clear_cache_selective(
             "data": {
                 "services_cleared": cleared_services,
                 "total_entries_cleared": total_cleared,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": now_iso()
             }
         }
         
@@ -223,15 +248,14 @@ async def clear_all_caches():
             raise HTTPException(status_code=503, detail="Redis client not available")
         
         # Get count before clearing
-        total_keys_before = await redis_client.count_keys("*")
+        total_keys_before = await redis_client.dbsize()
         
-        # Clear all cache patterns
+        # Clear all cache patterns concurrently
         patterns = ["doc:*", "search:*", "conversation:*", "chunks:*", "user:*"]
-        total_cleared = 0
-        
-        for pattern in patterns:
-            cleared = await redis_client.delete_pattern(pattern)
-            total_cleared += cleared
+        cleared_counts = await asyncio.gather(
+            *(redis_client.delete_pattern(pattern) for pattern in patterns)
+        )
+        total_cleared = sum(cleared_counts)
         
         return {
             "status": "success",
@@ -240,7 +264,7 @@ async def clear_all_caches():
                 "keys_before": total_keys_before,
                 "keys_cleared": total_cleared,
                 "patterns_cleared": patterns,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": now_iso()
             }
         }
         
@@ -249,6 +273,48 @@ async def clear_all_caches():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@async_ttl_cache(ttl=MEMORY_ESTIMATE_CACHE_TTL)
+async def _estimate_pattern_memory(redis_client, pattern: str) -> Dict[str, Any]:
+    """
+    Estimate memory used by keys matching pattern.
+    
+    A uniform sample of MEMORY_SAMPLE_SIZE keys is drawn with reservoir
+    sampling during a single SCAN pass, then sized in one pipelined flush.
+    """
+    key_count = 0
+    sample_keys: List[str] = []
+    
+    if redis_client._client:
+        async for key in redis_client._client.scan_iter(match=pattern, count=1000):
+            if len(sample_keys) < MEMORY_SAMPLE_SIZE:
+                sample_keys.append(key)
+            else:
+                # Algorithm R: keep each key with probability MEMORY_SAMPLE_SIZE / seen
+                slot = random.randrange(key_count + 1)
+                if slot < MEMORY_SAMPLE_SIZE:
+                    sample_keys[slot] = key
+            key_count += 1
+    
+    pattern_memory = 0
+    if sample_keys:
+        async with redis_client.pipeline() as pipe:
+            if pipe is not None:
+                for key in sample_keys:
+                    pipe.memory_usage(key)
+                results = await pipe.execute(raise_on_error=False)
+                pattern_memory = sum(r for r in results if isinstance(r, int))
+    
+    avg_memory_per_key = pattern_memory / len(sample_keys) if sample_keys else 0
+    
+    return {
+        "key_count": key_count,
+        "sampled_keys": len(sample_keys),
+        "sampled_memory_bytes": pattern_memory,
+        "estimated_total_memory_bytes": avg_memory_per_key * key_count,
+        "avg_memory_per_key": avg_memory_per_key
+    }
+
+
 @router.get("/memory/usage")
 async def get_cache_memory_usage():
     """Get detailed memory usage information for cached data."""
@@ -262,40 +328,13 @@ async def get_cache_memory_usage():
         memory_usage = {
             "total_memory": 0,
             "patterns": {},
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": now_iso()
         }
         
         for pattern in patterns:
-            keys = await redis_client._client.keys(pattern) if redis_client._client else []
-            pattern_memory = 0
-            key_count = len(keys)
-            
-            # Sample up to 50 keys for performance
-            sample_keys = keys[:50] if len(keys) > 50 else keys
-            
-            for key in sample_keys:
-                try:
-                    key_memory = await redis_client.get_memory_usage(key)
-                    pattern_memory += key_memory
-                except Exception:
-                    continue
-            
-            # Estimate total memory for pattern
-            if sample_keys and key_count > 0:
-                avg_memory_per_key = pattern_memory / len(sample_keys)
-                estimated_total_memory = avg_memory_per_key * key_count
-            else:
-                estimated_total_memory = 0
-            
-            memory_usage["patterns"][pattern] = {
-                "key_count": key_count,
-                "sampled_keys": len(sample_keys),
-                "sampled_memory_bytes": pattern_memory,
-                "estimated_total_memory_bytes": estimated_total_memory,
-                "avg_memory_per_key": avg_memory_per_key if sample_keys else 0
-            }
-            
-            memory_usage["total_memory"] += estimated_total_memory
+            pattern_stats = await _estimate_pattern_memory(redis_client, pattern)
+            memory_usage["patterns"][pattern] = pattern_stats
+            memory_usage["total_memory"] += pattern_stats["estimated_total_memory_bytes"]
         
         return {
             "status": "success",
@@ -307,77 +346,121 @@ async def get_cache_memory_usage():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _analyze_key_batch(redis_client, batch: List[str]) -> List[Dict[str, Any]]:
+    """Pipeline MEMORY USAGE / TTL for a batch instead of separate round-trips per key."""
+    async with redis_client.pipeline() as pipe:
+        if pipe is None:
+            return []
+        for key in batch:
+            pipe.memory_usage(key)
+            pipe.ttl(key)
+        results = await pipe.execute(raise_on_error=False)
+    
+    rows = []
+    for i, key in enumerate(batch):
+        memory_usage, ttl = results[i * 2:i * 2 + 2]
+        if isinstance(ttl, Exception):
+            logger.warning(f"Error analyzing key {key}: {ttl}")
+            continue
+        
+        # TTL -2 means the key expired or was deleted since SCAN returned it
+        if ttl == -2 or memory_usage is None:
+            continue
+        
+        # MEMORY USAGE needs Redis 4.0+; count an unsupported command as 0 bytes
+        if not isinstance(memory_usage, int):
+            memory_usage = 0
+        rows.append({
+            "key": key,
+            "memory_bytes": memory_usage,
+            "ttl_seconds": ttl,
+            "exists": True
+        })
+    return rows
+
+
 @router.get("/keys/info")
 async def get_cache_keys_info(
     pattern: str = Query("*", description="Key pattern to analyze"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of keys to analyze")
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of keys to analyze"),
+    key_type: Optional[str] = Query(None, description="Only return keys of this Redis type (string, hash, list, ...)")
 ):
-    """Get detailed information about cache keys matching a pattern."""
-    try:
-        redis_client = get_redis_client()
-        if not redis_client:
-            raise HTTPException(status_code=503, detail="Redis client not available")
-        
-        # Get keys matching pattern
-        keys = await redis_client._client.keys(pattern) if redis_client._client else []
-        
-        # Limit the number of keys to analyze
-        analyzed_keys = keys[:limit] if len(keys) > limit else keys
-        
-        keys_info = {
+    """
+    Get detailed information about cache keys matching a pattern.
+    
+    Streams NDJSON: one line per analyzed key, followed by a final line of
+    the form {"summary": {...}} with the aggregates. Only one pipeline batch
+    is held in memory at a time.
+    """
+    redis_client = get_redis_client()
+    if not redis_client or not redis_client._client:
+        raise HTTPException(status_code=503, detail="Redis client not available")
+    
+    async def keys_info_generator():
+        summary = {
             "pattern": pattern,
-            "total_matching_keys": len(keys),
-            "analyzed_keys": len(analyzed_keys),
-            "keys": [],
-            "summary": {
-                "total_memory": 0,
-                "keys_with_ttl": 0,
-                "keys_without_ttl": 0,
-                "avg_ttl": 0
-            },
-            "timestamp": datetime.utcnow().isoformat()
+            "analyzed_keys": 0,
+            "truncated": False,
+            "total_memory": 0,
+            "keys_with_ttl": 0,
+            "keys_without_ttl": 0,
+            "avg_ttl": 0,
+            "timestamp": now_iso()
         }
-        
         ttl_sum = 0
-        ttl_count = 0
-        
-        for key in analyzed_keys:
-            try:
-                # Get key info
-                memory_usage = await redis_client.get_memory_usage(key)
-                ttl = await redis_client.ttl(key)
-                exists = await redis_client.exists(key)
-                
-                key_info = {
-                    "key": key,
-                    "memory_bytes": memory_usage,
-                    "ttl_seconds": ttl,
-                    "exists": exists
-                }
-                
-                keys_info["keys"].append(key_info)
-                keys_info["summary"]["total_memory"] += memory_usage
-                
+        scanned = 0
+        batch: List[str] = []
+        
+        async def flush():
+            nonlocal ttl_sum
+            lines = []
+            for row in await _analyze_key_batch(redis_client, batch):
+                summary["analyzed_keys"] += 1
+                summary["total_memory"] += row["memory_bytes"]
+                ttl = row["ttl_seconds"]
                 if ttl > 0:
-                    keys_info["summary"]["keys_with_ttl"] += 1
+                    summary["keys_with_ttl"] += 1
                     ttl_sum += ttl
-                    ttl_count += 1
                 elif ttl == -1:  # Key exists but no TTL
-                    keys_info["summary"]["keys_without_ttl"] += 1
-                    
-            except Exception as e:
-                logger.warning(f"Error analyzing key {key}: {e}")
-                continue
-        
-        # Calculate average TTL
-        if ttl_count > 0:
-            keys_info["summary"]["avg_ttl"] = ttl_sum / ttl_count
-        
-        return {
-            "status": "success",
-            "data": keys_info
-        }
-        
-    except Exception as e:
-        logger.error(f"Error getting cache keys info: {e}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+                    summary["keys_without_ttl"] += 1
+                lines.append(orjson.dumps(row) + b"\n")
+            batch.clear()
+            return b"".join(lines)
+        
+        try:
+            # Drive SCAN by hand so the cursor tells whether matching keys remain
+            cursor = 0
+            while True:
+                cursor, keys = await redis_client._client.scan(
+                    cursor=cursor, match=pattern, count=1000, _type=key_type
+                )
+                page = keys[:limit - scanned]
+                for key in page:
+                    batch.append(key)
+                    if len(batch) >= KEYS_INFO_PIPELINE_BATCH:
+                        yield await flush()
+                scanned += len(page)
+                if scanned >= limit:
+                    leftover = len(keys) > len(page)
+                    # SCAN pages can come back empty, so peek ahead before reporting truncation
+                    while not leftover and cursor != 0:
+                        cursor, keys = await redis_client._client.scan(
+                            cursor=cursor, match=pattern, count=1000, _type=key_type
+                        )
+                        leftover = bool(keys)
+                    summary["truncated"] = leftover
+                    break
+                if cursor == 0:
+                    break
+            if batch:
+                yield await flush()
+        except Exception as e:
+            logger.error(f"Error getting cache keys info: {e}")
+            summary["error"] = str(e)
+        
+        if summary["keys_with_ttl"] > 0:
+            summary["avg_ttl"] = ttl_sum / summary["keys_with_ttl"]
+        
+        yield orjson.dumps({"summary": summary}) + b"\n"
+    
+    return StreamingResponse(keys_info_generator(), media_type="application/x-ndjson")
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks, Header
+from fastapi.responses import StreamingResponse, Response, ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-import json
+from functools import lru_cache, partial
+import asyncio
 import logging
+import time
+import orjson
+from starlette.background import BackgroundTask
 
 from backend.services.dialogue_service import dialogue_service
 from backend.services.conversation_cache import get_conversation_cache
+from backend.utils.clock import now_iso
+from backend.utils.concurrency import bounded_gather
+from backend.utils.ttl_memo import async_ttl_cache
+from backend.core.config import get_settings
 from backend.schemas.dialogue import (
     QueryRequest, 
     QueryResponse, 
@@ -17,11 +24,46 @@ from backend.schemas.dialogue import (
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/dialogue", tags=["dialogue"])
+router = APIRouter(prefix="/api/dialogue", tags=["dialogue"], default_response_class=ORJSONResponse)
+
+# Streaming frame pieces, bound once so the per-token loop only concatenates bytes
+# numpy scalars/arrays (e.g. rerank scores in citations) serialize natively
+_DUMPS = partial(orjson.dumps, option=orjson.OPT_SERIALIZE_NUMPY)
+_SSE_FRAME = (b"data: ", b"\n\n")
+_NDJSON_FRAME = (b"", b"\n")
+
+# SSE comment frame sent while the pipeline is busy (retrieval, LLM prefill)
+# so proxies and clients do not treat a quiet stream as stalled
+_SSE_PING = b": ping\n\n"
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+
+async def _with_keepalive(frames, interval: float = SSE_KEEPALIVE_INTERVAL):
+    """Interleave `_SSE_PING` frames into `frames` whenever it is idle for `interval` seconds."""
+    frames = frames.__aiter__()
+    pending = asyncio.ensure_future(frames.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield _SSE_PING
+                continue
+            try:
+                frame = pending.result()
+            except StopAsyncIteration:
+                return
+            yield frame
+            pending = asyncio.ensure_future(frames.__anext__())
+    finally:
+        pending.cancel()
 
 
 @router.post("/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+async def process_query(
+    request: QueryRequest,
+    background_tasks: BackgroundTasks,
+    x_no_cache: Optional[str] = Header(None)
+):
     """
     Process a user query and generate response with citations.
     
@@ -30,23 +72,30 @@ async def process_query(request: QueryRequest):
     2. Generates context from retrieved fragments
     3. Uses LLM to generate a response
     4. Returns response with citations
+    
+    The result cache is bypassed when the client sends `X-No-Cache` or the
+    conversation history is long enough that a hit is practically impossible.
     """
     try:
         conversation_cache = get_conversation_cache()
         
-        # Try to get cached result first
-        cached_result = await conversation_cache.get_query_result(
-            query=request.query,
-            user_id=request.user_id,
-            document_id=request.document_id,
-            model_preference=request.model_preference,
-            conversation_history=request.conversation_history
-        )
+        history_len = sum(len(m.content) for m in (request.conversation_history or []))
+        use_cache = not x_no_cache and history_len <= get_settings().query_cache_max_history_chars
         
-        if cached_result:
-            logger.debug(f"Returning cached query result for: {request.query[:50]}...")
-            # Add cache hit indicator in response headers would be done at app level
-            return cached_result
+        # Try to get cached result first
+        if use_cache:
+            cached_result = await conversation_cache.get_query_result(
+                query=request.query,
+                user_id=request.user_id,
+                document_id=request.document_id,
+                model_preference=request.model_preference,
+                conversation_history=request.conversation_history
+            )
+            
+            if cached_result:
+                logger.debug(f"Returning cached query result for: {request.query[:50]}...")
+                # Add cache hit indicator in response headers would be done at app level
+                return cached_result
         
         # Process query if not cached
         result = await dialogue_service.process_query(
@@ -59,15 +108,17 @@ async def process_query(request: QueryRequest):
         
         query_response = QueryResponse(**result)
         
-        # Cache the result for future use
-        await conversation_cache.cache_query_result(
-            query=request.query,
-            result=query_response,
-            user_id=request.user_id,
-            document_id=request.document_id,
-            model_preference=request.model_preference,
-            conversation_history=request.conversation_history
-        )
+        # Cache the result after the response has been sent (write is idempotent)
+        if use_cache:
+            background_tasks.add_task(
+                conversation_cache.cache_query_result,
+                query=request.query,
+                result=query_response,
+                user_id=request.user_id,
+                document_id=request.document_id,
+                model_preference=request.model_preference,
+                conversation_history=request.conversation_history
+            )
         
         return query_response
         
@@ -76,8 +127,16 @@ async def process_query(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Longest query whose streamed answer is recorded for replay
+STREAM_CACHE_MAX_QUERY_CHARS = 1024
+
+
 @router.post("/query/stream")
-async def process_query_stream(request: StreamQueryRequest):
+async def process_query_stream(
+    request: StreamQueryRequest,
+    accept: Optional[str] = Header(None),
+    x_no_cache: Optional[str] = Header(None)
+):
     """
     Process a user query with streaming response generation.
     
@@ -86,8 +145,43 @@ async def process_query_stream(request: StreamQueryRequest):
     - Citations found
     - Streaming LLM response
     - Final metadata
+    
+    Chunks are sent as Server-Sent Events (`data:` frames plus periodic
+    `: ping` keep-alive comments); clients sending
+    `Accept: application/x-ndjson` get newline-delimited JSON instead.
+    
+    Completed streams for history-free queries are recorded in Redis and
+    replayed for identical requests (announced by a `cache_hit` phase frame).
     """
+    ndjson = bool(accept) and "application/x-ndjson" in accept
+    prefix, suffix = _NDJSON_FRAME if ndjson else _SSE_FRAME
+    
+    conversation_cache = get_conversation_cache()
+    cache_params = {
+        "query": request.query,
+        "user_id": request.user_id,
+        "document_id": request.document_id,
+        "model_preference": request.model_preference
+    }
+    replayable = (
+        not x_no_cache
+        and not request.conversation_history
+        and len(request.query) <= STREAM_CACHE_MAX_QUERY_CHARS
+    )
+    cached_chunks = await conversation_cache.get_stream_chunks(**cache_params) if replayable else None
+    recorded: List[Dict[str, Any]] = []
+    
     async def stream_generator():
+        dumps = _DUMPS
+        # Sent before retrieval starts so clients can tell "queued" from "stalled"
+        yield prefix + dumps({"type": "phase", "phase": "accepted", "timestamp": now_iso()}) + suffix
+        
+        if cached_chunks:
+            yield prefix + dumps({"type": "phase", "phase": "cache_hit"}) + suffix
+            for chunk in cached_chunks:
+                yield prefix + dumps(chunk) + suffix
+            return
+        
         try:
             async for chunk in dialogue_service.process_query_stream(
                 query=request.query,
@@ -96,158 +190,220 @@ async def process_query_stream(request: StreamQueryRequest):
                 conversation_history=request.conversation_history,
                 model_preference=request.model_preference
             ):
-                yield f"data: {json.dumps(chunk)}\n\n"
+                yield prefix + dumps(chunk) + suffix
+                if replayable:
+                    # TTFT of this run is meaningless for a replay
+                    recorded.append({k: v for k, v in chunk.items() if k != "ttft_ms"} if "ttft_ms" in chunk else chunk)
                 
         except Exception as e:
             logger.error(f"Error in streaming query: {str(e)}")
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            recorded.clear()
+            yield prefix + dumps({"type": "error", "error": str(e)}) + suffix
+    
+    async def record_stream():
+        # Runs after the response completes; only successful, finished streams are kept
+        if recorded and recorded[-1].get("type") == "final":
+            await conversation_cache.cache_stream_chunks(chunks=recorded, **cache_params)
     
     return StreamingResponse(
-        stream_generator(),
-        media_type="text/stream",
+        stream_generator() if ndjson else _with_keepalive(stream_generator()),
+        media_type="application/x-ndjson" if ndjson else "text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no"  # Disable nginx buffering
-        }
+        },
+        background=BackgroundTask(record_stream)
     )
 
 
+@lru_cache(maxsize=1)
+def _models_payload() -> bytes:
+    """Serialized /models body; provider configuration only changes on restart."""
+    models = []
+    
+    # Check which models have API keys configured
+    from backend.services.llm_service import LLMProvider
+    
+    for provider in LLMProvider:
+        config = dialogue_service.llm_service.providers.get(provider)
+        if config and config.get("api_key"):
+            models.append({
+                "provider": provider.value,
+                "model": config["model"],
+                "available": True
+            })
+        else:
+            models.append({
+                "provider": provider.value,
+                "model": config["model"] if config else "unknown",
+                "available": False,
+                "reason": "API key not configured"
+            })
+    
+    return orjson.dumps({"models": models})
+
+
+@lru_cache(maxsize=1)
+def _static_stats() -> Dict[str, Any]:
+    """Configuration part of /stats, fixed for the lifetime of the process."""
+    return {
+        "embedding_model": {
+            "api_url": dialogue_service.settings.embedding_api_url,
+            "model": dialogue_service.settings.embedding_model,
+            "timeout": dialogue_service.settings.embedding_api_timeout
+        },
+        "configuration": {
+            "top_k_initial": dialogue_service.top_k_initial,
+            "top_k_final": dialogue_service.top_k_final,
+            "similarity_threshold": dialogue_service.similarity_threshold
+        }
+    }
+
+
 @router.get("/models")
-async def get_available_models():
+async def get_available_models(
+    fresh: bool = Query(False, description="Rebuild the model list from current provider configuration")
+):
     """Get list of available LLM models and their status."""
     try:
-        models = []
-        
-        # Check which models have API keys configured
-        from backend.services.llm_service import LLMProvider
-        
-        for provider in LLMProvider:
-            config = dialogue_service.llm_service.providers.get(provider)
-            if config and config.get("api_key"):
-                models.append({
-                    "provider": provider.value,
-                    "model": config["model"],
-                    "available": True
-                })
-            else:
-                models.append({
-                    "provider": provider.value,
-                    "model": config["model"] if config else "unknown",
-                    "available": False,
-                    "reason": "API key not configured"
-                })
-        
-        return {"models": models}
+        if fresh:
+            _models_payload.cache_clear()
+        return Response(content=_models_payload(), media_type="application/json")
         
     except Exception as e:
         logger.error(f"Error getting available models: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# A successful embedding probe is trusted for this long before calling the API again
+EMBEDDING_PROBE_INTERVAL = 30.0
+_last_embed_ok = 0.0
+
+
+async def _probe_embedding_service() -> str:
+    global _last_embed_ok
+    if time.monotonic() - _last_embed_ok < EMBEDDING_PROBE_INTERVAL:
+        return "healthy"
+    await dialogue_service.embedding_service.get_embedding("test", use_cache=False)
+    _last_embed_ok = time.monotonic()
+    return "healthy"
+
+
+async def _probe_vector_service() -> str:
+    vector_info = await dialogue_service.vector_service.get_collection_info()
+    if vector_info.get("error"):
+        return f"unhealthy: {vector_info['error']}"
+    return "healthy"
+
+
+async def _probe_llm_service() -> str:
+    # Just check configuration
+    available_providers = sum(
+        1 for provider in dialogue_service.llm_service.providers.values()
+        if provider.get("api_key")
+    )
+    if available_providers > 0:
+        return f"healthy ({available_providers} providers)"
+    return "unhealthy: no API keys configured"
+
+
+async def _probe_conversation_cache() -> str:
+    cache_stats = await get_conversation_cache().get_cache_stats()
+    if "error" in cache_stats:
+        return f"unhealthy: {cache_stats['error']}"
+    return f"healthy ({cache_stats.get('total_conversation_cache_size', 0)} entries)"
+
+
+HEALTH_PROBES = {
+    "embedding_service": _probe_embedding_service,
+    "vector_service": _probe_vector_service,
+    "llm_service": _probe_llm_service,
+    "conversation_cache": _probe_conversation_cache,
+}
+
+# Upper bound for each probe so one hung backend cannot stall the endpoint
+HEALTH_PROBE_TIMEOUT = 1.5
+
+
+# Health results are reused briefly so dashboard polling does not hit the
+# embedding API and Qdrant on every request
+HEALTH_CACHE_TTL = 5.0
+
+
+@async_ttl_cache(ttl=HEALTH_CACHE_TTL)
+async def _collect_health() -> Dict[str, Any]:
+    # Probes are independent, so run them concurrently (bounded)
+    results = await bounded_gather(*HEALTH_PROBES.values(), timeout=HEALTH_PROBE_TIMEOUT)
+    
+    services = {}
+    for name, result in zip(HEALTH_PROBES, results):
+        if isinstance(result, asyncio.TimeoutError):
+            services[name] = "unhealthy: timeout"
+        elif isinstance(result, Exception):
+            services[name] = f"unhealthy: {str(result)}"
+        else:
+            services[name] = result
+    
+    health_status = {
+        "status": "healthy",
+        "services": services,
+        "timestamp": now_iso()
+    }
+    
+    # Determine overall status (conversation cache is informational only)
+    if any(
+        "unhealthy" in status
+        for name, status in services.items()
+        if name != "conversation_cache"
+    ):
+        health_status["status"] = "degraded"
+    
+    return health_status
+
+
 @router.get("/health")
-async def health_check():
+async def health_check(
+    fresh: bool = Query(False, description="Bypass the short-lived health cache")
+):
     """Health check endpoint for the dialogue service."""
     try:
-        # Test basic functionality
-        health_status = {
-            "status": "healthy",
-            "services": {
-                "vector_service": "unknown",
-                "embedding_service": "unknown", 
-                "llm_service": "unknown"
-            },
-            "timestamp": "unknown"
-        }
-        
-        # Test embedding service
-        try:
-            test_embedding = await dialogue_service.embedding_service.get_embedding("test")
-            health_status["services"]["embedding_service"] = "healthy"
-        except Exception as e:
-            health_status["services"]["embedding_service"] = f"unhealthy: {str(e)}"
-        
-        # Test vector service connection
-        try:
-            vector_info = await dialogue_service.vector_service.get_collection_info()
-            if vector_info.get("error"):
-                health_status["services"]["vector_service"] = f"unhealthy: {vector_info['error']}"
-            else:
-                health_status["services"]["vector_service"] = "healthy"
-        except Exception as e:
-            health_status["services"]["vector_service"] = f"unhealthy: {str(e)}"
-        
-        # Test LLM service (just check configuration)
-        try:
-            available_providers = 0
-            for provider in dialogue_service.llm_service.providers.values():
-                if provider.get("api_key"):
-                    available_providers += 1
-            
-            if available_providers > 0:
-                health_status["services"]["llm_service"] = f"healthy ({available_providers} providers)"
-            else:
-                health_status["services"]["llm_service"] = "unhealthy: no API keys configured"
-        except Exception as e:
-            health_status["services"]["llm_service"] = f"unhealthy: {str(e)}"
-        
-        from datetime import datetime
-        health_status["timestamp"] = datetime.utcnow().isoformat()
-        
-        # Determine overall status
-        if any("unhealthy" in status for status in health_status["services"].values()):
-            health_status["status"] = "degraded"
-        
-        # Test conversation cache
-        try:
-            conversation_cache = get_conversation_cache()
-            cache_stats = await conversation_cache.get_cache_stats()
-            if "error" in cache_stats:
-                health_status["services"]["conversation_cache"] = f"unhealthy: {cache_stats['error']}"
-            else:
-                health_status["services"]["conversation_cache"] = f"healthy ({cache_stats.get('total_conversation_cache_size', 0)} entries)"
-        except Exception as e:
-            health_status["services"]["conversation_cache"] = f"unhealthy: {str(e)}"
-        
-        return health_status
+        if fresh:
+            _collect_health.cache_clear()
+        return await _collect_health()
         
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/live")
+async def liveness_check():
+    """Cheap liveness probe: no embedding, vector or cache I/O (use /health for readiness)."""
+    return {
+        "status": "alive",
+        "llm_service": await _probe_llm_service(),
+        "timestamp": now_iso()
+    }
+
+
 @router.get("/stats")
 async def get_dialogue_stats():
     """Get statistics about the dialogue service."""
     try:
         stats = {
             "vector_database": {},
-            "embedding_model": {
-                "api_url": dialogue_service.settings.embedding_api_url,
-                "model": dialogue_service.settings.embedding_model,
-                "timeout": dialogue_service.settings.embedding_api_timeout
-            },
-            "configuration": {
-                "top_k_initial": dialogue_service.top_k_initial,
-                "top_k_final": dialogue_service.top_k_final,
-                "similarity_threshold": dialogue_service.similarity_threshold
-            }
+            **_static_stats()
         }
         
-        # Get vector database info
-        try:
-            vector_info = await dialogue_service.vector_service.get_collection_info()
-            stats["vector_database"] = vector_info
-        except Exception as e:
-            stats["vector_database"] = {"error": str(e)}
-        
-        # Get conversation cache stats
-        try:
-            conversation_cache = get_conversation_cache()
-            cache_stats = await conversation_cache.get_cache_stats()
-            stats["conversation_cache"] = cache_stats
-        except Exception as e:
-            stats["conversation_cache"] = {"error": str(e)}
+        # Vector database info and conversation cache stats are fetched concurrently
+        vector_info, cache_stats = await bounded_gather(
+            dialogue_service.vector_service.get_collection_info,
+            lambda: get_conversation_cache().get_cache_stats()
+        )
+        stats["vector_database"] = {"error": str(vector_info)} if isinstance(vector_info, Exception) else vector_info
+        stats["conversation_cache"] = {"error": str(cache_stats)} if isinstance(cache_stats, Exception) else cache_stats
+        stats["embedding_cache"] = dialogue_service.embedding_service.cache_stats()
         
         return stats
         
@@ -265,7 +421,7 @@ async def get_conversation_cache_stats():
         
         return {
             "cache_stats": stats,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
@@ -298,7 +454,7 @@ async def clear_conversation_cache(
         return {
             "message": f"Successfully cleared {deleted_count} cache entries",
             "deleted_count": deleted_count,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
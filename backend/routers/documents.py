@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from fastapi.responses import JSONResponse, StreamingResponse, ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, asc
-from typing import Optional, List
+from sqlalchemy import or_, and_, desc, asc, func, select, update, delete
+from typing import Optional, List, Union, Dict, Any
 from datetime import datetime
-from backend.core.database import get_db
+import asyncio
+import orjson
+from backend.core.database import get_db, get_db_ro, in_list_chunks
+from backend.deps.auth import get_current_user_id
+from backend.deps.request_cache import get_request_cache
+from backend.utils.formatting import format_file_size
 from backend.models.document import Document
+from backend.models.user import User
 from backend.schemas.document import (
     DocumentResponse,
     DocumentListResponse,
@@ -14,19 +20,131 @@ from backend.schemas.document import (
     DocumentStatus, # Import DocumentStatus enum
     DocumentType    # Import DocumentType enum
 )
-from backend.services.document_cache import document_cache
+from backend.services.document_cache import (
+    document_cache,
+    decode_list_cursor,
+    encode_list_cursor,
+    CURSOR_SORT_FIELDS,
+    PROCESSING_PROGRESS_ESTIMATE
+)
 from backend.services.search_cache import search_cache
 from backend.services.conversation_cache import get_conversation_cache
 
-router = APIRouter(prefix="/api/documents", tags=["Documents"])
+router = APIRouter(prefix="/api/documents", tags=["Documents"], default_response_class=ORJSONResponse)
+
+# Enum values resolved once; status/type are stored as plain strings
+_PROCESSING = DocumentStatus.PROCESSING.value
+_DELETED = DocumentStatus.DELETED.value
+_STATUS_VALUES = tuple(s.value for s in DocumentStatus if s is not DocumentStatus.DELETED)
+_TYPE_VALUES = tuple(t.value for t in DocumentType)
+_construct_response = DocumentResponse.model_construct
+
+# Case-insensitive query parameter -> stored value lookups
+_STATUS_BY_NAME = {s.value.lower(): s.value for s in DocumentStatus}
+_TYPE_BY_NAME = {t.value.lower(): t.value for t in DocumentType}
+_SORT_FIELDS = frozenset(('title', 'created_at', 'updated_at', 'file_size', 'status', 'category'))
+_SORT_ORDERS = frozenset(('asc', 'desc'))
+
+# Columns copied verbatim from a document row / cached dict into DocumentResponse
+_RESPONSE_FIELDS = (
+    'id', 'title', 'original_filename', 'document_type', 'status', 'category',
+    'file_size', 'page_count', 'word_count', 'language', 'processing_error',
+    'created_at', 'updated_at', 'processed_at'
+)
+
+def _active_for(db: Session, user_id: int):
+    """Query over the user's documents that are not soft-deleted (served by ix_documents_owner_active)."""
+    return db.query(Document).filter(
+        Document.owner_id == user_id,
+        Document.status != _DELETED
+    )
+
+
+def _load_document(db: Session, request_cache: Dict[Any, Any], document_id: int, user_id: int) -> Optional[Document]:
+    """The user's document (soft-deleted ones included), queried at most once per request."""
+    key = ("document", document_id, user_id)
+    if key not in request_cache:
+        request_cache[key] = db.query(Document).filter(
+            Document.id == document_id,
+            Document.owner_id == user_id
+        ).first()
+    return request_cache[key]
+
+
+def _to_payload(doc: Union[Document, Dict[str, Any]]) -> Dict[str, Any]:
+    """DocumentResponse fields as a plain dict, from an ORM row or a cached document dict."""
+    if isinstance(doc, dict):
+        payload = {field: doc[field] for field in _RESPONSE_FIELDS}
+        size_display = doc.get('file_size_display')
+    else:
+        payload = {field: getattr(doc, field) for field in _RESPONSE_FIELDS}
+        size_display = doc.file_size_display
+    # Stored at upload; rows and cache entries from before the column existed fall back
+    payload['file_size_display'] = size_display or format_file_size(payload['file_size'])
+    payload['processing_progress'] = PROCESSING_PROGRESS_ESTIMATE if payload['status'] == _PROCESSING else None
+    return payload
+
+
+def _to_response(doc: Union[Document, Dict[str, Any]]) -> DocumentResponse:
+    """Build a DocumentResponse from an ORM row or a cached document dict."""
+    # Data comes from the database or our own cache, so skip validation
+    return _construct_response(**_to_payload(doc))
+
+# Columns read back by UPDATE ... RETURNING for a DocumentResponse
+_RETURNING_COLUMNS = tuple(getattr(Document, field) for field in _RESPONSE_FIELDS + ('file_size_display',))
+
+# Rows fetched per round-trip when streaming document lists
+STREAM_FETCH_SIZE = 200
+
+
+def _stream_documents(query):
+    """Yield one NDJSON line per document (sync, so Starlette runs it in a worker thread)."""
+    dumps = orjson.dumps
+    for doc in query.yield_per(STREAM_FETCH_SIZE):
+        yield dumps(_to_payload(doc)) + b"\n"
+
+
+# Pages larger than this are streamed as a JSON envelope instead of being
+# built (and cached) as one response body
+LIST_STREAM_THRESHOLD = 250
+
+
+def _stream_document_list(query, limit: int, sort_by: str, page_metadata: Dict[str, Any]):
+    """Yield a DocumentListResponse body incrementally, one fetch batch per chunk.
+    
+    has_more and next_cursor are only known once the page has been read, so
+    the metadata follows the documents array.
+    """
+    dumps = orjson.dumps
+    yield b'{"documents":['
+    batch = []
+    last = None
+    count = 0
+    has_more = False
+    for doc in query.limit(limit + 1).yield_per(STREAM_FETCH_SIZE):
+        if count == limit:
+            has_more = True
+            break
+        batch.append(dumps(_to_payload(doc)))
+        last = doc
+        count += 1
+        if len(batch) == STREAM_FETCH_SIZE:
+            yield (b"," if count > len(batch) else b"") + b",".join(batch)
+            batch = []
+    if batch:
+        yield (b"," if count > len(batch) else b"") + b",".join(batch)
+    
+    next_cursor = None
+    if has_more and sort_by in CURSOR_SORT_FIELDS:
+        next_cursor = encode_list_cursor(getattr(last, sort_by), last.id)
+    # Splice the metadata object's members in after the array
+    yield b"]," + dumps({**page_metadata, "has_more": has_more, "next_cursor": next_cursor})[1:]
 
-# Mock user_id for now (will be replaced with actual authentication)
-CURRENT_USER_ID = 1
 
 @router.get("/", response_model=DocumentListResponse)
 async def list_documents(
-    db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID,
+    db: Session = Depends(get_db_ro),
+    user_id: int = Depends(get_current_user_id),
     search: Optional[str] = Query(None, description="Search in title and filename"),
     status: Optional[str] = Query(None, description="Filter by status (ready, processing, error, uploading)"),
     document_type: Optional[str] = Query(None, description="Filter by document type (pdf, epub, txt, docx, md)"),
@@ -34,24 +152,75 @@ async def list_documents(
     sort_by: str = Query("created_at", description="Sort field (title, created_at, file_size, status)"),
     sort_order: str = Query("desc", description="Sort order (asc, desc)"),
     skip: int = Query(0, ge=0, description="Number of documents to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Number of documents to return")
+    limit: int = Query(100, ge=1, le=1000, description="Number of documents to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor (skip is ignored)"),
+    exact_count: bool = Query(False, description="Count matching documents exactly instead of using the stored estimate"),
+    accept: Optional[str] = Header(None)
 ):
     """
     Get list of documents for the current user with filtering, searching, and sorting (cached).
+    
+    Pages can be fetched with `skip`/`limit` or, for deep pagination, by
+    passing the previous response's `next_cursor` as `cursor`.
+    
+    With `Accept: application/x-ndjson` the page is streamed straight from
+    the database, one document per line, without the list envelope.
+    Pages larger than 250 documents are also read straight from the
+    database and streamed, keeping the usual JSON envelope.
     """
     # Validate sort field first (before caching attempt)
-    valid_sort_fields = ['title', 'created_at', 'updated_at', 'file_size', 'status', 'category']
-    if sort_by not in valid_sort_fields:
+    if sort_by not in _SORT_FIELDS:
         raise HTTPException(status_code=400, detail=f"Invalid sort field: {sort_by}")
     
-    # Validate status and document_type
+    # Normalized so spellings like "DESC" share one cache entry
+    sort_order = sort_order.lower()
+    if sort_order not in _SORT_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort order: {sort_order}")
+    
+    # Matching is case-insensitive (ILIKE), so equivalent terms share one cache entry
+    if search:
+        search = search.strip().lower() or None
+    
+    # Validate status and document_type, normalizing to the stored values
     if status:
-        if status.upper() not in DocumentStatus.__members__:
+        status_value = _STATUS_BY_NAME.get(status.lower())
+        if status_value is None:
             raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        status = status_value
 
     if document_type:
-        if document_type.upper() not in DocumentType.__members__:
+        type_value = _TYPE_BY_NAME.get(document_type.lower())
+        if type_value is None:
             raise HTTPException(status_code=400, detail=f"Invalid document type: {document_type}")
+        document_type = type_value
+    
+    if cursor:
+        try:
+            decode_list_cursor(cursor, sort_by)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if accept and "application/x-ndjson" in accept:
+        query = document_cache.order_list_query(
+            document_cache.filtered_list_query(db, user_id, search, status, document_type, category),
+            sort_by, sort_order, cursor
+        )
+        if not cursor:
+            query = query.offset(skip)
+        return StreamingResponse(_stream_documents(query.limit(limit)), media_type="application/x-ndjson")
+    
+    if limit > LIST_STREAM_THRESHOLD:
+        query = document_cache.filtered_list_query(db, user_id, search, status, document_type, category)
+        total_count = document_cache.list_total_count(
+            db, user_id, query, bool(search or status or document_type or category), exact_count
+        )
+        query = document_cache.order_list_query(query, sort_by, sort_order, cursor)
+        if not cursor:
+            query = query.offset(skip)
+        return StreamingResponse(
+            _stream_document_list(query, limit, sort_by, {"total_count": total_count, "skip": skip, "limit": limit}),
+            media_type="application/json"
+        )
     
     # Try to get from cache first
     cache_result = await document_cache.get_document_list(
@@ -64,51 +233,27 @@ async def list_documents(
         sort_by=sort_by,
         sort_order=sort_order,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        exact_count=exact_count
     )
     
     if cache_result:
-        # Convert cached documents to response format
-        document_list = []
-        for doc_data in cache_result['documents']:
-            # Format file size
-            size_mb = doc_data['file_size'] / (1024 * 1024)
-            if size_mb < 1:
-                size_str = f"{doc_data['file_size'] / 1024:.1f} KB"
-            else:
-                size_str = f"{size_mb:.1f} MB"
-
-            # Calculate processing progress for processing documents
-            processing_progress = None
-            if doc_data['status'] == DocumentStatus.PROCESSING:
-                processing_progress = 65
-
-            document_list.append(DocumentResponse(
-                id=doc_data['id'],
-                title=doc_data['title'],
-                original_filename=doc_data['original_filename'],
-                document_type=doc_data['document_type'],
-                status=doc_data['status'],
-                category=doc_data['category'], # Include category
-                file_size=doc_data['file_size'],
-                file_size_display=size_str,
-                page_count=doc_data['page_count'],
-                word_count=doc_data['word_count'],
-                language=doc_data['language'],
-                processing_progress=processing_progress,
-                processing_error=doc_data['processing_error'],
-                created_at=doc_data['created_at'],
-                updated_at=doc_data['updated_at'],
-                processed_at=doc_data['processed_at']
-            ))
-
-        return DocumentListResponse(
-            documents=document_list,
-            total_count=cache_result['total_count'],
-            skip=cache_result['skip'],
-            limit=cache_result['limit'],
-            has_more=cache_result['has_more']
-        )
+        # Rows are trusted DB/cache data: encode plain dicts directly with orjson
+        # instead of validating every DocumentResponse on the way out. List
+        # entries are cached in response shape; only entries written before
+        # that need converting.
+        documents = cache_result['documents']
+        if documents and 'processing_progress' not in documents[0]:
+            documents = [_to_payload(doc_data) for doc_data in documents]
+        return ORJSONResponse({
+            "documents": documents,
+            "total_count": cache_result['total_count'],
+            "skip": cache_result['skip'],
+            "limit": cache_result['limit'],
+            "has_more": cache_result['has_more'],
+            "next_cursor": cache_result.get('next_cursor')
+        })
     
     # Fallback to original implementation if cache fails
     # This should not happen as the cache service handles fallbacks internally
@@ -117,176 +262,145 @@ async def list_documents(
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: int,
-    db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID
+    db: Session = Depends(get_db_ro),
+    user_id: int = Depends(get_current_user_id),
+    request_cache: Dict[Any, Any] = Depends(get_request_cache)
 ):
     """
     Get a specific document by ID with caching.
     """
-    # Try to get from cache first
-    doc_data = await document_cache.get_document_metadata(document_id, db, user_id)
+    key = ("document_metadata", document_id, user_id)
+    if key not in request_cache:
+        # Try to get from cache first
+        request_cache[key] = await document_cache.get_document_metadata(document_id, db, user_id)
+    doc_data = request_cache[key]
     
     if not doc_data:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Format file size
-    size_mb = doc_data['file_size'] / (1024 * 1024)
-    if size_mb < 1:
-        size_str = f"{doc_data['file_size'] / 1024:.1f} KB"
-    else:
-        size_str = f"{size_mb:.1f} MB"
-
-    # Calculate processing progress for processing documents
-    processing_progress = None
-    if doc_data['status'] == DocumentStatus.PROCESSING:
-        processing_progress = 65
-
-    return DocumentResponse(
-        id=doc_data['id'],
-        title=doc_data['title'],
-        original_filename=doc_data['original_filename'],
-        document_type=doc_data['document_type'],
-        status=doc_data['status'],
-        category=doc_data['category'], # Include category
-        file_size=doc_data['file_size'],
-        file_size_display=size_str,
-        page_count=doc_data['page_count'],
-        word_count=doc_data['word_count'],
-        language=doc_data['language'],
-        processing_progress=processing_progress,
-        processing_error=doc_data['processing_error'],
-        created_at=doc_data['created_at'],
-        updated_at=doc_data['updated_at'],
-        processed_at=doc_data['processed_at']
-    )
+    return _to_response(doc_data)
 
 @router.put("/{document_id}", response_model=DocumentResponse)
 async def update_document(
     document_id: int,
     update_data: DocumentUpdateRequest,
     db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID
+    user_id: int = Depends(get_current_user_id),
+    request_cache: Dict[Any, Any] = Depends(get_request_cache)
 ):
     """
     Update document metadata (title, etc.).
     """
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.owner_id == user_id,
-        Document.status != DocumentStatus.DELETED.value
-    ).first()
+    # Update fields if provided
+    values = update_data.model_dump(exclude_none=True)
+    if not values:
+        document = _load_document(db, request_cache, document_id, user_id)
+        if not document or document.status == _DELETED:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return _to_response(document)
+
+    # UPDATE ... RETURNING writes and reads back the row in one round-trip
+    # (updated_at is filled by the column's onupdate)
+    row = db.execute(
+        update(Document)
+        .where(
+            Document.id == document_id,
+            Document.owner_id == user_id,
+            Document.status != _DELETED
+        )
+        .values(**values)
+        .returning(*_RETURNING_COLUMNS)
+    ).mappings().first()
 
-    if not document:
+    if not row:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Update fields if provided
-    if update_data.title is not None:
-        document.title = update_data.title
-    
-    if update_data.category is not None:
-        document.category = update_data.category
-
     db.commit()
-    db.refresh(document)
-
-    # Invalidate caches for this document and user
-    await document_cache.invalidate_document_cache(document_id)
-    await document_cache.invalidate_user_list_cache(user_id)
-    
-    # Invalidate conversation caches for this document
-    conversation_cache = get_conversation_cache()
-    await conversation_cache.invalidate_conversation_caches(document_id=document_id)
-
-    # Format file size
-    size_mb = document.file_size / (1024 * 1024)
-    if size_mb < 1:
-        size_str = f"{document.file_size / 1024:.1f} KB"
-    else:
-        size_str = f"{size_mb:.1f} MB"
-
-    # Calculate processing progress for processing documents
-    processing_progress = None
-    if document.status == DocumentStatus.PROCESSING.value:
-        processing_progress = 65
-
-    return DocumentResponse(
-        id=document.id,
-        title=document.title,
-        original_filename=document.original_filename,
-        document_type=document.document_type,
-        status=document.status,
-        category=document.category, # Include category
-        file_size=document.file_size,
-        file_size_display=size_str,
-        page_count=document.page_count,
-        word_count=document.word_count,
-        language=document.language,
-        processing_progress=processing_progress,
-        processing_error=document.processing_error,
-        created_at=document.created_at,
-        updated_at=document.updated_at,
-        processed_at=document.processed_at
+    # A RowMapping is not a dict; copy it so _to_payload reads it by key
+    document = dict(row)
+
+    # Invalidate caches for this document, the user's lists and conversations;
+    # the calls are independent, so run them concurrently. Only lists holding
+    # this document or filtering/sorting on an edited column are dropped;
+    # updated_at always changes (onupdate), so lists sorted by it are too.
+    await asyncio.gather(
+        document_cache.invalidate_document_cache(document_id),
+        document_cache.invalidate_lists_for_change(user_id, [document_id], [*values, 'updated_at']),
+        get_conversation_cache().invalidate_conversation_caches(document_id=document_id)
     )
 
+    return _to_response(document)
+
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: int,
     db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID,
+    user_id: int = Depends(get_current_user_id),
     permanent: bool = Query(False, description="Permanently delete (true) or soft delete (false)")
 ):
     """
     Delete a document. By default, performs soft delete (sets status to DELETED).
     Use permanent=true for hard delete.
     """
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.owner_id == user_id
-    ).first()
+    # Only the status is needed; no ORM object is loaded for a delete
+    doc_status = db.execute(
+        select(Document.status).where(
+            Document.id == document_id,
+            Document.owner_id == user_id
+        )
+    ).scalar_one_or_none()
 
-    if not document:
+    if doc_status is None:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    if document.status == DocumentStatus.DELETED.value and not permanent:
+    if doc_status == _DELETED and not permanent:
         raise HTTPException(status_code=400, detail="Document already deleted")
 
     if permanent:
         # Hard delete - remove from database
         # TODO: Also remove file from storage and vector embeddings
-        db.delete(document)
+        db.execute(delete(Document).where(Document.id == document_id))
+        # Core DELETE skips ORM events, so keep the owner's counter (non-deleted
+        # documents only) in sync here
+        if doc_status != _DELETED:
+            db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(document_count=User.document_count - 1)
+            )
         db.commit()
-        
-        # Invalidate caches
-        await document_cache.invalidate_document_cache(document_id)
-        await document_cache.invalidate_user_list_cache(user_id)
-        await search_cache.invalidate_document_search_cache(document_id)
-        
-        # Invalidate conversation caches for this document
-        conversation_cache = get_conversation_cache()
-        await conversation_cache.invalidate_conversation_caches(document_id=document_id)
-        
-        return {"message": "Document permanently deleted", "document_id": document_id}
+        message = "Document permanently deleted"
     else:
-        # Soft delete - set status to DELETED
-        document.status = DocumentStatus.DELETED.value
+        # Soft delete - set status to DELETED; the status guard makes a concurrent
+        # soft delete of the same document decrement the counter only once
+        result = db.execute(
+            update(Document)
+            .where(Document.id == document_id, Document.status != _DELETED)
+            .values(status=_DELETED)
+        )
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(document_count=User.document_count - result.rowcount)
+        )
         db.commit()
-        
-        # Invalidate caches
-        await document_cache.invalidate_document_cache(document_id)
-        await document_cache.invalidate_user_list_cache(user_id)
-        await search_cache.invalidate_document_search_cache(document_id)
-        
-        # Invalidate conversation caches for this document
-        conversation_cache = get_conversation_cache()
-        await conversation_cache.invalidate_conversation_caches(document_id=document_id)
-        
-        return {"message": "Document deleted", "document_id": document_id}
+        message = "Document deleted"
+
+    # Invalidate document, list, search and conversation caches concurrently
+    await asyncio.gather(
+        document_cache.invalidate_document_cache(document_id),
+        document_cache.invalidate_user_list_cache(user_id),
+        search_cache.invalidate_document_search_cache(document_id),
+        get_conversation_cache().invalidate_conversation_caches(document_id=document_id)
+    )
+
+    return {"message": message, "document_id": document_id}
 
 @router.post("/bulk-delete")
 async def bulk_delete_documents(
     document_ids: List[int],
     db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID,
+    user_id: int = Depends(get_current_user_id),
     permanent: bool = Query(False, description="Permanently delete (true) or soft delete (false)")
 ):
     """
@@ -298,41 +412,58 @@ async def bulk_delete_documents(
     if len(document_ids) > 100:
         raise HTTPException(status_code=400, detail="Cannot delete more than 100 documents at once")
 
-    # Fetch documents
-    documents = db.query(Document).filter(
-        Document.id.in_(document_ids),
-        Document.owner_id == user_id
-    ).all()
-
-    if not documents:
+    # Only id and status are needed to report found/missing documents and to
+    # tell which ones still need a soft delete. IN lists are chunked to the
+    # dialect's parameter limit; everything runs in one transaction.
+    rows = []
+    for chunk in in_list_chunks(db, document_ids):
+        rows += db.query(Document.id, Document.status).filter(
+            Document.id.in_(chunk),
+            Document.owner_id == user_id
+        ).all()
+    found_ids = {doc_id for doc_id, _ in rows}
+
+    if not found_ids:
         raise HTTPException(status_code=404, detail="No documents found")
 
-    found_ids = {doc.id for doc in documents}
     missing_ids = set(document_ids) - found_ids
     
+    # One statement per chunk instead of one per document
     deleted_count = 0
-    for document in documents:
-        if document.status == DocumentStatus.DELETED.value and not permanent:
-            continue  # Skip already deleted documents
-            
-        if permanent:
-            # Hard delete
-            db.delete(document)
-        else:
-            # Soft delete
-            document.status = DocumentStatus.DELETED.value
-        deleted_count += 1
+    if permanent:
+        for chunk in in_list_chunks(db, found_ids):
+            deleted_count += db.query(Document).filter(
+                Document.id.in_(chunk)
+            ).delete(synchronize_session=False)
+        # The counter only covers non-deleted documents
+        active_removed = sum(1 for _, doc_status in rows if doc_status != _DELETED)
+    else:
+        # Already deleted documents are skipped; no statement at all if that is every one
+        pending_ids = [doc_id for doc_id, doc_status in rows if doc_status != _DELETED]
+        for chunk in in_list_chunks(db, pending_ids):
+            deleted_count += db.query(Document).filter(
+                Document.id.in_(chunk),
+                Document.status != _DELETED
+            ).update({Document.status: _DELETED}, synchronize_session=False)
+        active_removed = deleted_count
+    # Bulk statements skip ORM events, so keep the owner's counter in sync here
+    if active_removed:
+        db.query(User).filter(User.id == user_id).update(
+            {User.document_count: User.document_count - active_removed},
+            synchronize_session=False
+        )
 
     db.commit()
 
-    # Invalidate caches for all affected documents and user lists
-    conversation_cache = get_conversation_cache()
-    for doc_id in found_ids:
-        await document_cache.invalidate_document_cache(doc_id)
-        await search_cache.invalidate_document_search_cache(doc_id)
-        # Invalidate conversation caches for each document
-        await conversation_cache.invalidate_conversation_caches(document_id=doc_id)
-    await document_cache.invalidate_user_list_cache(user_id)
+    # Invalidate caches for all affected documents and user lists; each call
+    # is a batched round-trip, and the four are independent
+    affected_ids = list(found_ids)
+    await asyncio.gather(
+        document_cache.invalidate_documents_bulk(affected_ids),
+        search_cache.invalidate_documents_bulk(affected_ids),
+        get_conversation_cache().invalidate_documents_bulk(affected_ids),
+        document_cache.invalidate_user_list_cache(user_id)
+    )
 
     response_data = {
         "message": f"Successfully deleted {deleted_count} documents",
@@ -348,53 +479,44 @@ async def bulk_delete_documents(
 
 @router.get("/stats/summary")
 async def get_document_stats(
-    db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID
+    db: Session = Depends(get_db_ro),
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Get document statistics for the current user.
+    
+    Cached per user for a few seconds and dropped whenever the user's documents change.
     """
-    # Get counts by status
-    status_counts = {}
-    for status_enum in DocumentStatus:
-        if status_enum == DocumentStatus.DELETED:
-            continue
-        count = db.query(Document).filter(
-            Document.owner_id == user_id,
-            Document.status == status_enum.value
-        ).count()
-        status_counts[status_enum.value] = count
-
-    # Get counts by document type
-    type_counts = {}
-    for doc_type_enum in DocumentType:
-        count = db.query(Document).filter(
-            Document.owner_id == user_id,
-            Document.document_type == doc_type_enum.value,
-            Document.status != DocumentStatus.DELETED.value
-        ).count()
-        type_counts[doc_type_enum.value] = count
-
-    # Get total storage used
-    total_size = db.query(db.func.sum(Document.file_size)).filter(
-        Document.owner_id == user_id,
-        Document.status != DocumentStatus.DELETED.value
-    ).scalar() or 0
-
-    # Format total size
-    if total_size < 1024:
-        size_display = f"{total_size} B"
-    elif total_size < 1024 * 1024:
-        size_display = f"{total_size / 1024:.1f} KB"
-    elif total_size < 1024 * 1024 * 1024:
-        size_display = f"{total_size / (1024 * 1024):.1f} MB"
-    else:
-        size_display = f"{total_size / (1024 * 1024 * 1024):.1f} GB"
-
-    return {
+    cached = await document_cache.get_stats_summary(user_id)
+    if cached:
+        return cached
+    
+    # One scan grouped by (status, type); both breakdowns and the storage
+    # total are folded together below
+    rows = _active_for(db, user_id).with_entities(
+        Document.status,
+        Document.document_type,
+        func.count(),
+        func.coalesce(func.sum(Document.file_size), 0)
+    ).group_by(Document.status, Document.document_type).all()
+
+    # Start from zero so statuses/types without documents are still reported
+    status_counts = dict.fromkeys(_STATUS_VALUES, 0)
+    type_counts = dict.fromkeys(_TYPE_VALUES, 0)
+    total_size = 0
+    for status_value, type_value, count, size in rows:
+        if status_value in status_counts:
+            status_counts[status_value] += count
+        if type_value in type_counts:
+            type_counts[type_value] += count
+        total_size += size
+
+    summary = {
         "total_documents": sum(status_counts.values()),
         "status_counts": status_counts,
         "type_counts": type_counts,
         "total_storage_bytes": total_size,
-        "total_storage_display": size_display
-    } 
\ No newline at end of file
+        "total_storage_display": format_file_size(total_size)
+    }
+    await document_cache.cache_stats_summary(user_id, summary)
+    return summary 
\ No newline at end of file
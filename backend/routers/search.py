@@ -1,22 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from starlette.background import BackgroundTask
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
+from sqlalchemy import select
 from typing import List, Optional
-from backend.core.database import get_db
+from backend.core.database import get_db, db_session
+from backend.deps.auth import get_current_user_id, reject_user_id_param
 from backend.services.search_cache import search_cache
 from services.embedding_service import EmbeddingService
 from services.hybrid_search import hybrid_search_engine
-from models.document import Document
+from backend.models.document import Document
 from schemas.search import SearchQuery, SearchResult, SearchResponse, HybridSearchQuery, HybridSearchResponse
 import asyncio
+import logging
+import time
+from datetime import datetime
 
-router = APIRouter(prefix="/search", tags=["search"])
+router = APIRouter(prefix="/search", tags=["search"], dependencies=[Depends(reject_user_id_param)])
+logger = logging.getLogger(__name__)
+
+# Validates a page of raw result dicts in a single call
+_SEARCH_RESULT_LIST = TypeAdapter(List[SearchResult])
 
 # Create a module-level instance of EmbeddingService
 embedding_service_instance = EmbeddingService()
+# Settings are read once per process, so the model name is fixed
+_EMBED_MODEL_NAME = embedding_service_instance.settings.embedding_model
+
+
+async def _get_query_embedding(query_text: str) -> List[float]:
+    """Embed a query, reusing the Redis copy shared across users and search options."""
+    embedding = await search_cache.get_query_embedding(query_text, _EMBED_MODEL_NAME)
+    if embedding is None:
+        embedding = await embedding_service_instance.get_embedding(query_text)
+        await search_cache.cache_query_embedding(query_text, _EMBED_MODEL_NAME, embedding)
+    return embedding
+
+
+async def _run_semantic_search(query: SearchQuery, user_id: int, db: Session) -> SearchResponse:
+    """Run a semantic search against Qdrant and the database, and cache the response."""
+    search_results = await embedding_service_instance.search_similar_chunks(
+        query_text=query.query,
+        user_id=user_id,
+        document_id=query.document_id,
+        limit=query.limit,
+        score_threshold=query.score_threshold,
+        query_embedding=await _get_query_embedding(query.query)
+    )
+    
+    # Get document information for each result
+    metadata_columns = select(Document.id, Document.title, Document.document_type)
+    if not search_results:
+        document_ids = []
+        doc_map = {}
+    elif query.document_id:
+        # Qdrant already filtered to this document: one primary-key lookup
+        document_ids = [query.document_id]
+        doc = db.execute(metadata_columns.where(Document.id == query.document_id)).first()
+        doc_map = {doc.id: doc} if doc else {}
+    else:
+        document_ids = list(dict.fromkeys(result["document_id"] for result in search_results))
+        documents = db.execute(metadata_columns.where(Document.id.in_(document_ids))).all()
+        doc_map = {doc.id: doc for doc in documents}
+    
+    # Format results
+    raw_results_for_cache = []
+    
+    for result in search_results:
+        doc = doc_map.get(result["document_id"])
+        if doc:
+            # Plain dict is cached as-is (Pydantic objects aren't JSON serializable)
+            result_data = {
+                "content": result["content"],
+                "score": result["score"],
+                "document_id": result["document_id"],
+                "document_title": doc.title,
+                "document_type": doc.document_type,
+                "chunk_index": result["chunk_index"],
+                "chunk_type": result.get("chunk_type", "paragraph"),
+                "section_header": result.get("section_header"),
+                "token_count": result["token_count"]
+            }
+            raw_results_for_cache.append(result_data)
+    
+    # Validate the whole page in one pass
+    formatted_results = _SEARCH_RESULT_LIST.validate_python(raw_results_for_cache)
+    
+    # Cache the results for future requests
+    search_metadata = {
+        "embedding_model": _EMBED_MODEL_NAME,
+        "score_threshold": query.score_threshold,
+        "documents_searched": len(document_ids) if not query.document_id else 1,
+        "cache_hit": False
+    }
+    
+    await search_cache.cache_semantic_search_response(
+        query=query.query,
+        response={
+            "query": query.query,
+            "total_results": len(raw_results_for_cache),
+            "results": raw_results_for_cache,
+            "search_metadata": {
+                **search_metadata,
+                "cache_hit": True,
+                "cached_at": datetime.utcnow().isoformat()
+            }
+        },
+        user_id=user_id,
+        document_id=query.document_id,
+        limit=query.limit,
+        score_threshold=query.score_threshold
+    )
+    
+    return SearchResponse(
+        query=query.query,
+        total_results=len(formatted_results),
+        results=formatted_results,
+        search_metadata=search_metadata
+    )
+
+
+async def _refresh_semantic_search(query: SearchQuery, user_id: int) -> None:
+    """Re-run a search whose cached response went stale (runs after the response is sent)."""
+    try:
+        with db_session() as db:
+            await _run_semantic_search(query, user_id, db)
+    except Exception:
+        logger.exception("Background semantic search refresh failed")
+
 
 @router.post("/semantic", response_model=SearchResponse)
 async def semantic_search(
     query: SearchQuery,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """
@@ -29,135 +145,62 @@ async def semantic_search(
     4. Caches and returns ranked results with similarity scores
     """
     try:
-        # Try to get results from cache first
-        cached_response = await search_cache.get_semantic_search_results(
+        # Cache hits are stored response-shaped: send the JSON text unchanged
+        cached_body, stale = await search_cache.get_semantic_search_response_raw(
             query=query.query,
-            user_id=query.user_id,
+            user_id=user_id,
             document_id=query.document_id,
             limit=query.limit,
             score_threshold=query.score_threshold
         )
         
-        if cached_response:
-            # Convert cached results back to SearchResult objects
-            formatted_results = []
-            for result_data in cached_response['results']:
-                search_result = SearchResult(
-                    content=result_data["content"],
-                    score=result_data["score"],
-                    document_id=result_data["document_id"],
-                    document_title=result_data["document_title"],
-                    document_type=result_data["document_type"],
-                    chunk_index=result_data["chunk_index"],
-                    chunk_type=result_data.get("chunk_type", "paragraph"),
-                    section_header=result_data.get("section_header"),
-                    token_count=result_data["token_count"]
-                )
-                formatted_results.append(search_result)
-            
-            return SearchResponse(
-                query=cached_response['query'],
-                total_results=cached_response['total_results'],
-                results=formatted_results,
-                search_metadata={
-                    **cached_response['metadata'],
-                    "cache_hit": True,
-                    "cached_at": cached_response.get('cached_at')
-                }
+        if cached_body is not None:
+            refresh = None
+            if stale and await search_cache.claim_semantic_search_refresh(
+                query=query.query,
+                user_id=user_id,
+                document_id=query.document_id,
+                limit=query.limit,
+                score_threshold=query.score_threshold
+            ):
+                # Serve the stale copy now; only the lock holder re-runs the search
+                refresh = BackgroundTask(_refresh_semantic_search, query, user_id)
+            return Response(
+                content=cached_body,
+                media_type="application/json",
+                headers={"X-Cache": "STALE" if stale else "HIT"},
+                background=refresh
             )
         
         # Cache miss - perform actual search
-        search_results = await embedding_service_instance.search_similar_chunks(
-            query_text=query.query,
-            user_id=query.user_id,
-            document_id=query.document_id,
-            limit=query.limit,
-            score_threshold=query.score_threshold
-        )
-        
-        # Get document information for each result
-        document_ids = list(set([result["document_id"] for result in search_results]))
-        documents = db.query(Document).filter(Document.id.in_(document_ids)).all()
-        doc_map = {doc.id: doc for doc in documents}
-        
-        # Format results
-        formatted_results = []
-        raw_results_for_cache = []
-        
-        for result in search_results:
-            doc = doc_map.get(result["document_id"])
-            if doc:
-                # Create SearchResult for response
-                search_result = SearchResult(
-                    content=result["content"],
-                    score=result["score"],
-                    document_id=result["document_id"],
-                    document_title=doc.title,
-                    document_type=doc.document_type.value,
-                    chunk_index=result["chunk_index"],
-                    chunk_type=result.get("chunk_type", "paragraph"),
-                    section_header=result.get("section_header"),
-                    token_count=result["token_count"]
-                )
-                formatted_results.append(search_result)
-                
-                # Create dict for caching (Pydantic objects aren't JSON serializable)
-                raw_results_for_cache.append({
-                    "content": result["content"],
-                    "score": result["score"],
-                    "document_id": result["document_id"],
-                    "document_title": doc.title,
-                    "document_type": doc.document_type.value,
-                    "chunk_index": result["chunk_index"],
-                    "chunk_type": result.get("chunk_type", "paragraph"),
-                    "section_header": result.get("section_header"),
-                    "token_count": result["token_count"]
-                })
-        
-        # Cache the results for future requests
-        search_metadata = {
-            "embedding_model": embedding_service_instance.settings.embedding_model,
-            "score_threshold": query.score_threshold,
-            "documents_searched": len(document_ids) if not query.document_id else 1,
-            "cache_hit": False
-        }
-        
-        await search_cache.cache_semantic_search_results(
-            query=query.query,
-            results=raw_results_for_cache,
-            user_id=query.user_id,
-            document_id=query.document_id,
-            limit=query.limit,
-            score_threshold=query.score_threshold,
-            metadata=search_metadata
-        )
+        return await _run_semantic_search(query, user_id, db)
         
-        return SearchResponse(
-            query=query.query,
-            total_results=len(formatted_results),
-            results=formatted_results,
-            search_metadata=search_metadata
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    except Exception:
+        logger.exception("Search failed")
+        raise HTTPException(status_code=500, detail="Search failed")
+
+def _get_document_title(document_id: int) -> Optional[str]:
+    """Title of a document, or None if it doesn't exist (run via asyncio.to_thread)."""
+    with db_session() as db:
+        return db.execute(
+            select(Document.title).where(Document.id == document_id)
+        ).scalar_one_or_none()
 
 @router.get("/documents/{document_id}/chunks")
 async def get_document_chunks(
     document_id: int,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = Query(None, ge=0, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100)
 ):
     """
-    Get chunks for a specific document with pagination (cached).
+    Get chunks for a specific document with cursor pagination (cached per page).
     Useful for browsing document content and debugging.
     """
     try:
         # Try to get from cache first
         cached_chunks = await search_cache.get_document_chunks(
             document_id=document_id,
-            skip=skip,
+            cursor=cursor,
             limit=limit
         )
         
@@ -166,29 +209,35 @@ async def get_document_chunks(
             cached_chunks["cache_hit"] = True
             return cached_chunks
         
-        # Cache miss - verify document exists and user has access
-        document = db.query(Document).filter(Document.id == document_id).first()
-        if not document:
-            raise HTTPException(status_code=404, detail="Document not found")
-        
-        # Get chunks info from Qdrant
-        chunks_info = await embedding_service_instance.get_document_chunks_info(document_id)
+        # Cache miss - start reading the page from Qdrant (only this page is
+        # transferred) and check the document while it is in flight
+        page_task = asyncio.create_task(
+            embedding_service_instance.get_document_chunks_page(
+                document_id, limit=limit, after_chunk_index=cursor
+            )
+        )
         
-        if "error" in chunks_info:
-            raise HTTPException(status_code=500, detail=chunks_info["error"])
+        # Verify document exists and user has access; the lookup runs in a
+        # worker thread on its own session so it overlaps the Qdrant read
+        document_title = await asyncio.to_thread(_get_document_title, document_id)
+        if document_title is None:
+            page_task.cancel()
+            # Mark a failure nobody will await as retrieved
+            page_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            raise HTTPException(status_code=404, detail="Document not found")
         
-        # Apply pagination
-        chunks = chunks_info["chunks"][skip:skip + limit]
+        page = await page_task
         
         response_data = {
             "document_id": document_id,
-            "document_title": document.title,
-            "total_chunks": chunks_info["total_chunks"],
-            "chunks": chunks,
+            "document_title": document_title,
+            "total_chunks": page["total_chunks"],
+            "chunks": page["chunks"],
             "pagination": {
-                "skip": skip,
+                "cursor": cursor,
                 "limit": limit,
-                "has_more": skip + limit < chunks_info["total_chunks"]
+                "has_more": page["has_more"],
+                "next_cursor": page["next_cursor"]
             },
             "cache_hit": False
         }
@@ -197,7 +246,7 @@ async def get_document_chunks(
         await search_cache.cache_document_chunks(
             document_id=document_id,
             chunks_data=response_data,
-            skip=skip,
+            cursor=cursor,
             limit=limit
         )
         
@@ -205,8 +254,9 @@ async def get_document_chunks(
         
     except HTTPException:
         raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get chunks: {str(e)}")
+    except Exception:
+        logger.exception("Failed to get chunks")
+        raise HTTPException(status_code=500, detail="Failed to get chunks")
 
 @router.get("/collection/info")
 async def get_collection_info():
@@ -218,13 +268,14 @@ async def get_collection_info():
         collection_info = await embedding_service_instance.get_collection_info()
         return collection_info
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get collection info: {str(e)}")
+    except Exception:
+        logger.exception("Failed to get collection info")
+        raise HTTPException(status_code=500, detail="Failed to get collection info")
 
 @router.post("/documents/{document_id}/reindex")
 async def reindex_document(
     document_id: int,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """
@@ -250,8 +301,9 @@ async def reindex_document(
         
     except HTTPException:
         raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start re-indexing: {str(e)}")
+    except Exception:
+        logger.exception("Failed to start re-indexing")
+        raise HTTPException(status_code=500, detail="Failed to start re-indexing")
 
 @router.delete("/documents/{document_id}/vectors")
 async def delete_document_vectors(
@@ -281,13 +333,14 @@ async def delete_document_vectors(
             
     except HTTPException:
         raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete vectors: {str(e)}")
+    except Exception:
+        logger.exception("Failed to delete vectors")
+        raise HTTPException(status_code=500, detail="Failed to delete vectors")
 
 @router.post("/similar-documents")
 async def find_similar_documents(
     query: str,
-    user_id: int,
+    user_id: int = Depends(get_current_user_id),
     limit: int = Query(5, ge=1, le=20),
     score_threshold: float = Query(0.7, ge=0.0, le=1.0),
     db: Session = Depends(get_db)
@@ -297,73 +350,57 @@ async def find_similar_documents(
     Returns document-level results rather than chunk-level.
     """
     try:
-        # Search for similar chunks
-        search_results = await embedding_service_instance.search_similar_chunks(
-            query_text=query,
+        # Qdrant groups the matching chunks by document and ranks the groups
+        groups = await embedding_service_instance.search_similar_documents(
+            query_embedding=await _get_query_embedding(query),
             user_id=user_id,
-            limit=limit * 3,  # Get more chunks to find diverse documents
+            limit=limit,
             score_threshold=score_threshold
         )
         
-        # Group by document and calculate document-level scores
-        document_scores = {}
-        for result in search_results:
-            doc_id = result["document_id"]
-            score = result["score"]
-            
-            if doc_id not in document_scores:
-                document_scores[doc_id] = {
-                    "max_score": score,
-                    "avg_score": score,
-                    "chunk_count": 1,
-                    "total_score": score
-                }
-            else:
-                doc_scores = document_scores[doc_id]
-                doc_scores["max_score"] = max(doc_scores["max_score"], score)
-                doc_scores["chunk_count"] += 1
-                doc_scores["total_score"] += score
-                doc_scores["avg_score"] = doc_scores["total_score"] / doc_scores["chunk_count"]
-        
         # Get document information
-        document_ids = list(document_scores.keys())
-        documents = db.query(Document).filter(Document.id.in_(document_ids)).all()
+        documents = db.execute(
+            select(Document.id, Document.title, Document.document_type, Document.word_count, Document.created_at)
+            .where(Document.id.in_([group["document_id"] for group in groups]))
+        ).all() if groups else []
+        doc_map = {doc.id: doc for doc in documents}
         
-        # Format results
+        # Format results, keeping Qdrant's max-score order
         similar_documents = []
-        for doc in documents:
-            scores = document_scores[doc.id]
+        for group in groups:
+            doc = doc_map.get(group["document_id"])
+            if doc is None:
+                continue
             similar_documents.append({
                 "document_id": doc.id,
                 "title": doc.title,
-                "document_type": doc.document_type.value,
-                "max_score": scores["max_score"],
-                "avg_score": scores["avg_score"],
-                "matching_chunks": scores["chunk_count"],
+                "document_type": doc.document_type,
+                "max_score": group["max_score"],
+                "avg_score": group["avg_score"],
+                "matching_chunks": group["matching_chunks"],
                 "created_at": doc.created_at.isoformat(),
                 "word_count": doc.word_count
             })
         
-        # Sort by max score and limit
-        similar_documents.sort(key=lambda x: x["max_score"], reverse=True)
-        
         return {
             "query": query,
             "total_documents": len(similar_documents),
-            "documents": similar_documents[:limit],
+            "documents": similar_documents,
             "search_metadata": {
                 "user_id": user_id,
                 "score_threshold": score_threshold,
-                "chunks_analyzed": len(search_results)
+                "chunks_analyzed": sum(group["matching_chunks"] for group in groups)
             }
         }
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Similar documents search failed: {str(e)}")
+    except Exception:
+        logger.exception("Similar documents search failed")
+        raise HTTPException(status_code=500, detail="Similar documents search failed")
 
 @router.post("/hybrid", response_model=HybridSearchResponse)
 async def hybrid_search(
     query: HybridSearchQuery,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """
@@ -376,20 +413,20 @@ async def hybrid_search(
     4. Fuses results using specified fusion method
     5. Returns ranked results with detailed scoring
     """
-    import time
     start_time = time.time()
     
     try:
         # Perform hybrid search
         results = await hybrid_search_engine.hybrid_search(
             query=query.query,
-            user_id=query.user_id,
+            user_id=user_id,
             document_id=query.document_id,
             limit=query.limit,
             vector_weight=query.vector_weight,
             keyword_weight=query.keyword_weight,
             fusion_method=query.fusion_method,
-            db_session=db
+            db_session=db,
+            query_embedding=await _get_query_embedding(query.query)
         )
         
         total_time = time.time() - start_time
@@ -416,7 +453,7 @@ async def hybrid_search(
             total_results=len(results),
             results=hybrid_results,
             search_metadata={
-                "user_id": query.user_id,
+                "user_id": user_id,
                 "document_id": query.document_id,
                 "total_time": total_time,
                 "search_method": "hybrid"
@@ -432,14 +469,15 @@ async def hybrid_search(
             }
         )
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Hybrid search failed: {str(e)}")
+    except Exception:
+        logger.exception("Hybrid search failed")
+        raise HTTPException(status_code=500, detail="Hybrid search failed")
 
 @router.get("/compare/{document_id}")
 async def compare_search_methods(
     document_id: int,
     query: str = Query(..., description="Search query to compare"),
-    user_id: int = Query(..., description="User ID"),
+    user_id: int = Depends(get_current_user_id),
     limit: int = Query(5, description="Number of results per method"),
     db: Session = Depends(get_db)
 ):
@@ -453,47 +491,52 @@ async def compare_search_methods(
     4. Hybrid search (RRF)
     """
     try:
-        import time
         start_time = time.time()
         
-        # Vector search only
-        vector_results = await embedding_service_instance.search_similar_chunks(
-            query_text=query,
-            user_id=user_id,
-            document_id=document_id,
-            limit=limit,
-            score_threshold=0.1
-        )
-        
-        # Hybrid search - weighted
-        hybrid_weighted = await hybrid_search_engine.hybrid_search(
-            query=query,
-            user_id=user_id,
-            document_id=document_id,
-            limit=limit,
-            vector_weight=0.7,
-            keyword_weight=0.3,
-            fusion_method="weighted",
-            db_session=db
-        )
-        
-        # Hybrid search - RRF
-        hybrid_rrf = await hybrid_search_engine.hybrid_search(
-            query=query,
-            user_id=user_id,
-            document_id=document_id,
-            limit=limit,
-            vector_weight=0.5,
-            keyword_weight=0.5,
-            fusion_method="rrf",
-            db_session=db
-        )
-        
-        # Keyword search only (get chunks first)
-        chunks = await hybrid_search_engine._get_chunks_for_keyword_search(
-            user_id=user_id,
-            document_id=document_id,
-            db_session=db
+        # Embed the query once and reuse it for every vector-backed method
+        query_embedding = await _get_query_embedding(query)
+        
+        # The four searches are independent; run them concurrently
+        vector_results, hybrid_weighted, hybrid_rrf, chunks = await asyncio.gather(
+            # Vector search only
+            embedding_service_instance.search_similar_chunks(
+                query_text=query,
+                user_id=user_id,
+                document_id=document_id,
+                limit=limit,
+                score_threshold=0.1,
+                query_embedding=query_embedding
+            ),
+            # Hybrid search - weighted
+            hybrid_search_engine.hybrid_search(
+                query=query,
+                user_id=user_id,
+                document_id=document_id,
+                limit=limit,
+                vector_weight=0.7,
+                keyword_weight=0.3,
+                fusion_method="weighted",
+                db_session=db,
+                query_embedding=query_embedding
+            ),
+            # Hybrid search - RRF
+            hybrid_search_engine.hybrid_search(
+                query=query,
+                user_id=user_id,
+                document_id=document_id,
+                limit=limit,
+                vector_weight=0.5,
+                keyword_weight=0.5,
+                fusion_method="rrf",
+                db_session=db,
+                query_embedding=query_embedding
+            ),
+            # Keyword search only (get chunks first)
+            hybrid_search_engine._get_chunks_for_keyword_search(
+                user_id=user_id,
+                document_id=document_id,
+                db_session=db
+            )
         )
         keyword_results = hybrid_search_engine._keyword_search(query, chunks, limit)
         
@@ -549,5 +592,6 @@ async def compare_search_methods(
             }
         }
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Search comparison failed: {str(e)}")
\ No newline at end of file
+    except Exception:
+        logger.exception("Search comparison failed")
+        raise HTTPException(status_code=500, detail="Search comparison failed")
\ No newline at end of file
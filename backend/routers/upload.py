@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 import asyncio
 import os
+from pathlib import Path
 
+from backend.core.config import get_settings
 from backend.core.database import get_db
+from backend.deps.auth import get_current_user_id
 from backend.services.file_service import file_service
 from backend.services.websocket_service import websocket_manager, ProgressType
 from backend.services.document_cache import document_cache
@@ -16,11 +19,30 @@ from backend.models.document import Document, DOCUMENT_STATUS_UPLOADING, DOCUMEN
 
 router = APIRouter(prefix="/api/upload", tags=["Upload"])
 
-# Mock user_id for now (will be replaced with actual authentication)
-CURRENT_USER_ID = 1
+settings = get_settings()
+
+# Admission control: at most this many uploads are streamed, hashed and
+# deduplicated at once in this worker, so bursts can't exhaust memory or disk I/O
+_UPLOAD_SLOTS = asyncio.Semaphore(settings.max_concurrent_uploads)
+
+# Progress percentage and human-readable step reported for each document status
+_PROGRESS_MAP = {
+    DOCUMENT_STATUS_UPLOADING: 20,
+    DOCUMENT_STATUS_PROCESSING: 60,
+    DOCUMENT_STATUS_READY: 100,
+    DOCUMENT_STATUS_ERROR: 0,
+    DOCUMENT_STATUS_DELETED: 0
+}
+_STATUS_DESCRIPTIONS = {
+    DOCUMENT_STATUS_UPLOADING: "Uploading file...",
+    DOCUMENT_STATUS_PROCESSING: "Processing document...",
+    DOCUMENT_STATUS_READY: "Ready for conversations",
+    DOCUMENT_STATUS_ERROR: "Processing failed",
+    DOCUMENT_STATUS_DELETED: "File deleted"
+}
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, user_id: int = CURRENT_USER_ID):
+async def websocket_endpoint(websocket: WebSocket, user_id: int = Depends(get_current_user_id)):
     """WebSocket endpoint for real-time upload and processing updates."""
     await websocket_manager.connect(websocket, user_id)
     try:
@@ -35,13 +57,45 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int = CURRENT_USER_I
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket, user_id)
 
+async def _notify_duplicate(result: dict, user_id: int):
+    """Tell the user's sockets that an upload matched a document they already have."""
+    await websocket_manager.send_completion_message(
+        user_id=user_id,
+        document_id=result["document_id"],
+        status="duplicate",
+        message="File already exists in your library",
+        metadata={"existing_document": result["existing_document"].id}
+    )
+
+async def _start_processing(document: Document, user_id: int) -> str:
+    """Drop caches a new document makes stale, report the upload done and queue processing; returns the task id."""
+    # Invalidate user's document list cache since a new document was added
+    await document_cache.invalidate_user_list_cache(user_id)
+    # Invalidate user's search cache since document collection changed
+    await search_cache.invalidate_user_search_cache(user_id)
+    # Invalidate conversation caches since document collection changed
+    conversation_cache = get_conversation_cache()
+    await conversation_cache.invalidate_conversation_caches(user_id=user_id)
+    
+    # Send upload completion
+    await websocket_manager.send_upload_progress(
+        user_id=user_id,
+        document_id=document.id,
+        progress_percent=100,
+        current_step="Upload completed"
+    )
+    
+    # Start Celery task for document processing
+    from tasks.document_tasks import process_document_task
+    task_result = process_document_task.delay(document.id, user_id)
+    return task_result.id
+
 @router.post("/file", response_model=DocumentUploadResponse)
 async def upload_file(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     title: Optional[str] = Form(None),
     db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Upload a document file with automatic processing.
@@ -59,18 +113,24 @@ async def upload_file(
             current_step="Starting upload..."
         )
         
+        # Wait for an upload slot, shedding load if none frees up in time
+        try:
+            await asyncio.wait_for(_UPLOAD_SLOTS.acquire(), timeout=settings.upload_slot_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many uploads in progress, please retry shortly",
+                headers={"Retry-After": str(max(1, round(settings.upload_slot_timeout)))}
+            )
+        
         # Handle file upload
-        result = await file_service.handle_file_upload(db, file, user_id)
+        try:
+            result = await file_service.handle_file_upload(db, file, user_id)
+        finally:
+            _UPLOAD_SLOTS.release()
         
         if result["status"] == "duplicate":
-            # Send duplicate notification
-            await websocket_manager.send_completion_message(
-                user_id=user_id,
-                document_id=result["document_id"],
-                status="duplicate",
-                message="File already exists in your library",
-                metadata={"existing_document": result["existing_document"].id}
-            )
+            await _notify_duplicate(result, user_id)
             
             return DocumentUploadResponse(
                 document_id=result["document_id"],
@@ -85,30 +145,12 @@ async def upload_file(
             document.title = title
             db.commit()
         
-        # Invalidate user's document list cache since a new document was added
-        await document_cache.invalidate_user_list_cache(user_id)
-        # Invalidate user's search cache since document collection changed
-        await search_cache.invalidate_user_search_cache(user_id)
-        # Invalidate conversation caches since document collection changed
-        conversation_cache = get_conversation_cache()
-        await conversation_cache.invalidate_conversation_caches(user_id=user_id)
-        
-        # Send upload completion
-        await websocket_manager.send_upload_progress(
-            user_id=user_id,
-            document_id=document.id,
-            progress_percent=100,
-            current_step="Upload completed"
-        )
-        
-        # Start Celery task for document processing
-        from tasks.document_tasks import process_document_task
-        task_result = process_document_task.delay(document.id, user_id)
+        task_id = await _start_processing(document, user_id)
         
         return DocumentUploadResponse(
             document_id=document.id,
             status="success",
-            message=f"File uploaded successfully and processing started (Task ID: {task_result.id})"
+            message=f"File uploaded successfully and processing started (Task ID: {task_id})"
         )
         
     except HTTPException:
@@ -135,15 +177,25 @@ async def upload_chunk(
     file_hash: str = Form(...),
     filename: str = Form(...),
     chunk: UploadFile = File(...),
-    user_id: int = CURRENT_USER_ID
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
 ):
     """
     Upload a file chunk for large file support.
     
     This endpoint allows uploading large files in smaller chunks,
     providing better upload reliability and progress tracking.
+    The request that completes the file creates its document (or reports
+    the existing duplicate) and starts processing, like /file.
     """
     try:
+        # Reject unsupported files before any part is stored
+        if not file_service.is_supported_file_type(f"dummy{Path(filename).suffix}"):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file type: {filename}. Supported: PDF, EPUB, TXT, DOCX, MD"
+            )
+        
         # Calculate progress
         progress_percent = int((chunk_index / total_chunks) * 100)
         
@@ -157,12 +209,32 @@ async def upload_chunk(
             total_bytes=total_chunks * file_service.chunk_size
         )
         
-        # TODO: Implement actual chunk storage and assembly
-        # This would involve:
-        # 1. Store chunk in temporary location
-        # 2. Track chunk completion
-        # 3. Assemble final file when all chunks received
-        # 4. Verify final file hash matches expected hash
+        # Store the part; the request that completes the set assembles the file
+        complete = await file_service.store_upload_chunk(user_id, file_hash, chunk_index, total_chunks, chunk)
+        if complete:
+            path, file_size = await file_service.assemble_upload_chunks(user_id, file_hash, total_chunks, filename)
+            result = await file_service.register_chunked_upload(db, path, file_size, file_hash, filename, user_id)
+            
+            if result["status"] == "duplicate":
+                await _notify_duplicate(result, user_id)
+                return {
+                    "status": "duplicate",
+                    "message": result["message"],
+                    "document_id": result["document_id"],
+                    "chunk_index": chunk_index,
+                    "progress_percent": 100,
+                    "file_size": file_size
+                }
+            
+            task_id = await _start_processing(result["document"], user_id)
+            return {
+                "status": "assembled",
+                "message": f"All {total_chunks} chunks received and processing started (Task ID: {task_id})",
+                "document_id": result["document_id"],
+                "chunk_index": chunk_index,
+                "progress_percent": 100,
+                "file_size": file_size
+            }
         
         return {
             "status": "success",
@@ -171,6 +243,14 @@ async def upload_chunk(
             "progress_percent": progress_percent
         }
         
+    except HTTPException as e:
+        await websocket_manager.send_error_message(
+            user_id=user_id,
+            document_id=0,
+            error_message=f"Chunk upload failed: {e.detail}",
+            error_code="CHUNK_UPLOAD_ERROR"
+        )
+        raise
     except Exception as e:
         await websocket_manager.send_error_message(
             user_id=user_id,
@@ -184,47 +264,35 @@ async def upload_chunk(
 async def get_upload_status(
     document_id: int,
     db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID
+    user_id: int = Depends(get_current_user_id)
 ):
     """Get the current processing status of an uploaded document."""
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.owner_id == user_id
-    ).first()
+    # Polled by clients during processing, so served from a short-lived cache
+    document = await document_cache.get_document_status(document_id, db, user_id)
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Calculate progress percentage based on status
-    progress_map = {
-        DocumentStatus.UPLOADING: 20,
-        DocumentStatus.PROCESSING: 60,
-        DocumentStatus.READY: 100,
-        DocumentStatus.ERROR: 0,
-        DocumentStatus.DELETED: 0
-    }
-    
     return DocumentProcessingStatus(
-        document_id=document.id,
-        status=document.status,
-        progress_percentage=progress_map.get(document.status, 0),
-        current_step=get_status_description(document.status),
-        error_message=document.processing_error
+        document_id=document_id,
+        status=document['status'],
+        progress_percentage=_PROGRESS_MAP.get(document['status'], 0),
+        current_step=get_status_description(document['status']),
+        error_message=document['processing_error']
     )
 
 @router.delete("/file/{document_id}")
 async def delete_file(
     document_id: int,
     db: Session = Depends(get_db),
-    user_id: int = CURRENT_USER_ID
+    user_id: int = Depends(get_current_user_id)
 ):
     """Delete an uploaded file and its database record."""
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.owner_id == user_id
-    ).first()
+    # Primary-key lookup (served from the identity map when already loaded);
+    # ownership is checked on the row
+    document = db.get(Document, document_id)
     
-    if not document:
+    if not document or document.owner_id != user_id:
         raise HTTPException(status_code=404, detail="Document not found")
     
     # Delete file from filesystem
@@ -233,6 +301,7 @@ async def delete_file(
     # Update database record
     document.status = DOCUMENT_STATUS_DELETED
     db.commit()
+    await document_cache.invalidate_document_cache(document_id)
     
     return {"message": "File deleted successfully"}
 
@@ -240,11 +309,4 @@ async def delete_file(
 
 def get_status_description(status: str) -> str: # Change type hint to str
     """Get human-readable status description."""
-    descriptions = {
-        DOCUMENT_STATUS_UPLOADING: "Uploading file...",
-        DOCUMENT_STATUS_PROCESSING: "Processing document...",
-        DOCUMENT_STATUS_READY: "Ready for conversations",
-        DOCUMENT_STATUS_ERROR: "Processing failed",
-        DOCUMENT_STATUS_DELETED: "File deleted"
-    }
-    return descriptions.get(status, "Unknown status")
\ No newline at end of file
+    return _STATUS_DESCRIPTIONS.get(status, "Unknown status")
\ No newline at end of file
@@ -49,7 +49,7 @@ class Document(DocumentBase):
     id: int
     original_filename: str
     file_size: int
-    file_hash: str
+    file_hash: Optional[str] = None
     mime_type: str
     document_type: str # Change to str
     status: str # Change to str
@@ -95,6 +95,7 @@ class DocumentListResponse(BaseModel):
     skip: int
     limit: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 # Schema for document metadata
 class DocumentMetadata(BaseModel):
@@ -1,10 +1,11 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 
 class SearchQuery(BaseModel):
-    """Schema for search query requests."""
+    """Schema for search query requests. The user comes from the request credentials."""
+    model_config = ConfigDict(extra="forbid")
+    
     query: str = Field(..., description="Search query text", min_length=1, max_length=1000)
-    user_id: int = Field(..., description="ID of the user performing the search")
     document_id: Optional[int] = Field(None, description="Optional document ID to limit search scope")
     limit: int = Field(10, ge=1, le=50, description="Maximum number of results to return")
     score_threshold: float = Field(0.5, ge=0.0, le=1.0, description="Minimum similarity score threshold")
@@ -53,10 +54,6 @@ class CollectionInfo(BaseModel):
     status: Optional[str] = Field(None, description="Status of the collection")
     config: Dict[str, Any] = Field(..., description="Configuration of the collection")
 
-class ReindexRequest(BaseModel):
-    """Schema for document reindex request."""
-    user_id: int = Field(..., description="ID of the user requesting reindex")
-
 class ReindexResponse(BaseModel):
     """Schema for reindex response."""
     message: str = Field(..., description="Response message")
@@ -104,9 +101,10 @@ class SearchDebugInfo(BaseModel):
     qdrant_response: Dict[str, Any] = Field(..., description="Raw Qdrant response metadata")
 
 class HybridSearchQuery(BaseModel):
-    """Schema for hybrid search query requests."""
+    """Schema for hybrid search query requests. The user comes from the request credentials."""
+    model_config = ConfigDict(extra="forbid")
+    
     query: str = Field(..., description="Search query text", min_length=1, max_length=1000)
-    user_id: int = Field(..., description="ID of the user performing the search")
     document_id: Optional[int] = Field(None, description="Optional document ID to limit search scope")
     limit: int = Field(10, ge=1, le=50, description="Maximum number of results to return")
     vector_weight: Optional[float] = Field(0.7, ge=0.0, le=1.0, description="Weight for vector search component")
@@ -18,6 +18,7 @@ from backend.core.redis import RedisClient
 from backend.services.document_cache import get_document_cache
 from backend.services.search_cache import get_search_cache
 from backend.services.conversation_cache import get_conversation_cache
+from backend.utils.concurrency import bounded_gather
 
 logger = logging.getLogger(__name__)
 
@@ -64,26 +65,23 @@ class CacheMonitor:
         try:
             self._init_cache_services()
             
-            # Get Redis server stats
-            redis_stats = await self.redis.get_detailed_stats()
-            
-            # Get individual cache service stats
-            cache_stats = {}
-            
-            try:
-                cache_stats["document_cache"] = await self.document_cache.get_cache_stats()
-            except Exception as e:
-                cache_stats["document_cache"] = {"error": str(e)}
+            services = {
+                "document_cache": self.document_cache,
+                "search_cache": self.search_cache,
+                "conversation_cache": self.conversation_cache
+            }
             
-            try:
-                cache_stats["search_cache"] = await self.search_cache.get_cache_stats()
-            except Exception as e:
-                cache_stats["search_cache"] = {"error": str(e)}
+            # Redis server stats and individual cache service stats are independent
+            redis_stats, *service_results = await bounded_gather(
+                self.redis.get_detailed_stats,
+                *(service.get_cache_stats for service in services.values())
+            )
+            if isinstance(redis_stats, Exception):
+                raise redis_stats
             
-            try:
-                cache_stats["conversation_cache"] = await self.conversation_cache.get_cache_stats()
-            except Exception as e:
-                cache_stats["conversation_cache"] = {"error": str(e)}
+            cache_stats = {}
+            for name, result in zip(services, service_results):
+                cache_stats[name] = {"error": str(result)} if isinstance(result, Exception) else result
             
             # Calculate aggregated metrics
             total_cache_entries = 0
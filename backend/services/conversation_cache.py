@@ -14,13 +14,31 @@ import logging
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, timedelta
 
-from backend.core.redis import RedisClient
+from backend.core.redis import RedisClient, conversation_hashtag
 from backend.schemas.dialogue import QueryResponse, ConversationMessage
 from backend.schemas.conversation import Message, ChatResponse
 
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - xxhash is listed in requirements.txt
+    xxhash = None
+
 logger = logging.getLogger(__name__)
 
 
+def _fast_hash(data: str) -> str:
+    """
+    128-bit non-cryptographic digest for cache keys.
+    
+    Uses xxh3 when available; blake2b is the stdlib fallback. Both are much
+    cheaper than sha256/md5 on long conversation histories.
+    """
+    payload = data.encode()
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(payload)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
 class ConversationCache:
     """Conversation and query result caching service"""
     
@@ -32,6 +50,7 @@ class ConversationCache:
         self.ttl_conversation_history = 60 * 60 * 2  # 2 hours - Conversation histories
         self.ttl_model_responses = 60 * 60 * 24  # 24 hours - Model responses (longer for cost savings)
         self.ttl_conversation_context = 60 * 15  # 15 minutes - Active conversation context
+        self.ttl_stream_replay = 60 * 10  # 10 minutes - Recorded streaming responses
         
         # Cache key prefixes
         self.prefix_query = "conversation:query"
@@ -39,6 +58,7 @@ class ConversationCache:
         self.prefix_model_response = "conversation:model_response"
         self.prefix_context = "conversation:context"
         self.prefix_session = "conversation:session"
+        self.prefix_stream = "conversation:stream"
     
     def _generate_query_key(
         self, 
@@ -61,9 +81,20 @@ class ConversationCache:
         }
         
         key_str = json.dumps(key_data, sort_keys=True)
-        key_hash = hashlib.md5(key_str.encode()).hexdigest()
+        key_hash = _fast_hash(key_str)
         return f"{self.prefix_query}:{key_hash}"
     
+    def _generate_stream_key(
+        self,
+        query: str,
+        user_id: Optional[int] = None,
+        document_id: Optional[int] = None,
+        model_preference: str = "openai"
+    ) -> str:
+        """Generate cache key for a recorded streaming response (history-free queries only)"""
+        key_hash = _fast_hash(f"{query.strip().lower()}|{user_id}|{document_id}|{model_preference}")
+        return f"{self.prefix_stream}:{key_hash}"
+    
     def _generate_model_response_key(
         self,
         query: str,
@@ -77,7 +108,7 @@ class ConversationCache:
             "context": context_hash
         }
         key_str = json.dumps(key_data, sort_keys=True)
-        key_hash = hashlib.md5(key_str.encode()).hexdigest()
+        key_hash = _fast_hash(key_str)
         return f"{self.prefix_model_response}:{key_hash}"
     
     def _hash_conversation_history(self, history: List[ConversationMessage]) -> str:
@@ -91,7 +122,7 @@ class ConversationCache:
             {"role": msg.role, "content": msg.content[:100]}  # Truncate content for hashing
             for msg in recent_history
         ], sort_keys=True)
-        return hashlib.md5(history_str.encode()).hexdigest()[:8]
+        return _fast_hash(history_str)[:8]
     
     async def get_query_result(
         self,
@@ -135,10 +166,9 @@ class ConversationCache:
             
             # Convert to dict for JSON serialization
             result_data = result.model_dump()
-            
             success = await self.redis.set_json(
-                cache_key, 
-                result_data, 
+                cache_key,
+                result_data,
                 ttl=self.ttl_query_results
             )
             
@@ -151,6 +181,47 @@ class ConversationCache:
             logger.error(f"Error caching query result: {e}")
             return False
     
+    async def get_stream_chunks(
+        self,
+        query: str,
+        user_id: Optional[int] = None,
+        document_id: Optional[int] = None,
+        model_preference: str = "openai"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Get the recorded chunks of a previous streaming response"""
+        try:
+            cache_key = self._generate_stream_key(query, user_id, document_id, model_preference)
+            chunks = await self.redis.get_json(cache_key)
+            if chunks:
+                logger.debug(f"Cache hit for streaming response: {cache_key}")
+            return chunks
+            
+        except Exception as e:
+            logger.error(f"Error getting cached streaming response: {e}")
+            return None
+    
+    async def cache_stream_chunks(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        user_id: Optional[int] = None,
+        document_id: Optional[int] = None,
+        model_preference: str = "openai"
+    ) -> bool:
+        """Record the chunks of a completed streaming response for replay"""
+        try:
+            cache_key = self._generate_stream_key(query, user_id, document_id, model_preference)
+            success = await self.redis.set_json(cache_key, chunks, ttl=self.ttl_stream_replay)
+            
+            if success:
+                logger.debug(f"Cached streaming response: {cache_key}")
+            
+            return success
+            
+        except Exception as e:
+            logger.error(f"Error caching streaming response: {e}")
+            return False
+    
     async def get_conversation_history(
         self,
         conversation_id: str,
@@ -158,7 +229,7 @@ class ConversationCache:
     ) -> Optional[List[ConversationMessage]]:
         """Get cached conversation history"""
         try:
-            cache_key = f"{self.prefix_history}:{conversation_id}"
+            cache_key = f"{self.prefix_history}:{conversation_hashtag(conversation_id)}"
             if user_id:
                 cache_key += f":user:{user_id}"
             
@@ -181,7 +252,7 @@ class ConversationCache:
     ) -> bool:
         """Cache conversation history"""
         try:
-            cache_key = f"{self.prefix_history}:{conversation_id}"
+            cache_key = f"{self.prefix_history}:{conversation_hashtag(conversation_id)}"
             if user_id:
                 cache_key += f":user:{user_id}"
             
@@ -329,7 +400,7 @@ class ConversationCache:
             patterns = []
             
             if conversation_id:
-                patterns.append(f"{self.prefix_history}:{conversation_id}*")
+                patterns.append(f"{self.prefix_history}:{conversation_hashtag(conversation_id)}*")
                 patterns.append(f"{self.prefix_context}:{conversation_id}*")
             
             if user_id:
@@ -340,10 +411,12 @@ class ConversationCache:
                 # For document-related invalidations, we need to clear query caches
                 # This is more complex as document_id is part of the hash
                 patterns.append(f"{self.prefix_query}:*")
+                patterns.append(f"{self.prefix_stream}:*")
             
             if not patterns:
                 patterns = [
                     f"{self.prefix_query}:*",
+                    f"{self.prefix_stream}:*",
                     f"{self.prefix_history}:*",
                     f"{self.prefix_context}:*"
                 ]
@@ -363,6 +436,27 @@ class ConversationCache:
             logger.error(f"Error invalidating conversation caches: {e}")
             return 0
     
+    async def invalidate_documents_bulk(self, document_ids: List[int]) -> int:
+        """Invalidate conversation caches affected by changes to several documents"""
+        # document_id is hashed into query/stream keys, so any document change
+        # clears both prefixes; one pass covers the whole batch
+        if not document_ids:
+            return 0
+        
+        try:
+            deleted = await self.redis.delete_patterns(
+                [f"{self.prefix_query}:*", f"{self.prefix_stream}:*"]
+            )
+            if deleted > 0:
+                logger.info(
+                    f"Invalidated {deleted} conversation cache entries for {len(document_ids)} documents"
+                )
+            return deleted
+            
+        except Exception as e:
+            logger.error(f"Error invalidating conversation caches for documents: {e}")
+            return 0
+    
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get conversation cache statistics"""
         try:
@@ -371,6 +465,7 @@ class ConversationCache:
                 "conversation_histories": 0,
                 "model_responses": 0,
                 "conversation_contexts": 0,
+                "stream_replays": 0,
                 "total_conversation_cache_size": 0
             }
             
@@ -379,7 +474,8 @@ class ConversationCache:
                 ("query_results", self.prefix_query),
                 ("conversation_histories", self.prefix_history),
                 ("model_responses", self.prefix_model_response),
-                ("conversation_contexts", self.prefix_context)
+                ("conversation_contexts", self.prefix_context),
+                ("stream_replays", self.prefix_stream)
             ]
             
             for stat_key, prefix in prefixes:
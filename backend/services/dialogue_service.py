@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import json
 from typing import List, Dict, Any, Optional, Tuple, AsyncGenerator
 from datetime import datetime
 import logging
@@ -11,6 +13,9 @@ from backend.services.llm_service import LLMService, LLMProvider
 
 logger = logging.getLogger(__name__)
 
+# In-flight query pipelines keyed by request fingerprint, shared by identical concurrent queries
+_INFLIGHT: Dict[str, asyncio.Future] = {}
+
 
 class DialogueService:
     """
@@ -177,6 +182,25 @@ ASSISTANT: """
         
         return prompt
     
+    @staticmethod
+    def _query_fingerprint(
+        query: str,
+        user_id: Optional[int],
+        document_id: Optional[int],
+        conversation_history: Optional[List[Any]],
+        model_preference: str
+    ) -> str:
+        """Stable hash identifying identical query requests."""
+        history = [
+            (msg.get("role"), msg.get("content")) if isinstance(msg, dict) else (msg.role, msg.content)
+            for msg in conversation_history or []
+        ]
+        payload = json.dumps(
+            [query.strip().lower(), user_id, document_id, model_preference, history],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
     async def process_query(
         self,
         query: str,
@@ -184,6 +208,53 @@ ASSISTANT: """
         document_id: Optional[int] = None,
         conversation_history: Optional[List[Dict[str, str]]] = None,
         model_preference: str = "openai"
+    ) -> Dict[str, Any]:
+        """
+        Process a user query, coalescing identical concurrent requests.
+        
+        Duplicate requests (double clicks, client retries) arriving while the
+        first one is still running await its result instead of repeating the
+        retrieval and LLM calls.
+        """
+        key = self._query_fingerprint(query, user_id, document_id, conversation_history, model_preference)
+        
+        inflight = _INFLIGHT.get(key)
+        if inflight is not None:
+            logger.debug(f"Joining in-flight query: '{query[:50]}...'")
+            try:
+                return dict(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leading request was cancelled; run the pipeline ourselves
+        
+        future = asyncio.get_running_loop().create_future()
+        _INFLIGHT[key] = future
+        try:
+            result = await self._run_query_pipeline(
+                query, user_id, document_id, conversation_history, model_preference
+            )
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unjoined future doesn't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            if _INFLIGHT.get(key) is future:
+                del _INFLIGHT[key]
+    
+    async def _run_query_pipeline(
+        self,
+        query: str,
+        user_id: Optional[int] = None,
+        document_id: Optional[int] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        model_preference: str = "openai"
     ) -> Dict[str, Any]:
         """
         Process a user query through the complete dialogue pipeline.
@@ -279,9 +350,12 @@ ASSISTANT: """
             model_preference: Preferred LLM model
             
         Yields:
-            Chunks of response data
+            Chunks of response data. A `phase` chunk marks the end of
+            retrieval, and the first `chunk` carries `ttft_ms` (time from
+            entry to the first model token).
         """
         start_time = time.time()
+        t0 = time.monotonic()
         
         try:
             logger.info(f"Processing streaming query: '{query[:50]}...' for user {user_id}, document {document_id}")
@@ -294,6 +368,7 @@ ASSISTANT: """
                 limit=self.top_k_initial
             )
             logger.info(f"Search for relevant fragments completed for streaming query. Found {len(fragments)} fragments.")
+            yield {"type": "phase", "phase": "retrieval_done"}
             
             if not fragments:
                 yield {
@@ -328,11 +403,18 @@ ASSISTANT: """
             
             full_response = ""
             async for chunk in self.llm_service.stream_generate_response(prompt, provider):
+                if not full_response:
+                    yield {
+                        "type": "chunk",
+                        "content": chunk,
+                        "ttft_ms": round((time.monotonic() - t0) * 1000, 1)
+                    }
+                else:
+                    yield {
+                        "type": "chunk",
+                        "content": chunk
+                    }
                 full_response += chunk
-                yield {
-                    "type": "chunk",
-                    "content": chunk
-                }
             
             processing_time = time.time() - start_time
             
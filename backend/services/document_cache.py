@@ -6,35 +6,127 @@ document lists, and related operations to improve performance.
 """
 
 import json
+import time
+import asyncio
+import base64
 import hashlib
-from typing import Optional, List, Dict, Any, Union
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Union
 from datetime import datetime, UTC
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, asc, func
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import or_, and_, desc, asc, func, tuple_, literal, bindparam
 
 from backend.core.redis import (
     get_redis_client,
     make_document_key,
+    document_hashtag,
+    user_hashtag,
     redis_operation,
     RedisClient
 )
 from backend.core.logging import get_app_logger
 from backend.models.document import Document
+from backend.models.user import User
 from backend.schemas.document import DocumentResponse, DocumentStatus # Import DocumentStatus
+from backend.utils.formatting import format_file_size
 
 logger = get_app_logger()
 
+# Sort fields usable with keyset cursors. Nullable columns (updated_at,
+# category) are excluded because row-value comparison does not order NULLs.
+CURSOR_SORT_FIELDS = {
+    'title': str,
+    'created_at': datetime.fromisoformat,
+    'file_size': int,
+    'status': str,
+}
+
+
+# Columns needed to render a document list entry (DocumentResponse). Large
+# columns such as markdown_content are never loaded for lists.
+LIST_COLUMNS = (
+    Document.id, Document.title, Document.original_filename, Document.document_type,
+    Document.status, Document.category, Document.file_size, Document.file_size_display, Document.page_count,
+    Document.word_count, Document.language, Document.processing_error,
+    Document.created_at, Document.updated_at, Document.processed_at, Document.owner_id
+)
+
+# Sortable list columns. The statement shape depends only on which filters are
+# present and the sort column, so list queries reuse SQLAlchemy's compiled cache.
+_SORT_COLUMNS = {
+    'title': Document.title,
+    'created_at': Document.created_at,
+    'updated_at': Document.updated_at,
+    'file_size': Document.file_size,
+    'status': Document.status,
+    'category': Document.category
+}
+
+# Keys of a cached list entry taken straight from LIST_COLUMNS
+_LIST_ITEM_KEYS = tuple(column.key for column in LIST_COLUMNS if column.key != 'owner_id')
+
+# Static progress estimate reported for documents still being processed
+PROCESSING_PROGRESS_ESTIMATE = 65
+
+# In-process (L1) document metadata cache in front of Redis. Entries live for a
+# few seconds; invalidations are broadcast to the other workers over pub/sub,
+# and the TTL bounds staleness if a broadcast is missed.
+LOCAL_CACHE_TTL = 5.0
+LOCAL_CACHE_SIZE = 10_000
+INVALIDATION_CHANNEL = "doc:invalidate"
+# Pause before resubscribing after the invalidation listener loses Redis
+INVALIDATION_RETRY_DELAY = 5.0
+
+
+def encode_list_cursor(sort_value: Any, document_id: int) -> str:
+    """Encode the (sort value, id) of the last row of a page as an opaque cursor."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = f"{sort_value}|{document_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_list_cursor(cursor: str, sort_by: str) -> tuple:
+    """
+    Decode a cursor produced by `encode_list_cursor` for the given sort field.
+    
+    Raises:
+        ValueError: If the cursor is malformed or the sort field does not
+            support keyset pagination.
+    """
+    if sort_by not in CURSOR_SORT_FIELDS:
+        raise ValueError(f"Cursor pagination is not supported when sorting by {sort_by}")
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        sort_value, _, document_id = raw.rpartition("|")
+        return CURSOR_SORT_FIELDS[sort_by](sort_value), int(document_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 
 class DocumentCache:
     """Document caching service with Redis backend."""
     
     def __init__(self, redis_client: Optional[RedisClient] = None):
-        self.redis_client = redis_client if redis_client else get_redis_client()
+        self._redis_client = redis_client
         self.cache_ttl = {
             'document_metadata': 3600,  # 1 hour
             'document_list': 900,       # 15 minutes
             'document_stats': 1800,     # 30 minutes
+            'stats_summary': 30,        # 30 seconds
+            'document_status': 5,       # 5 seconds; workers change status without invalidating
         }
+        self._local: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    @property
+    def redis_client(self) -> Optional[RedisClient]:
+        # Resolved on use: the module-level instance is created at import time,
+        # before init_redis() has run at startup
+        return self._redis_client if self._redis_client else get_redis_client()
+    
+    @redis_client.setter
+    def redis_client(self, redis_client: Optional[RedisClient]) -> None:
+        self._redis_client = redis_client
     
     def _make_list_cache_key(
         self, 
@@ -46,7 +138,9 @@ class DocumentCache:
         sort_by: str = "created_at",
         sort_order: str = "desc",
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        exact_count: bool = False
     ) -> str:
         """Generate cache key for document list queries."""
         # Create a deterministic hash of the query parameters
@@ -59,18 +153,72 @@ class DocumentCache:
             'sort_by': sort_by,
             'sort_order': sort_order,
             'skip': skip,
-            'limit': limit
+            'limit': limit,
+            'cursor': cursor,
+            'exact_count': exact_count
         }
         
         # Sort parameters for consistent hashing
         sorted_params = json.dumps(query_params, sort_keys=True)
         params_hash = hashlib.md5(sorted_params.encode()).hexdigest()[:8]
         
-        return f"docs:list:{user_id}:{params_hash}"
+        return f"docs:list:{user_hashtag(user_id)}:{params_hash}"
+    
+    def _make_list_index_key(self, user_id: int, kind: str, name: Any) -> str:
+        """Index set of the list cache keys depending on a document row or column."""
+        # Shares the list prefix, so invalidate_user_list_cache clears the indexes too
+        return f"docs:list:{user_hashtag(user_id)}:idx:{kind}:{name}"
+    
+    def _list_dependency_columns(
+        self,
+        search: Optional[str],
+        status: Optional[str],
+        document_type: Optional[str],
+        category: Optional[str],
+        sort_by: str
+    ) -> set:
+        """Columns whose values decide which documents a list holds and in what order."""
+        columns = {sort_by}
+        if search:
+            columns.update(('title', 'original_filename'))
+        if status:
+            columns.add('status')
+        if document_type:
+            columns.add('document_type')
+        if category:
+            columns.add('category')
+        return columns
+    
+    async def _index_list_entry(
+        self,
+        user_id: int,
+        cache_key: str,
+        document_ids: List[int],
+        columns: set
+    ) -> None:
+        """Record which rows and columns a cached list depends on (one pipelined round-trip)."""
+        index_keys = [self._make_list_index_key(user_id, 'row', document_id) for document_id in document_ids]
+        index_keys += [self._make_list_index_key(user_id, 'col', column) for column in columns]
+        
+        async with self.redis_client.pipeline() as pipe:
+            if pipe is None:
+                return
+            for index_key in index_keys:
+                pipe.sadd(index_key, cache_key)
+                pipe.expire(index_key, self.cache_ttl['document_list'])
+            await pipe.execute()
     
     def _make_stats_cache_key(self, user_id: int) -> str:
         """Generate cache key for document statistics."""
-        return f"docs:stats:{user_id}"
+        return f"docs:stats:{user_hashtag(user_id)}"
+    
+    def _make_summary_cache_key(self, user_id: int) -> str:
+        """Generate cache key for the stats summary endpoint response."""
+        return f"docstats:{user_hashtag(user_id)}"
+    
+    def _make_status_cache_key(self, document_id: int) -> str:
+        """Generate cache key for a document's processing status."""
+        return f"doc:status:{document_hashtag(document_id)}"
     
     def _serialize_document(self, document: Document) -> Dict[str, Any]:
         """Serialize document model to cacheable dict."""
@@ -80,6 +228,7 @@ class DocumentCache:
             'original_filename': document.original_filename,
             'file_path': document.file_path,
             'file_size': document.file_size,
+            'file_size_display': document.file_size_display,
             'file_hash': document.file_hash,
             'mime_type': document.mime_type,
             'document_type': document.document_type.value if hasattr(document.document_type, 'value') else document.document_type,
@@ -96,6 +245,78 @@ class DocumentCache:
             'owner_id': document.owner_id
         }
     
+    def _serialize_list_item(self, document: Document) -> Dict[str, Any]:
+        """
+        Serialize a document for the list cache.
+        
+        Entries are stored in DocumentResponse shape, with the display size and
+        progress computed once here, so cache hits need no per-row work.
+        """
+        data = {key: getattr(document, key) for key in _LIST_ITEM_KEYS}
+        for field in ('created_at', 'updated_at', 'processed_at'):
+            if data[field]:
+                data[field] = data[field].isoformat()
+        # Rows from before file_size_display was stored fall back to formatting
+        data['file_size_display'] = data['file_size_display'] or format_file_size(data['file_size'])
+        data['processing_progress'] = (
+            PROCESSING_PROGRESS_ESTIMATE if data['status'] == DocumentStatus.PROCESSING else None
+        )
+        return data
+    
+    def _local_get(self, document_id: int) -> Optional[Dict[str, Any]]:
+        """Document metadata from the in-process cache, if present and fresh."""
+        entry = self._local.get(document_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._local[document_id]
+            return None
+        self._local.move_to_end(document_id)
+        return entry[1]
+    
+    def _local_put(self, document_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store document metadata in the in-process cache, evicting the least
+        recently used entry. Returns the stored entry, which leaves out the
+        (potentially large) markdown content.
+        """
+        data = {key: value for key, value in data.items() if key != 'markdown_content'}
+        self._local[document_id] = (time.monotonic() + LOCAL_CACHE_TTL, data)
+        self._local.move_to_end(document_id)
+        if len(self._local) > LOCAL_CACHE_SIZE:
+            self._local.popitem(last=False)
+        return data
+    
+    def evict_local(self, document_ids: List[int]) -> None:
+        """Drop documents from this process's in-process cache."""
+        for document_id in document_ids:
+            self._local.pop(document_id, None)
+    
+    async def _broadcast_invalidation(self, document_ids: List[int]) -> None:
+        """Evict documents locally and tell the other workers to do the same."""
+        self.evict_local(document_ids)
+        if self.redis_client and document_ids:
+            await self.redis_client.publish(INVALIDATION_CHANNEL, ",".join(map(str, document_ids)))
+    
+    async def listen_for_invalidations(self) -> None:
+        """
+        Apply invalidations broadcast by other workers to the in-process cache.
+        
+        Runs for the lifetime of the application (started at startup and
+        cancelled at shutdown), resubscribing whenever the connection drops.
+        """
+        while True:
+            try:
+                async for message in self.redis_client.listen(INVALIDATION_CHANNEL):
+                    self.evict_local([int(document_id) for document_id in message.split(",")])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Document invalidation listener error: {e}")
+            # Broadcasts may have been missed while unsubscribed
+            self._local.clear()
+            await asyncio.sleep(INVALIDATION_RETRY_DELAY)
+    
     def _deserialize_document(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Deserialize cached document data."""
         # Convert ISO strings back to datetime objects for response
@@ -117,8 +338,15 @@ class DocumentCache:
         """
         Get document metadata with caching.
         
-        First checks Redis cache, falls back to database if cache miss.
+        Checks the in-process cache, then Redis (promoting hits into the
+        in-process cache), and falls back to the database. The returned
+        metadata does not include `markdown_content`.
         """
+        # Cache entries are keyed by document only, so ownership is checked on read
+        local_data = self._local_get(document_id)
+        if local_data is not None:
+            return local_data if local_data['owner_id'] == user_id else None
+        
         cache_key = make_document_key(document_id)
         
         if self.redis_client:
@@ -127,7 +355,8 @@ class DocumentCache:
                 cached_data = await self.redis_client.get_json(cache_key)
                 if cached_data:
                     logger.debug(f"Cache HIT for document {document_id}")
-                    return self._deserialize_document(cached_data)
+                    doc_data = self._local_put(document_id, self._deserialize_document(cached_data))
+                    return doc_data if doc_data['owner_id'] == user_id else None
                 
                 logger.debug(f"Cache MISS for document {document_id}")
             except Exception as e:
@@ -158,7 +387,118 @@ class DocumentCache:
             except Exception as e:
                 logger.error(f"Cache write error for document {document_id}: {e}")
         
-        return self._deserialize_document(doc_data)
+        return self._local_put(document_id, self._deserialize_document(doc_data))
+    
+    async def get_document_status(
+        self,
+        document_id: int,
+        db: Session,
+        user_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the status fields polled while a document uploads and processes.
+        
+        Entries live for only a few seconds, so repeated polls skip the
+        database while status changes made by Celery workers still show up
+        promptly. Deleted documents are included, unlike get_document_metadata.
+        """
+        cache_key = self._make_status_cache_key(document_id)
+        
+        if self.redis_client:
+            cached_data = await self.redis_client.get_json(cache_key)
+            if cached_data:
+                return cached_data if cached_data['owner_id'] == user_id else None
+        
+        row = db.query(
+            Document.owner_id, Document.status, Document.processing_error
+        ).filter(
+            Document.id == document_id,
+            Document.owner_id == user_id
+        ).first()
+        
+        if row is None:
+            return None
+        
+        status_data = {
+            'id': document_id,
+            'owner_id': row.owner_id,
+            'status': row.status,
+            'processing_error': row.processing_error
+        }
+        if self.redis_client:
+            await self.redis_client.set_json(cache_key, status_data, ttl=self.cache_ttl['document_status'])
+        return status_data
+    
+    def filtered_list_query(
+        self,
+        db: Session,
+        user_id: int,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        document_type: Optional[str] = None,
+        category: Optional[str] = None
+    ):
+        """Query for the user's non-deleted documents (list columns only) with filters applied."""
+        query = db.query(Document).options(load_only(*LIST_COLUMNS)).filter(
+            Document.owner_id == user_id,
+            Document.status != DocumentStatus.DELETED
+        )
+
+        # Apply search filter
+        if search:
+            # One bound parameter shared by both columns
+            pattern = bindparam("search_pattern", f"%{search}%")
+            search_filter = or_(
+                Document.title.ilike(pattern),
+                Document.original_filename.ilike(pattern)
+            )
+            query = query.filter(search_filter)
+
+        # Apply status filter
+        if status:
+            query = query.filter(Document.status == status) # Directly use status string
+
+        # Apply document type filter
+        if document_type:
+            query = query.filter(Document.document_type == document_type) # Directly use document_type string
+
+        # Apply category filter
+        if category:
+            query = query.filter(Document.category == category)
+
+        return query
+    
+    def order_list_query(
+        self,
+        query,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+        cursor: Optional[str] = None
+    ):
+        """Apply list ordering and, if given, the keyset cursor position."""
+        sort_field = _SORT_COLUMNS.get(sort_by, Document.created_at)
+        descending = sort_order.lower() == 'desc'
+        
+        # id breaks ties so pages (and cursors) are stable
+        if descending:
+            query = query.order_by(desc(sort_field), desc(Document.id))
+        else:
+            query = query.order_by(asc(sort_field), asc(Document.id))
+        
+        if cursor:
+            cursor_value, cursor_id = decode_list_cursor(cursor, sort_by)
+            position = tuple_(sort_field, Document.id)
+            # Bind the cursor with the column types so dates compare as dates
+            bound = tuple_(literal(cursor_value, sort_field.type), literal(cursor_id, Document.id.type))
+            query = query.filter(position < bound if descending else position > bound)
+        
+        return query
+    
+    def list_total_count(self, db: Session, user_id: int, query, filtered: bool, exact_count: bool = False) -> int:
+        """Total for a document listing: the owner's document counter unless filtered or exact."""
+        if exact_count or filtered:
+            return query.count()
+        return db.query(User.document_count).filter(User.id == user_id).scalar() or 0
     
     async def get_document_list(
         self,
@@ -171,17 +511,27 @@ class DocumentCache:
         sort_by: str = "created_at",
         sort_order: str = "desc",
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        exact_count: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         Get document list with caching.
         
         Cache key includes all query parameters for proper cache hits.
+        
+        When `cursor` is given, rows after the cursor position are returned
+        (keyset pagination) and `skip` is ignored. Unfiltered listings report
+        the owner's maintained document counter as `total_count` unless
+        `exact_count` is set; filtered listings are always counted exactly.
+        
+        Documents are returned in their cached response shape, timestamps
+        included as ISO strings, on cache hits and misses alike.
         """
         logger.debug(f"Attempting to get document list for user {user_id} from cache or DB.")
         cache_key = self._make_list_cache_key(
             user_id, search, status, document_type, category,
-            sort_by, sort_order, skip, limit
+            sort_by, sort_order, skip, limit, cursor, exact_count
         )
         
         if self.redis_client:
@@ -190,14 +540,7 @@ class DocumentCache:
                 cached_data = await self.redis_client.get_json(cache_key)
                 if cached_data:
                     logger.debug(f"Cache HIT for document list (user {user_id})")
-                    
-                    # Deserialize document data
-                    if 'documents' in cached_data:
-                        cached_data['documents'] = [
-                            self._deserialize_document(doc)
-                            for doc in cached_data['documents']
-                        ]
-                    logger.debug(f"Returning cached document list for user {user_id}.")
+                    # Entries keep their ISO timestamp strings; the router encodes them as-is
                     return cached_data
                 
                 logger.debug(f"Cache MISS for document list (user {user_id})")
@@ -206,56 +549,29 @@ class DocumentCache:
         
         logger.debug(f"Fetching document list for user {user_id} from database.")
         # Cache miss or Redis unavailable - fetch from database
-        query = db.query(Document).filter(
-            Document.owner_id == user_id,
-            Document.status != DocumentStatus.DELETED
-        )
-
-        # Apply search filter
-        if search:
-            search_filter = or_(
-                Document.title.ilike(f"%{search}%"),
-                Document.original_filename.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
-
-        # Apply status filter
-        if status:
-            query = query.filter(Document.status == status) # Directly use status string
-
-        # Apply document type filter
-        if document_type:
-            query = query.filter(Document.document_type == document_type) # Directly use document_type string
-
-        # Apply category filter
-        if category:
-            query = query.filter(Document.category == category)
-
-        # Apply sorting
-        valid_sort_fields = {
-            'title': Document.title,
-            'created_at': Document.created_at,
-            'updated_at': Document.updated_at,
-            'file_size': Document.file_size,
-            'status': Document.status,
-            'category': Document.category
-        }
+        query = self.filtered_list_query(db, user_id, search, status, document_type, category)
         
-        if sort_by in valid_sort_fields:
-            sort_field = valid_sort_fields[sort_by]
-            if sort_order.lower() == 'desc':
-                query = query.order_by(desc(sort_field))
-            else:
-                query = query.order_by(asc(sort_field))
-
         # Get total count before pagination
-        total_count = query.count()
-
-        # Apply pagination
-        documents = query.offset(skip).limit(limit).all()
+        total_count = self.list_total_count(
+            db, user_id, query, bool(search or status or document_type or category), exact_count
+        )
+        
+        query = self.order_list_query(query, sort_by, sort_order, cursor)
+        if not cursor:
+            query = query.offset(skip)
+        
+        # One extra row tells us whether another page exists
+        documents = query.limit(limit + 1).all()
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        
+        next_cursor = None
+        if has_more and sort_by in CURSOR_SORT_FIELDS:
+            last = documents[-1]
+            next_cursor = encode_list_cursor(getattr(last, sort_by), last.id)
         
         # Serialize documents for caching
-        serialized_docs = [self._serialize_document(doc) for doc in documents]
+        serialized_docs = [self._serialize_list_item(doc) for doc in documents]
         
         # Prepare cache data
         cache_data = {
@@ -263,7 +579,8 @@ class DocumentCache:
             'total_count': total_count,
             'skip': skip,
             'limit': limit,
-            'has_more': total_count > (skip + len(documents)),
+            'has_more': has_more,
+            'next_cursor': next_cursor,
             'cached_at': datetime.now(UTC).isoformat()
         }
         
@@ -275,16 +592,16 @@ class DocumentCache:
                     cache_data,
                     ttl=self.cache_ttl['document_list']
                 )
+                await self._index_list_entry(
+                    user_id,
+                    cache_key,
+                    [doc['id'] for doc in serialized_docs],
+                    self._list_dependency_columns(search, status, document_type, category, sort_by)
+                )
                 logger.debug(f"Cached document list for user {user_id}")
             except Exception as e:
                 logger.error(f"Cache write error for document list: {e}")
         
-        # Deserialize for return
-        cache_data['documents'] = [
-            self._deserialize_document(doc)
-            for doc in cache_data['documents']
-        ]
-        
         logger.debug(f"Successfully fetched and prepared document list for user {user_id} from database.")
         return cache_data
     
@@ -296,6 +613,7 @@ class DocumentCache:
         """
         cache_key = make_document_key(document.id)
         doc_data = self._serialize_document(document)
+        await self._broadcast_invalidation([document.id])
         
         if self.redis_client:
             try:
@@ -315,10 +633,13 @@ class DocumentCache:
         This is called when a document is deleted.
         """
         cache_key = make_document_key(document_id)
+        await self._broadcast_invalidation([document_id])
         
         if self.redis_client:
             try:
-                result = await self.redis_client.delete(cache_key)
+                result = await self.redis_client.delete_many(
+                    [cache_key, self._make_status_cache_key(document_id)]
+                ) > 0
                 if result:
                     logger.debug(f"Deleted document {document_id} from cache")
                 return result
@@ -334,10 +655,13 @@ class DocumentCache:
         Called when document metadata is updated.
         """
         cache_key = make_document_key(document_id)
+        await self._broadcast_invalidation([document_id])
         
         if self.redis_client:
             try:
-                result = await self.redis_client.delete(cache_key)
+                result = await self.redis_client.delete_many(
+                    [cache_key, self._make_status_cache_key(document_id)]
+                ) > 0
                 if result:
                     logger.debug(f"Invalidated cache for document {document_id}")
                 return result
@@ -347,16 +671,42 @@ class DocumentCache:
         
         return False
     
+    async def invalidate_documents_bulk(self, document_ids: List[int]) -> int:
+        """
+        Invalidate the metadata cache of several documents in one round-trip.
+        
+        Called after bulk operations.
+        """
+        await self._broadcast_invalidation(document_ids)
+        
+        if self.redis_client:
+            try:
+                deleted_count = await self.redis_client.delete_many(
+                    [make_document_key(document_id) for document_id in document_ids]
+                    + [self._make_status_cache_key(document_id) for document_id in document_ids]
+                )
+                if deleted_count > 0:
+                    logger.debug(f"Invalidated cache for {deleted_count} documents")
+                return deleted_count
+            except Exception as e:
+                logger.error(f"Bulk cache invalidation error for {len(document_ids)} documents: {e}")
+                return 0
+        
+        return 0
+    
     async def invalidate_user_list_cache(self, user_id: int) -> int:
         """
         Invalidate all document list caches for a user.
         
         Called when user's documents are modified.
         """
-        pattern = f"docs:list:{user_id}:*"
+        # Literal prefix + hashtag keeps the SCAN within the user's slot
+        pattern = f"docs:list:{user_hashtag(user_id)}:*"
         
         if self.redis_client:
             try:
+                # The stats summary changes whenever the list does
+                await self.redis_client.delete(self._make_summary_cache_key(user_id))
                 deleted_count = await self.redis_client.delete_pattern(pattern)
                 if deleted_count > 0:
                     logger.debug(f"Invalidated {deleted_count} list cache entries for user {user_id}")
@@ -367,6 +717,43 @@ class DocumentCache:
         
         return 0
     
+    async def invalidate_lists_for_change(
+        self,
+        user_id: int,
+        document_ids: List[int],
+        columns: List[str]
+    ) -> int:
+        """
+        Invalidate only the list caches affected by an in-place edit of documents.
+        
+        A list is affected when it returned one of the documents, or when its
+        filter or sort reads one of the changed columns (a renamed document can
+        enter a search result it was not part of). Inserts, deletes and status
+        changes alter every list's membership or count; use
+        `invalidate_user_list_cache` for those.
+        """
+        index_keys = [self._make_list_index_key(user_id, 'row', document_id) for document_id in document_ids]
+        index_keys += [self._make_list_index_key(user_id, 'col', column) for column in columns]
+        
+        if self.redis_client:
+            try:
+                async with self.redis_client.pipeline() as pipe:
+                    if pipe is None:
+                        return 0
+                    pipe.sunion(*index_keys)
+                    list_keys, = await pipe.execute()
+                
+                deleted_count = await self.redis_client.delete_many(list(list_keys) + index_keys)
+                if list_keys:
+                    logger.debug(f"Invalidated {len(list_keys)} list cache entries for user {user_id}")
+                return deleted_count
+            except Exception as e:
+                logger.error(f"Targeted list cache invalidation error for user {user_id}: {e}")
+                # Fall back to dropping every list of the user
+                return await self.invalidate_user_list_cache(user_id)
+        
+        return 0
+    
     async def invalidate_user_caches(self, user_id: int) -> Dict[str, int]:
         """
         Invalidate all caches for a user.
@@ -394,6 +781,27 @@ class DocumentCache:
         return results
 
 
+    async def get_stats_summary(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get the cached stats summary for a user."""
+        if self.redis_client:
+            try:
+                return await self.redis_client.get_json(self._make_summary_cache_key(user_id))
+            except Exception as e:
+                logger.error(f"Cache read error for stats summary: {e}")
+        return None
+    
+    async def cache_stats_summary(self, user_id: int, summary: Dict[str, Any]) -> None:
+        """Cache the stats summary for a user."""
+        if self.redis_client:
+            try:
+                await self.redis_client.set_json(
+                    self._make_summary_cache_key(user_id),
+                    summary,
+                    ttl=self.cache_ttl['stats_summary']
+                )
+            except Exception as e:
+                logger.error(f"Cache write error for stats summary: {e}")
+
     async def get_document_stats(self, db: Session, user_id: int) -> Dict[str, int]:
         """
         Get document statistics with caching.
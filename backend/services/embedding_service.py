@@ -1,6 +1,8 @@
 import asyncio
 import json
-from typing import List, Optional, Dict, Any
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
 import hashlib # Added for sha256
 import httpx
 from qdrant_client import QdrantClient, models # Moved to top
@@ -8,6 +10,12 @@ from backend.core.config import get_settings
 from backend.models.document import DocumentChunk # Import DocumentChunk for type hinting
 
 
+# Number of recent text -> embedding results kept in memory per service instance
+EMBEDDING_CACHE_SIZE = 4096
+# Seconds an in-memory embedding stays valid
+EMBEDDING_CACHE_TTL = 3600.0
+
+
 class EmbeddingService:
     """Service for generating text embeddings using Qwen3-Embedding-8B model"""
     
@@ -17,6 +25,13 @@ class EmbeddingService:
         self.vector_size = self.settings.embedding_vector_size # e.g., 1024 for Qwen3-Embedding-8B
         self._qdrant_client_initialized = False # Track Qdrant client initialization status
         self.qdrant_client: Optional[QdrantClient] = None # Initialize as None
+        # LRU of recent embeddings keyed by (model, text), with expiry times;
+        # repeated queries skip the API call
+        self._embedding_cache: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        # Requests currently in flight, so concurrent callers for the same text share one API call
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
         
     async def _initialize_qdrant_client(self):
         """Initializes the Qdrant client if not already initialized."""
@@ -42,15 +57,71 @@ class EmbeddingService:
                 print(f"Qdrant collection '{self.collection_name}' created.")
             else:
                 print(f"Qdrant collection '{self.collection_name}' already exists.")
+            # Chunk pages are scrolled in chunk_index order, which needs a payload index
+            await asyncio.to_thread(
+                self.qdrant_client.create_payload_index,
+                collection_name=self.collection_name,
+                field_name="chunk_index",
+                field_schema=models.PayloadSchemaType.INTEGER,
+            )
         except Exception as e:
             print(f"Error ensuring Qdrant collection: {e}")
 
 
-    async def get_embedding(self, text: str) -> List[float]:
-        """Get embedding for a single text"""
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and size of the in-memory embedding cache."""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._embedding_cache),
+            "inflight": len(self._inflight)
+        }
+
+    async def get_embedding(self, text: str, use_cache: bool = True) -> List[float]:
+        """Get embedding for a single text (pass use_cache=False to always call the API)"""
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
         
+        if not use_cache:
+            return await self._request_embedding(text)
+        
+        key = (self.settings.embedding_model, text)
+        entry = self._embedding_cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._embedding_cache.move_to_end(key)
+            self._cache_hits += 1
+            return entry[1]
+        
+        # Join an identical request that is already on its way
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._cache_hits += 1
+            return await asyncio.shield(inflight)
+        
+        self._cache_misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            embedding = await self._request_embedding(text)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody joined is not logged as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(embedding)
+            self._embedding_cache[key] = (time.monotonic() + EMBEDDING_CACHE_TTL, embedding)
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+            return embedding
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def _request_embedding(self, text: str) -> List[float]:
+        """Call the embedding API for a single text."""
         headers = {
             "Content-Type": "application/json",
         }
@@ -204,6 +275,150 @@ class EmbeddingService:
         except Exception as e:
             raise Exception(f"Qdrant deletion failed for document {document_id}: {e}")
 
+    async def get_document_chunks_page(
+        self,
+        document_id: int,
+        limit: int = 20,
+        after_chunk_index: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of a document's chunks from Qdrant, in chunk_index order.
+        
+        Pages are keyset-based: pass the previous page's next_cursor as
+        after_chunk_index. Only the requested page is transferred.
+        """
+        try:
+            await self._initialize_qdrant_client() # Ensure client is initialized
+            document_filter = models.Filter(
+                must=[models.FieldCondition(key="document_id", match=models.MatchValue(value=document_id))]
+            )
+            page_filter = document_filter
+            if after_chunk_index is not None:
+                page_filter = models.Filter(
+                    must=document_filter.must + [
+                        models.FieldCondition(key="chunk_index", range=models.Range(gt=after_chunk_index))
+                    ]
+                )
+            
+            # One extra point tells us whether another page exists
+            (points, _), count_result = await asyncio.gather(
+                asyncio.to_thread(
+                    self.qdrant_client.scroll,
+                    collection_name=self.collection_name,
+                    scroll_filter=page_filter,
+                    limit=limit + 1,
+                    order_by="chunk_index",
+                    with_payload=True,
+                    with_vectors=False,
+                ),
+                asyncio.to_thread(
+                    self.qdrant_client.count,
+                    collection_name=self.collection_name,
+                    count_filter=document_filter,
+                    exact=True,
+                ),
+            )
+            
+            has_more = len(points) > limit
+            chunks = [{"id": str(point.id), **point.payload} for point in points[:limit]]
+            return {
+                "total_chunks": count_result.count,
+                "chunks": chunks,
+                "has_more": has_more,
+                "next_cursor": chunks[-1]["chunk_index"] if has_more else None,
+            }
+        except Exception as e:
+            raise Exception(f"Failed to get chunks for document {document_id}: {e}")
+
+    async def search_similar_chunks(
+        self,
+        query_text: str,
+        user_id: Optional[int] = None,
+        document_id: Optional[int] = None,
+        limit: int = 10,
+        score_threshold: float = 0.0,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Chunks most similar to a query, best-first, each as its payload plus id and score.
+
+        Pass query_embedding when the caller already embedded query_text so it
+        is not embedded again.
+        """
+        if query_embedding is None:
+            query_embedding = await self.get_embedding(query_text)
+
+        try:
+            await self._initialize_qdrant_client() # Ensure client is initialized
+            conditions = []
+            if user_id is not None:
+                conditions.append(models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id)))
+            if document_id is not None:
+                conditions.append(models.FieldCondition(key="document_id", match=models.MatchValue(value=document_id)))
+
+            result = await asyncio.to_thread(
+                self.qdrant_client.query_points,
+                collection_name=self.collection_name,
+                query=query_embedding,
+                query_filter=models.Filter(must=conditions) if conditions else None,
+                limit=limit,
+                score_threshold=score_threshold,
+                with_payload=True,
+                with_vectors=False,
+            )
+            return [{"id": point.id, "score": point.score, **point.payload} for point in result.points]
+        except Exception as e:
+            raise Exception(f"Qdrant chunk search failed: {e}")
+
+    async def search_similar_documents(
+        self,
+        query_embedding: List[float],
+        user_id: Optional[int] = None,
+        limit: int = 5,
+        score_threshold: float = 0.0,
+        group_size: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Top documents for a query embedding, grouped by document_id in Qdrant.
+        
+        Each group holds up to group_size best-matching chunks, so the
+        per-document scores are computed server-side instead of over-fetching
+        chunks and aggregating them here. Groups come back best-first.
+        """
+        try:
+            await self._initialize_qdrant_client() # Ensure client is initialized
+            query_filter = None
+            if user_id is not None:
+                query_filter = models.Filter(
+                    must=[models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))]
+                )
+            
+            result = await asyncio.to_thread(
+                self.qdrant_client.query_points_groups,
+                collection_name=self.collection_name,
+                query=query_embedding,
+                group_by="document_id",
+                query_filter=query_filter,
+                limit=limit,
+                group_size=group_size,
+                score_threshold=score_threshold,
+                with_payload=False,
+                with_vectors=False,
+            )
+            
+            documents = []
+            for group in result.groups:
+                scores = [hit.score for hit in group.hits]
+                documents.append({
+                    "document_id": int(group.id),
+                    "max_score": max(scores),
+                    "avg_score": sum(scores) / len(scores),
+                    "matching_chunks": len(scores),
+                })
+            return documents
+        except Exception as e:
+            raise Exception(f"Qdrant grouped search failed: {e}")
+
     async def get_collection_info(self) -> Dict[str, Any]:
         """
         Get information about the Qdrant collection.
@@ -1,15 +1,28 @@
+import asyncio
 import mimetypes
 import os
 import hashlib
+import shutil
 import aiofiles
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from fastapi import UploadFile, HTTPException
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from backend.models.document import Document
 from backend.schemas.document import DocumentStatus, DocumentType # Import DocumentStatus and DocumentType enums
+from backend.utils.formatting import format_file_size
+
+# Uploads are streamed to disk in blocks of this size so memory per upload
+# stays O(chunk) rather than O(file)
+UPLOAD_CHUNK_SIZE = 1 << 20
+MAX_UPLOAD_SIZE = 500 * 1024 * 1024  # 500MB
+
+# Leading block hashed on every upload; together with the size it narrows the
+# duplicate candidates before any full SHA-256 is computed
+HEAD_HASH_SIZE = 4096
 
 
 def detect_file_type(file_path: str) -> str:
@@ -182,6 +195,129 @@ class FileService:
         sha256_hash.update(file_content)
         return sha256_hash.hexdigest()
     
+    async def _stream_to_disk(self, file: UploadFile, path: Path) -> Tuple[int, str]:
+        """
+        Copy an upload to disk in UPLOAD_CHUNK_SIZE blocks, returning (size, SHA-256 hex of the head block)
+        """
+        head = bytearray()
+        file_size = 0
+        await file.seek(0)
+        try:
+            async with aiofiles.open(path, 'wb') as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    file_size += len(chunk)
+                    if file_size > MAX_UPLOAD_SIZE:
+                        raise HTTPException(status_code=400, detail="File too large. Maximum size: 500MB")
+                    if len(head) < HEAD_HASH_SIZE:
+                        head += chunk[:HEAD_HASH_SIZE - len(head)]
+                    await f.write(chunk)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        return file_size, hashlib.sha256(head).hexdigest()
+    
+    def _hash_file(self, path) -> str:
+        """
+        SHA-256 of a file on disk, read in UPLOAD_CHUNK_SIZE blocks (run via asyncio.to_thread)
+        """
+        sha256_hash = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                sha256_hash.update(chunk)
+        return sha256_hash.hexdigest()
+    
+    async def _find_duplicate(self, db: Session, candidates: List[Document], file_hash: str) -> Optional[Document]:
+        """
+        Return the candidate whose full hash matches, hashing stored files that were never fully hashed
+        """
+        for candidate in candidates:
+            if candidate.file_hash is None and os.path.exists(candidate.file_path):
+                candidate.file_hash = await asyncio.to_thread(self._hash_file, candidate.file_path)
+                db.commit()
+            if candidate.file_hash == file_hash:
+                return candidate
+        return None
+    
+    def _chunk_directory(self, user_id: int, file_hash: str) -> Path:
+        """
+        Staging directory for the parts of a chunked upload
+        """
+        if len(file_hash) != 64 or not all(c in "0123456789abcdef" for c in file_hash):
+            raise HTTPException(status_code=400, detail="file_hash must be a hex SHA-256 digest")
+        return self.upload_directory / "tmp" / str(user_id) / file_hash
+    
+    async def store_upload_chunk(
+        self, user_id: int, file_hash: str, chunk_index: int, total_chunks: int, chunk: UploadFile
+    ) -> bool:
+        """
+        Store one part of a chunked upload; returns True once this call is the one
+        that completed the set and should assemble it
+        """
+        if not 0 <= chunk_index < total_chunks:
+            raise HTTPException(status_code=400, detail="chunk_index out of range")
+        chunk_dir = self._chunk_directory(user_id, file_hash)
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Written under a temporary name so a part is only counted once complete
+        part_path = chunk_dir / f"{chunk_index}.part"
+        temp_path = chunk_dir / f"{chunk_index}.part.tmp"
+        await self._stream_to_disk(chunk, temp_path)
+        os.replace(temp_path, part_path)
+        
+        if sum(1 for _ in chunk_dir.glob("*.part")) < total_chunks:
+            return False
+        # Claim assembly so concurrent final chunks don't both assemble
+        try:
+            os.close(os.open(chunk_dir / "assemble.lock", os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            return False
+        return True
+    
+    def _assemble_parts(self, chunk_dir: Path, total_chunks: int, destination: Path) -> int:
+        """
+        Concatenate parts into destination with copy_file_range, so the bytes never
+        pass through user space (run via asyncio.to_thread)
+        """
+        total = 0
+        with open(destination, 'wb') as dst:
+            for index in range(total_chunks):
+                with open(chunk_dir / f"{index}.part", 'rb') as src:
+                    remaining = os.fstat(src.fileno()).st_size
+                    if hasattr(os, "copy_file_range"):
+                        while remaining:
+                            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                            if copied == 0:
+                                break
+                            remaining -= copied
+                            total += copied
+                    else:
+                        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+                        total += remaining
+        return total
+    
+    async def assemble_upload_chunks(
+        self, user_id: int, file_hash: str, total_chunks: int, filename: str
+    ) -> Tuple[Path, int]:
+        """
+        Assemble a completed chunked upload and verify it against the client's hash.
+        Returns (path, size); the staging directory is removed either way.
+        """
+        chunk_dir = self._chunk_directory(user_id, file_hash)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        destination = self.upload_directory / f"{user_id}_{timestamp}_{os.urandom(4).hex()}{Path(filename).suffix}"
+        try:
+            if sum(part.stat().st_size for part in chunk_dir.glob("*.part")) > MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=400, detail="File too large. Maximum size: 500MB")
+            file_size = await asyncio.to_thread(self._assemble_parts, chunk_dir, total_chunks, destination)
+            if await asyncio.to_thread(self._hash_file, destination) != file_hash:
+                raise HTTPException(status_code=400, detail="Assembled file does not match file_hash")
+        except BaseException:
+            destination.unlink(missing_ok=True)
+            raise
+        finally:
+            await asyncio.to_thread(shutil.rmtree, chunk_dir, True)
+        return destination, file_size
+    
     def get_document_type(self, mime_type: str) -> DocumentType: # Change return type hint to DocumentType
         """
         Map MIME type to DocumentType enum
@@ -197,58 +333,56 @@ class FileService:
         
         return type_mapping.get(mime_type, DocumentType.TXT)
     
-    async def handle_file_upload(self, db: Session, file: UploadFile, user_id: int) -> Dict[str, Any]:
+    def _hash_head(self, path) -> str:
         """
-        Handle file upload with duplicate detection and database storage
+        SHA-256 of a file's first HEAD_HASH_SIZE bytes (run via asyncio.to_thread)
+        """
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read(HEAD_HASH_SIZE)).hexdigest()
+    
+    async def _register_upload(
+        self,
+        db: Session,
+        path: Path,
+        file_size: int,
+        head_sha256: str,
+        file_hash: Optional[str],
+        original_filename: str,
+        content_type: Optional[str],
+        user_id: int
+    ) -> Dict[str, Any]:
         """
+        Deduplicate an upload already on disk and create its Document row.
+        The file is renamed to its final extension, or removed if it is a duplicate
+        or no row could be created.
+        """
+        file_path = path.with_suffix(Path(original_filename).suffix)
         try:
-            # Validate file type
-            if not file.content_type or not self.is_supported_file_type(f"dummy{Path(file.filename or '').suffix}"):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Unsupported file type: {file.content_type}. Supported: PDF, EPUB, TXT, DOCX, MD"
-                )
-            
-            # Calculate file size by reading content
-            await file.seek(0)  # Reset to beginning
-            file_content = await file.read()
-            file_size = len(file_content)
-            await file.seek(0)  # Reset to beginning for later use
-            
-            if file_size > 500 * 1024 * 1024:  # 500MB
-                raise HTTPException(status_code=400, detail="File too large. Maximum size: 500MB")
-            
-            if file_size == 0:
-                raise HTTPException(status_code=400, detail="Empty file not allowed")
-            
-            # Calculate file hash for duplicate detection
-            file_hash = await self.calculate_file_hash(file_content)
-            
-            # Check for duplicates
-            existing_document = db.query(Document).filter(
-                Document.file_hash == file_hash,
+            # Only documents with the same size and head block can be duplicates; rows
+            # uploaded before head hashing (NULL head_sha256) are matched on size alone
+            candidates = db.query(Document).filter(
                 Document.owner_id == user_id,
+                Document.file_size == file_size,
+                or_(Document.head_sha256 == head_sha256, Document.head_sha256.is_(None)),
                 Document.status != DocumentStatus.DELETED.value # Use enum value
-            ).first()
+            ).all()
             
-            if existing_document:
-                return {
-                    "status": "duplicate",
-                    "message": "File already exists in your library",
-                    "document_id": existing_document.id,
-                    "existing_document": existing_document
-                }
+            # The full SHA-256 is only needed to tell candidates apart
+            if candidates:
+                if file_hash is None:
+                    file_hash = await asyncio.to_thread(self._hash_file, path)
+                existing_document = await self._find_duplicate(db, candidates, file_hash)
+                if existing_document:
+                    path.unlink(missing_ok=True)
+                    return {
+                        "status": "duplicate",
+                        "message": "File already exists in your library",
+                        "document_id": existing_document.id,
+                        "existing_document": existing_document
+                    }
             
-            # Generate unique filename
-            original_filename = file.filename or "unknown"
-            file_ext = Path(original_filename).suffix
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{user_id}_{timestamp}_{file_hash[:8]}{file_ext}"
-            file_path = self.upload_directory / filename
-            
-            # Save file to disk using the content we already read
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(file_content)
+            # Move the upload to its final filename
+            os.replace(path, file_path)
             
             # Create document record
             document = Document(
@@ -256,9 +390,11 @@ class FileService:
                 original_filename=original_filename,
                 file_path=str(file_path),
                 file_size=file_size,
+                file_size_display=format_file_size(file_size),
                 file_hash=file_hash,
-                mime_type=file.content_type or self.detect_mime_type(str(file_path)),
-                document_type=self.get_document_type(file.content_type or '').value, # Use enum value
+                head_sha256=head_sha256,
+                mime_type=content_type or self.detect_mime_type(str(file_path)),
+                document_type=self.get_document_type(content_type or '').value, # Use enum value
                 status=DocumentStatus.UPLOADING.value, # Use enum value
                 owner_id=user_id,
                 created_at=datetime.utcnow(),
@@ -267,14 +403,61 @@ class FileService:
             
             db.add(document)
             db.commit()
-            db.refresh(document)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            file_path.unlink(missing_ok=True)
+            raise
+        db.refresh(document)
+        
+        return {
+            "status": "success",
+            "message": "File uploaded successfully",
+            "document_id": document.id,
+            "document": document
+        }
+    
+    async def register_chunked_upload(
+        self, db: Session, path: Path, file_size: int, file_hash: str, filename: str, user_id: int
+    ) -> Dict[str, Any]:
+        """
+        Deduplicate an assembled chunked upload (already verified against file_hash)
+        and create its Document row, like handle_file_upload does for single uploads
+        """
+        try:
+            head_sha256 = await asyncio.to_thread(self._hash_head, path)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        return await self._register_upload(
+            db, path, file_size, head_sha256, file_hash, filename, self.detect_mime_type(filename), user_id
+        )
+    
+    async def handle_file_upload(self, db: Session, file: UploadFile, user_id: int) -> Dict[str, Any]:
+        """
+        Handle file upload with duplicate detection and database storage
+        """
+        try:
+            # Validate file type
+            if not file.content_type or not self.is_supported_file_type(f"dummy{Path(file.filename or '').suffix}"):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unsupported file type: {file.content_type}. Supported: PDF, EPUB, TXT, DOCX, MD"
+                )
+            
+            # Stream the upload to a temporary file, hashing only its head block
+            original_filename = file.filename or "unknown"
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            token = os.urandom(4).hex()
+            temp_path = self.upload_directory / f"{user_id}_{timestamp}_{token}.part"
+            file_size, head_sha256 = await self._stream_to_disk(file, temp_path)
             
-            return {
-                "status": "success",
-                "message": "File uploaded successfully",
-                "document_id": document.id,
-                "document": document
-            }
+            if file_size == 0:
+                temp_path.unlink(missing_ok=True)
+                raise HTTPException(status_code=400, detail="Empty file not allowed")
+            
+            return await self._register_upload(
+                db, temp_path, file_size, head_sha256, None, original_filename, file.content_type, user_id
+            )
             
         except HTTPException:
             raise
@@ -282,8 +465,8 @@ class FileService:
             import traceback
             error_detail = f"Upload failed in FileService: {str(e)}\n{traceback.format_exc()}"
             # Clean up file if it was created
-            if 'file_path' in locals() and file_path.exists():
-                file_path.unlink()
+            if 'temp_path' in locals():
+                temp_path.unlink(missing_ok=True)
             
             raise HTTPException(status_code=500, detail=error_detail)
 
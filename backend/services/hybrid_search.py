@@ -6,16 +6,17 @@ from collections import defaultdict, Counter
 from dataclasses import dataclass
 import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import text, and_, or_
+from sqlalchemy import text, and_, or_, select
 import logging
 from datetime import datetime
 import json
 
+from backend.core.database import in_list_chunks
 from backend.models.document import Document, DocumentChunk
 from services.embedding_service import EmbeddingService
 from services.text_splitter import TextChunk
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """Enhanced search result with multiple scoring methods."""
     content: str
@@ -192,7 +193,8 @@ class HybridSearchEngine:
         vector_weight: Optional[float] = None,
         keyword_weight: Optional[float] = None,
         fusion_method: str = "weighted",  # "weighted", "rrf", "max"
-        db_session: Optional[Session] = None
+        db_session: Optional[Session] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[SearchResult]:
         """
         Perform hybrid search combining vector and keyword approaches.
@@ -206,6 +208,7 @@ class HybridSearchEngine:
             keyword_weight: Weight for keyword search (0.0-1.0)
             fusion_method: How to combine results ("weighted", "rrf", "max")
             db_session: Database session for metadata lookup
+            query_embedding: Precomputed query embedding, reused instead of re-embedding
         """
         # Set default weights
         if vector_weight is None:
@@ -230,14 +233,13 @@ class HybridSearchEngine:
             vector_weight *= 0.8
             keyword_weight *= 1.2
         
-        # Perform vector search
-        vector_results = await self._vector_search(
-            query, user_id, document_id, limit * 2  # Get more for better fusion
-        )
-        
-        # Get chunks for keyword search
-        chunks_for_keyword = await self._get_chunks_for_keyword_search(
-            user_id, document_id, db_session
+        # Vector search and the keyword chunk fetch are independent
+        vector_results, chunks_for_keyword = await asyncio.gather(
+            self._vector_search(
+                query, user_id, document_id, limit * 2,  # Get more for better fusion
+                query_embedding=query_embedding
+            ),
+            self._get_chunks_for_keyword_search(user_id, document_id, db_session)
         )
         
         # Perform keyword search
@@ -302,7 +304,8 @@ class HybridSearchEngine:
         query: str, 
         user_id: Optional[int], 
         document_id: Optional[int], 
-        limit: int
+        limit: int,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """Perform vector similarity search."""
         try:
@@ -311,7 +314,8 @@ class HybridSearchEngine:
                 user_id=user_id,
                 document_id=document_id,
                 limit=limit,
-                score_threshold=0.1  # Lower threshold for fusion
+                score_threshold=0.1,  # Lower threshold for fusion
+                query_embedding=query_embedding
             )
             
             # Convert to standard format
@@ -346,7 +350,25 @@ class HybridSearchEngine:
             return []
         
         try:
-            query = db_session.query(DocumentChunk).join(Document)
+            # The query runs in a worker thread on its own session, so it overlaps
+            # the vector search and never shares the caller's session across threads
+            return await asyncio.to_thread(
+                self._load_keyword_chunks, db_session.get_bind(), user_id, document_id
+            )
+            
+        except Exception as e:
+            print(f"Failed to get chunks for keyword search: {e}")
+            return []
+    
+    def _load_keyword_chunks(
+        self,
+        bind,
+        user_id: Optional[int],
+        document_id: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Load chunks in the keyword search format (run via asyncio.to_thread)."""
+        with Session(bind=bind) as session:
+            query = session.query(DocumentChunk).join(Document)
             
             if user_id:
                 query = query.filter(Document.owner_id == user_id)
@@ -362,18 +384,15 @@ class HybridSearchEngine:
                     "document_id": chunk.document_id,
                     "chunk_index": chunk.chunk_index,
                     "content": chunk.content,
-                    "chunk_type": chunk.chunk_type or "paragraph",
-                    "section_header": chunk.section_header,
+                    # Chunk type and section header live only in the Qdrant payload
+                    "chunk_type": "paragraph",
+                    "section_header": None,
                     "token_count": chunk.token_count,
                     "start_offset": chunk.start_offset,
                     "end_offset": chunk.end_offset
                 })
             
             return chunk_data
-            
-        except Exception as e:
-            print(f"Failed to get chunks for keyword search: {e}")
-            return []
     
     def _keyword_search(
         self, 
@@ -588,18 +607,23 @@ class HybridSearchEngine:
         """Enhance search results with document metadata."""
         try:
             # Get unique document IDs
-            doc_ids = list(set(result.document_id for result in results))
+            doc_ids = list(dict.fromkeys(result.document_id for result in results))
             
-            # Fetch document metadata
-            documents = db_session.query(Document).filter(Document.id.in_(doc_ids)).all()
-            doc_map = {doc.id: doc for doc in documents}
+            # Fetch document metadata in one query per dialect-sized IN batch
+            doc_map = {}
+            for id_chunk in in_list_chunks(db_session, doc_ids):
+                rows = db_session.execute(
+                    select(Document.id, Document.title, Document.document_type)
+                    .where(Document.id.in_(id_chunk))
+                )
+                doc_map.update((row.id, row) for row in rows)
             
             # Enhance results
             for result in results:
                 doc = doc_map.get(result.document_id)
                 if doc:
                     result.document_title = doc.title
-                    result.document_type = doc.document_type.value
+                    result.document_type = doc.document_type
             
             return results
             
@@ -6,19 +6,43 @@ hybrid search, and related search operations to improve performance.
 """
 
 import json
+import base64
 import hashlib
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple
 from datetime import datetime
 
+import numpy as np
+
 from backend.core.redis import (
     get_redis_client, 
     make_search_key,
+    user_hashtag,
+    document_hashtag,
     redis_operation
 )
 from backend.core.logging import get_app_logger
 
 logger = get_app_logger()
 
+# Seconds a stale-entry refresh lock is held; bounds one background search
+REFRESH_LOCK_TTL = 5
+
+
+def _quantize_embedding(embedding: List[float]) -> Dict[str, Any]:
+    """Scalar-quantize an embedding to int8: one scale plus a byte per dimension (base64)."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(vector).max()) or 1.0
+    quantized = np.round(vector * (127.0 / scale)).astype(np.int8)
+    return {"s": scale, "q": base64.b64encode(quantized.tobytes()).decode("ascii")}
+
+
+def _dequantize_embedding(cached: Union[Dict[str, Any], List[float]]) -> List[float]:
+    """Inverse of _quantize_embedding; entries cached as plain float lists pass through."""
+    if isinstance(cached, list):
+        return cached
+    quantized = np.frombuffer(base64.b64decode(cached["q"]), dtype=np.int8)
+    return (quantized.astype(np.float32) * (cached["s"] / 127.0)).tolist()
+
 
 class SearchCache:
     """Search results caching service with Redis backend."""
@@ -26,9 +50,11 @@ class SearchCache:
     def __init__(self):
         self.cache_ttl = {
             'search_results': 900,      # 15 minutes
+            'search_results_stale': 300, # 5 more minutes served stale while refreshing
             'hybrid_search': 900,       # 15 minutes  
             'document_chunks': 1800,    # 30 minutes (more stable)
             'similar_docs': 1800,       # 30 minutes
+            'query_embedding': 604800,  # 7 days (embeddings are deterministic)
         }
     
     def _make_cache_key(
@@ -55,9 +81,9 @@ class SearchCache:
         sorted_params = json.dumps(search_params, sort_keys=True)
         params_hash = hashlib.md5(sorted_params.encode()).hexdigest()[:12]
         
-        # Create human-readable key
-        scope = f"doc:{document_id}" if document_id else f"user:{user_id}"
-        return f"search:{operation}:{scope}:{params_hash}"
+        # Scope hashtag first so per-document/per-user invalidation stays slot-local
+        scope = document_hashtag(document_id) if document_id else user_hashtag(user_id)
+        return f"search:{scope}:{operation}:{params_hash}"
     
     def _serialize_search_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Serialize search results for caching."""
@@ -93,89 +119,81 @@ class SearchCache:
         
         return deserialized
     
-    async def get_semantic_search_results(
-        self, 
+    def _make_semantic_response_key(
+        self,
+        query: str,
+        user_id: Optional[int],
+        document_id: Optional[int],
+        limit: int,
+        score_threshold: float
+    ) -> str:
+        """Key for a response-shaped semantic search entry."""
+        return self._make_cache_key(
+            operation="semantic",
+            query=query,
+            user_id=user_id,
+            document_id=document_id,
+            limit=limit,
+            score_threshold=score_threshold,
+            format="response"
+        )
+    
+    async def get_semantic_search_response_raw(
+        self,
         query: str,
         user_id: Optional[int] = None,
         document_id: Optional[int] = None,
         limit: int = 10,
         score_threshold: float = 0.0
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Tuple[Optional[str], bool]:
         """
-        Get cached semantic search results.
+        Get a cached semantic search response as its stored JSON text.
         
-        Returns cached results if available, None if cache miss.
+        Entries are written response-shaped by cache_semantic_search_response,
+        so a hit can be sent to the client without decoding. Returns
+        (body, stale): entries live for their fresh TTL plus a stale window,
+        and within that window they are still served but should be refreshed.
         """
-        cache_key = self._make_cache_key(
-            operation="semantic",
-            query=query,
-            user_id=user_id,
-            document_id=document_id,
-            limit=limit,
-            score_threshold=score_threshold
-        )
+        cache_key = self._make_semantic_response_key(query, user_id, document_id, limit, score_threshold)
         
         async with redis_operation() as redis_client:
             if redis_client:
                 try:
-                    cached_data = await redis_client.get_json(cache_key)
-                    if cached_data:
-                        logger.debug(f"Cache HIT for semantic search: {query[:50]}...")
-                        
-                        # Deserialize results
-                        if 'results' in cached_data:
-                            cached_data['results'] = self._deserialize_search_results(
-                                cached_data['results']
-                            )
-                        
-                        return cached_data
+                    raw, ttl = await redis_client.get_with_ttl(cache_key)
+                    if raw is not None:
+                        # The remaining TTL tells the entry's age without decoding it
+                        stale = 0 <= ttl <= self.cache_ttl['search_results_stale']
+                        logger.debug(f"Cache {'STALE' if stale else 'HIT'} for semantic search: {query[:50]}...")
+                        return raw, stale
                     
                     logger.debug(f"Cache MISS for semantic search: {query[:50]}...")
                 except Exception as e:
                     logger.error(f"Cache read error for semantic search: {e}")
         
-        return None
+        return None, False
     
-    async def cache_semantic_search_results(
+    async def cache_semantic_search_response(
         self,
         query: str,
-        results: List[Dict[str, Any]],
+        response: Dict[str, Any],
         user_id: Optional[int] = None,
         document_id: Optional[int] = None,
         limit: int = 10,
-        score_threshold: float = 0.0,
-        metadata: Optional[Dict[str, Any]] = None
+        score_threshold: float = 0.0
     ) -> bool:
-        """Cache semantic search results."""
-        cache_key = self._make_cache_key(
-            operation="semantic",
-            query=query,
-            user_id=user_id,
-            document_id=document_id,
-            limit=limit,
-            score_threshold=score_threshold
-        )
-        
-        # Prepare cache data
-        cache_data = {
-            'query': query,
-            'results': self._serialize_search_results(results),
-            'total_results': len(results),
-            'metadata': metadata or {},
-            'cached_at': datetime.utcnow().isoformat(),
-            'cache_key': cache_key
-        }
+        """Cache a complete semantic search response body (as served on a cache hit)."""
+        cache_key = self._make_semantic_response_key(query, user_id, document_id, limit, score_threshold)
         
         async with redis_operation() as redis_client:
             if redis_client:
                 try:
                     success = await redis_client.set_json(
-                        cache_key, 
-                        cache_data, 
-                        ttl=self.cache_ttl['search_results']
+                        cache_key,
+                        response,
+                        ttl=self.cache_ttl['search_results'] + self.cache_ttl['search_results_stale']
                     )
                     if success:
-                        logger.debug(f"Cached semantic search results: {query[:50]}...")
+                        logger.debug(f"Cached semantic search response: {query[:50]}...")
                     return success
                 except Exception as e:
                     logger.error(f"Cache write error for semantic search: {e}")
@@ -183,6 +201,23 @@ class SearchCache:
         
         return False
     
+    async def claim_semantic_search_refresh(
+        self,
+        query: str,
+        user_id: Optional[int] = None,
+        document_id: Optional[int] = None,
+        limit: int = 10,
+        score_threshold: float = 0.0
+    ) -> bool:
+        """Take the short-lived lock for refreshing a stale entry; only one worker gets True."""
+        cache_key = self._make_semantic_response_key(query, user_id, document_id, limit, score_threshold)
+        
+        async with redis_operation() as redis_client:
+            if redis_client:
+                return await redis_client.set_nx(f"{cache_key}:refresh", "1", REFRESH_LOCK_TTL)
+        
+        return False
+    
     async def get_hybrid_search_results(
         self, 
         query: str,
@@ -282,18 +317,52 @@ class SearchCache:
         
         return False
     
+    def _make_embedding_key(self, query: str, model: str) -> str:
+        """Key for a query embedding; exact text, since embeddings are case-sensitive."""
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        return f"search:embedding:{model}:{query_hash}"
+    
+    async def get_query_embedding(self, query: str, model: str) -> Optional[List[float]]:
+        """Get the cached embedding of a query text for the given model."""
+        async with redis_operation() as redis_client:
+            if redis_client:
+                try:
+                    cached = await redis_client.get_json(self._make_embedding_key(query, model))
+                    if cached is not None:
+                        return _dequantize_embedding(cached)
+                except Exception as e:
+                    logger.error(f"Cache read error for query embedding: {e}")
+        
+        return None
+    
+    async def cache_query_embedding(self, query: str, model: str, embedding: List[float]) -> bool:
+        """Cache the embedding of a query text (int8-quantized); shared across users and search options."""
+        async with redis_operation() as redis_client:
+            if redis_client:
+                try:
+                    return await redis_client.set_json(
+                        self._make_embedding_key(query, model),
+                        _quantize_embedding(embedding),
+                        ttl=self.cache_ttl['query_embedding']
+                    )
+                except Exception as e:
+                    logger.error(f"Cache write error for query embedding: {e}")
+                    return False
+        
+        return False
+    
     async def get_document_chunks(
         self,
         document_id: int,
-        skip: int = 0,
+        cursor: Optional[int] = None,
         limit: int = 20
     ) -> Optional[Dict[str, Any]]:
-        """Get cached document chunks info."""
+        """Get a cached page of document chunks."""
         cache_key = self._make_cache_key(
             operation="chunks",
             query="",  # No query for chunks
             document_id=document_id,
-            skip=skip,
+            cursor=cursor,
             limit=limit
         )
         
@@ -315,15 +384,15 @@ class SearchCache:
         self,
         document_id: int,
         chunks_data: Dict[str, Any],
-        skip: int = 0,
+        cursor: Optional[int] = None,
         limit: int = 20
     ) -> bool:
-        """Cache document chunks info."""
+        """Cache a page of document chunks."""
         cache_key = self._make_cache_key(
             operation="chunks",
             query="",
             document_id=document_id,
-            skip=skip,
+            cursor=cursor,
             limit=limit
         )
         
@@ -358,8 +427,7 @@ class SearchCache:
         Called when document content changes or is deleted.
         """
         patterns = [
-            f"search:*:doc:{document_id}:*",
-            f"search:chunks:doc:{document_id}:*"
+            f"search:{document_hashtag(document_id)}:*"
         ]
         
         total_deleted = 0
@@ -376,13 +444,33 @@ class SearchCache:
         
         return total_deleted
     
+    async def invalidate_documents_bulk(self, document_ids: List[int]) -> int:
+        """
+        Invalidate the search caches of several documents.
+        
+        All per-document patterns are cleared in one pipelined round-trip.
+        """
+        patterns = [f"search:{document_hashtag(document_id)}:*" for document_id in document_ids]
+        
+        async with redis_operation() as redis_client:
+            if redis_client:
+                try:
+                    deleted_count = await redis_client.delete_patterns(patterns)
+                    if deleted_count > 0:
+                        logger.debug(f"Invalidated {deleted_count} search cache entries for {len(document_ids)} documents")
+                    return deleted_count
+                except Exception as e:
+                    logger.error(f"Bulk search cache invalidation error: {e}")
+        
+        return 0
+    
     async def invalidate_user_search_cache(self, user_id: int) -> int:
         """
         Invalidate all search caches for a user.
         
         Called when user's document collection changes significantly.
         """
-        pattern = f"search:*:user:{user_id}:*"
+        pattern = f"search:{user_hashtag(user_id)}:*"
         
         async with redis_operation() as redis_client:
             if redis_client:
@@ -409,14 +497,10 @@ class SearchCache:
         async with redis_operation() as redis_client:
             if redis_client:
                 try:
-                    # Count different types of search cache entries
-                    semantic_keys = await redis_client._client.keys("search:semantic:*")
-                    hybrid_keys = await redis_client._client.keys("search:hybrid:*")
-                    chunks_keys = await redis_client._client.keys("search:chunks:*")
-                    
-                    stats['semantic_searches'] = len(semantic_keys) if semantic_keys else 0
-                    stats['hybrid_searches'] = len(hybrid_keys) if hybrid_keys else 0
-                    stats['document_chunks'] = len(chunks_keys) if chunks_keys else 0
+                    # Count different types of search cache entries with incremental SCAN
+                    stats['semantic_searches'] = await redis_client.count_keys("search:*:semantic:*")
+                    stats['hybrid_searches'] = await redis_client.count_keys("search:*:hybrid:*")
+                    stats['document_chunks'] = await redis_client.count_keys("search:*:chunks:*")
                     stats['total_keys'] = sum(stats.values())
                     
                 except Exception as e:
@@ -144,7 +144,8 @@ class VectorService:
         user_id: Optional[int] = None,
         document_id: Optional[int] = None,
         limit: int = 10,
-        score_threshold: float = 0.0
+        score_threshold: float = 0.0,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for similar document chunks.
@@ -155,6 +156,7 @@ class VectorService:
             document_id: Filter by specific document (optional)
             limit: Maximum number of results
             score_threshold: Minimum similarity score
+            query_embedding: Precomputed embedding of query_text (optional)
             
         Returns:
             List of similar chunks with metadata
@@ -162,8 +164,9 @@ class VectorService:
         try:
             await self.ensure_collection_ready()
             
-            # Generate query embedding
-            query_embedding = await self.embedding_service.get_embedding(query_text)
+            # Generate query embedding unless the caller already has it
+            if query_embedding is None:
+                query_embedding = await self.embedding_service.get_embedding(query_text)
             print(f"DEBUG: Query embedding generated (first 5 values): {query_embedding[:5]}")
             
             from qdrant_client.models import Filter, FieldCondition, MatchValue
@@ -187,8 +190,9 @@ class VectorService:
             query_filter = Filter(must=filter_conditions) if filter_conditions else None
             print(f"DEBUG: Qdrant query filter: {query_filter.dict() if query_filter else 'None'}")
             
-            # Perform search
-            search_results = self.qdrant_client.search(
+            # Perform search in a worker thread so concurrent searches overlap
+            search_results = await asyncio.to_thread(
+                self.qdrant_client.search,
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
                 query_filter=query_filter,
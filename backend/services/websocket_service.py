@@ -1,9 +1,25 @@
-import json
+import orjson
+import time
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 from enum import Enum
 
+# Celery workers have no WebSocket connections; they publish progress here and
+# every API process delivers it to the sockets it holds
+PROGRESS_CHANNEL = "ws:progress"
+PROGRESS_RETRY_DELAY = 5.0
+
+# Upload progress is coalesced: a new update for the same upload goes out only
+# once it has moved by PROGRESS_MIN_DELTA percent and PROGRESS_MIN_INTERVAL
+# seconds have passed; held-back updates are flushed at that interval
+PROGRESS_MIN_DELTA = 1
+PROGRESS_MIN_INTERVAL = 0.1
+
+def _dumps(message: Dict[str, Any]) -> str:
+    """Encode a message with orjson; frames stay text so browser clients parse them unchanged."""
+    return orjson.dumps(message, default=str).decode()
+
 class ProgressType(Enum):
     UPLOAD = "upload"
     PROCESSING = "processing"
@@ -16,6 +32,13 @@ class WebSocketManager:
     def __init__(self):
         # Store active connections by user_id
         self.active_connections: Dict[int, List[WebSocket]] = {}
+        # Set in Celery workers to publish messages instead of sending them locally
+        self.relay = None
+        # (user_id, document_id) -> (progress_percent, monotonic time) of the last upload update sent
+        self._upload_progress_sent: Dict[Tuple[int, int], Tuple[int, float]] = {}
+        # Latest held-back upload update per (user_id, document_id)
+        self._pending_upload_progress: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
         
     async def connect(self, websocket: WebSocket, user_id: int):
         """Accept a WebSocket connection for a user."""
@@ -42,17 +65,26 @@ class WebSocketManager:
     async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
         """Send a message to a specific WebSocket connection."""
         try:
-            await websocket.send_text(json.dumps(message))
+            await websocket.send_text(_dumps(message))
         except Exception as e:
             print(f"Error sending WebSocket message: {e}")
 
     async def send_message_to_user(self, message: Dict[str, Any], user_id: int):
         """Send a message to all WebSocket connections for a user."""
+        if self.relay is not None:
+            await self.relay.publish(PROGRESS_CHANNEL, _dumps({"user_id": user_id, "message": message}))
+            return
+        await self._deliver(message, user_id)
+
+    async def _deliver(self, message: Dict[str, Any], user_id: int):
+        """Send a message to this process's WebSocket connections for a user."""
         if user_id in self.active_connections:
+            # Encoded once for all of the user's connections
+            text = _dumps(message)
             disconnected_connections = []
             for connection in self.active_connections[user_id]:
                 try:
-                    await connection.send_text(json.dumps(message))
+                    await connection.send_text(text)
                 except Exception:
                     # Connection is likely closed, mark for removal
                     disconnected_connections.append(connection)
@@ -80,8 +112,50 @@ class WebSocketManager:
             "total_bytes": total_bytes,
             "timestamp": asyncio.get_event_loop().time()
         }
+        
+        if not document_id:
+            # Uploads report document_id 0 before a row exists, so concurrent
+            # uploads would share one key and drop each other's updates
+            await self.send_message_to_user(message, user_id)
+            return
+        
+        key = (user_id, document_id)
+        now = time.monotonic()
+        last = self._upload_progress_sent.get(key)
+        if progress_percent < 100 and last is not None and (
+            progress_percent - last[0] < PROGRESS_MIN_DELTA or now - last[1] < PROGRESS_MIN_INTERVAL
+        ):
+            # Keep only the newest state; the flush loop sends it if nothing newer goes out first
+            self._pending_upload_progress[key] = message
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_upload_progress())
+            return
+        
+        self._pending_upload_progress.pop(key, None)
+        if progress_percent >= 100:
+            self._upload_progress_sent.pop(key, None)
+        else:
+            self._upload_progress_sent[key] = (progress_percent, now)
         await self.send_message_to_user(message, user_id)
 
+    def _clear_upload_progress(self, user_id: int, document_id: int):
+        """Forget coalescing state so no held-back update follows a final message."""
+        self._pending_upload_progress.pop((user_id, document_id), None)
+        self._upload_progress_sent.pop((user_id, document_id), None)
+
+    async def _flush_upload_progress(self):
+        """Send held-back upload updates every PROGRESS_MIN_INTERVAL until none remain."""
+        while self._pending_upload_progress:
+            await asyncio.sleep(PROGRESS_MIN_INTERVAL)
+            now = time.monotonic()
+            for key, message in list(self._pending_upload_progress.items()):
+                last = self._upload_progress_sent.get(key)
+                if last is not None and now - last[1] < PROGRESS_MIN_INTERVAL:
+                    continue
+                del self._pending_upload_progress[key]
+                self._upload_progress_sent[key] = (message["progress_percent"], now)
+                await self.send_message_to_user(message, key[0])
+
     async def send_processing_progress(
         self, 
         user_id: int, 
@@ -114,6 +188,7 @@ class WebSocketManager:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """Send completion or error message."""
+        self._clear_upload_progress(user_id, document_id)
         progress_type = ProgressType.COMPLETED if status == "success" else ProgressType.ERROR
         
         message_data = {
@@ -137,6 +212,7 @@ class WebSocketManager:
         error_code: Optional[str] = None
     ):
         """Send error message."""
+        self._clear_upload_progress(user_id, document_id)
         message = {
             "type": ProgressType.ERROR.value,
             "document_id": document_id,
@@ -146,6 +222,24 @@ class WebSocketManager:
         }
         await self.send_message_to_user(message, user_id)
 
+    async def listen_for_progress(self, redis_client) -> None:
+        """
+        Deliver progress published by Celery workers to this process's connections.
+        
+        Runs for the lifetime of the application (started at startup and
+        cancelled at shutdown), resubscribing whenever the connection drops.
+        """
+        while True:
+            try:
+                async for raw in redis_client.listen(PROGRESS_CHANNEL):
+                    payload = orjson.loads(raw)
+                    await self._deliver(payload["message"], payload["user_id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WebSocket progress listener error: {e}")
+            await asyncio.sleep(PROGRESS_RETRY_DELAY)
+
     def get_active_connections_count(self, user_id: int) -> int:
         """Get number of active connections for a user."""
         return len(self.active_connections.get(user_id, []))
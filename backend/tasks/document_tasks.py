@@ -1,29 +1,38 @@
 import asyncio
-from celery import Task
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 
 from celery_app import celery_app
 from config import settings
 from services.document_processor import document_processor
+from services.websocket_service import websocket_manager
+from services.document_cache import document_cache
+from backend.core.redis import RedisClient
 from backend.core.database import SessionLocal
 
-class DatabaseTask(Task):
-    """Base task class that provides database session management."""
-    _db = None
-    
-    @property
-    def db(self):
-        if self._db is None:
-            self._db = SessionLocal()
-        return self._db
+async def _process_with_progress_relay(document_id: int, user_id: int):
+    """
+    Run the document processor with its progress messages published over Redis,
+    where the API processes holding the user's WebSockets pick them up, then
+    drop the document's cached metadata and status.
     
-    def after_return(self, status, retval, task_id, args, kwargs, einfo):
-        """Close database session after task completion."""
-        if self._db is not None:
-            self._db.close()
+    Each run gets its own session, closed (and its connection returned to the
+    pool) as soon as the run ends, including before a retry is scheduled.
+    """
+    relay = RedisClient(settings.REDIS_URL)
+    await relay.connect()
+    websocket_manager.relay = relay
+    document_cache.redis_client = relay
+    try:
+        with SessionLocal() as db:
+            return await document_processor.process_document(document_id, user_id, db)
+    finally:
+        await document_cache.invalidate_document_cache(document_id)
+        websocket_manager.relay = None
+        document_cache.redis_client = None
+        await relay.disconnect()
 
-@celery_app.task(bind=True, base=DatabaseTask, name='tasks.document_tasks.process_document_task')
+@celery_app.task(bind=True, name='tasks.document_tasks.process_document_task')
 def process_document_task(self, document_id: int, user_id: int):
     """
     Celery task to process a document asynchronously.
@@ -43,7 +52,7 @@ def process_document_task(self, document_id: int, user_id: int):
         try:
             # Process the document
             result = loop.run_until_complete(
-                document_processor.process_document(document_id, user_id, self.db)
+                _process_with_progress_relay(document_id, user_id)
             )
             
             return {
@@ -1,6 +1,6 @@
 from celery import current_app as celery_app
 from sqlalchemy.orm import Session
-from backend.core.database import get_db
+from backend.core.database import SessionLocal
 from backend.models.document import Document, DocumentChunk
 from backend.schemas.document import DocumentStatus # Import DocumentStatus
 from services.text_splitter import semantic_splitter
@@ -21,7 +21,7 @@ def vectorize_document(self, document_id: int, user_id: int) -> Dict[str, Any]:
     """
     try:
         # Get database session
-        db = next(get_db())
+        db = SessionLocal()
         
         # Retrieve document
         document = db.query(Document).filter(Document.id == document_id).first()
@@ -91,7 +91,7 @@ def vectorize_document(self, document_id: int, user_id: int) -> Dict[str, Any]:
     except Exception as e:
         # Update document status on failure
         try:
-            db = next(get_db())
+            db = SessionLocal()
             document = db.query(Document).filter(Document.id == document_id).first()
             if document:
                 document.status = DocumentStatus.ERROR.value # Use ERROR status for vectorization failure
@@ -122,7 +122,7 @@ def update_document_vectors(self, document_id: int, user_id: int) -> Dict[str, A
     """
     try:
         # Get database session
-        db = next(get_db())
+        db = SessionLocal()
         
         # Retrieve document and chunks
         document = db.query(Document).filter(Document.id == document_id).first()
@@ -188,7 +188,7 @@ def update_document_vectors(self, document_id: int, user_id: int) -> Dict[str, A
     except Exception as e:
         # Update document status on failure
         try:
-            db = next(get_db())
+            db = SessionLocal()
             document = db.query(Document).filter(Document.id == document_id).first()
             if document:
                 document.status = DocumentStatus.ERROR.value # Use ERROR status for vectorization failure
@@ -219,7 +219,7 @@ def cleanup_orphaned_vectors(self) -> Dict[str, Any]:
     """
     try:
         # Get all document IDs from database
-        db = next(get_db())
+        db = SessionLocal()
         document_ids = {doc.id for doc in db.query(Document.id).all()}
         
         # Get document IDs from Qdrant
@@ -0,0 +1,37 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from backend.core.config import get_settings
+from backend.deps.auth import DEFAULT_USER_ID, get_current_user_id
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(user_id: int = Depends(get_current_user_id)):
+        return {"user_id": user_id}
+
+    return TestClient(app)
+
+
+def _token(sub) -> str:
+    settings = get_settings()
+    return jwt.encode({"sub": sub}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def test_bearer_token_resolves_user(client):
+    response = client.get("/whoami", headers={"Authorization": f"Bearer {_token('42')}"})
+    assert response.json() == {"user_id": 42}
+
+
+def test_missing_token_falls_back_to_default_user(client):
+    assert client.get("/whoami").json() == {"user_id": DEFAULT_USER_ID}
+
+
+def test_invalid_token_is_rejected(client):
+    response = client.get("/whoami", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
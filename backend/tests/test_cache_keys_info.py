@@ -0,0 +1,41 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routers import cache
+
+
+async def _rows(redis_client, batch):
+    return [{"key": key, "memory_bytes": 10, "ttl_seconds": -1, "exists": True} for key in batch]
+
+
+def _keys_info_summary(pages, limit):
+    """Run /api/cache/keys/info over the given SCAN pages and return its summary line."""
+    redis_client = MagicMock()
+    redis_client._client.scan = AsyncMock(side_effect=pages)
+    app = FastAPI()
+    app.include_router(cache.router)
+    with patch.object(cache, "get_redis_client", return_value=redis_client), \
+         patch.object(cache, "_analyze_key_batch", side_effect=_rows):
+        response = TestClient(app).get(f"/api/cache/keys/info?limit={limit}")
+    assert response.status_code == 200
+    return orjson.loads(response.content.splitlines()[-1])["summary"]
+
+
+@pytest.mark.parametrize("pages, truncated", [
+    # The last page fills the limit exactly and the cursor is done
+    ([(5, ["a", "b"]), (0, ["c"])], False),
+    # Keys left over on the page that hit the limit
+    ([(0, ["a", "b", "c", "d"])], True),
+    # Limit reached, an empty page, then more keys behind the cursor
+    ([(5, ["a", "b", "c"]), (9, []), (0, ["d"])], True),
+    # Limit reached, and the remaining pages hold nothing
+    ([(5, ["a", "b", "c"]), (0, [])], False),
+])
+def test_keys_info_truncated_only_when_keys_remain(pages, truncated):
+    summary = _keys_info_summary(pages, limit=3)
+    assert summary["analyzed_keys"] == 3
+    assert summary["truncated"] is truncated
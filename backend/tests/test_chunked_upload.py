@@ -0,0 +1,66 @@
+import asyncio
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.database import Base
+import backend.models  # noqa: F401  (register all tables)
+from backend.models.user import User
+from backend.models.document import Document
+from backend.services.file_service import FileService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = FileService()
+    service.upload_directory = tmp_path
+    return service
+
+
+async def _upload_in_parts(service, db, user_id, content, filename="notes.txt", part_size=4):
+    """Store every part, assemble and register the file as the router does."""
+    file_hash = hashlib.sha256(content).hexdigest()
+    parts = [content[i:i + part_size] for i in range(0, len(content), part_size)]
+    for index, part in enumerate(parts):
+        complete = await service.store_upload_chunk(
+            user_id, file_hash, index, len(parts), UploadFile(file=io.BytesIO(part), filename=filename)
+        )
+    assert complete
+    path, file_size = await service.assemble_upload_chunks(user_id, file_hash, len(parts), filename)
+    return await service.register_chunked_upload(db, path, file_size, file_hash, filename, user_id)
+
+
+def test_chunked_upload_creates_document_and_dedupes(db, service, tmp_path):
+    """An assembled upload gets a Document row; re-uploading it reports the duplicate and leaves no file."""
+    user = User(username="u", email="u@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    content = b"hello chunked world"
+
+    result = asyncio.run(_upload_in_parts(service, db, user.id, content))
+    assert result["status"] == "success"
+    document = db.get(Document, result["document_id"])
+    assert document.file_hash == hashlib.sha256(content).hexdigest()
+    assert document.file_size == len(content)
+    with open(document.file_path, "rb") as f:
+        assert f.read() == content
+
+    duplicate = asyncio.run(_upload_in_parts(service, db, user.id, content))
+    assert duplicate["status"] == "duplicate"
+    assert duplicate["document_id"] == document.id
+    assert [p.name for p in tmp_path.iterdir() if p.is_file()] == [Path(document.file_path).name]
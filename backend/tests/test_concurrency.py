@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+
+from backend.utils.concurrency import bounded_gather
+
+
+@pytest.mark.asyncio
+async def test_bounded_gather_preserves_order_and_captures_errors():
+    """Failures are returned in place instead of cancelling sibling probes."""
+    async def ok():
+        return "healthy"
+
+    async def boom():
+        raise RuntimeError("down")
+
+    results = await bounded_gather(ok, boom, ok)
+
+    assert results[0] == "healthy"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_bounded_gather_limits_concurrency_and_times_out():
+    """No more than `limit` probes run at once; slow ones yield TimeoutError."""
+    running = 0
+    peak = 0
+
+    async def probe():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    results = await bounded_gather(*([probe] * 6), hang, limit=2, timeout=0.05)
+
+    assert peak <= 2
+    assert results[:6] == [True] * 6
+    assert isinstance(results[6], asyncio.TimeoutError)
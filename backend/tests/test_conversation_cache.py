@@ -104,6 +104,20 @@ async def test_cache_query_result(conversation_cache_instance, mock_redis_client
     assert success is True
     mock_redis_client.set_json.assert_called_once()
 
+@pytest.mark.asyncio
+async def test_cache_and_get_stream_chunks(conversation_cache_instance, mock_redis_client):
+    chunks = [{"type": "chunk", "content": "Hi"}, {"type": "final", "response": "Hi"}]
+    
+    success = await conversation_cache_instance.cache_stream_chunks(query="Test Query ", chunks=chunks, user_id=1)
+    assert success is True
+    cache_key = mock_redis_client.set_json.call_args.args[0]
+    assert cache_key.startswith("conversation:stream:")
+    
+    # Normalized query maps to the same key
+    mock_redis_client.get_json.return_value = chunks
+    assert await conversation_cache_instance.get_stream_chunks(query="test query", user_id=1) == chunks
+    assert mock_redis_client.get_json.call_args.args[0] == cache_key
+
 @pytest.mark.asyncio
 async def test_get_conversation_history_hit(conversation_cache_instance, mock_redis_client, sample_conversation_history):
     mock_redis_client.get_json.return_value = [msg.model_dump() for msg in sample_conversation_history]
@@ -214,28 +228,45 @@ async def test_invalidate_conversation_caches_by_document_id(conversation_cache_
     mock_redis_client.delete_pattern.return_value = 5
     
     deleted_count = await conversation_cache_instance.invalidate_conversation_caches(document_id=101)
-    assert deleted_count == 5
-    assert mock_redis_client.delete_pattern.call_count == 1
+    # Query results and recorded streaming responses
+    assert deleted_count == 10
+    assert mock_redis_client.delete_pattern.call_count == 2
+
+@pytest.mark.asyncio
+async def test_invalidate_documents_bulk(conversation_cache_instance, mock_redis_client):
+    mock_redis_client.delete_patterns.return_value = 10
+    
+    # Document invalidation is id-independent, so a batch costs one pass
+    deleted_count = await conversation_cache_instance.invalidate_documents_bulk([101, 102, 103])
+    assert deleted_count == 10
+    mock_redis_client.delete_patterns.assert_called_once_with([
+        f"{conversation_cache_instance.prefix_query}:*",
+        f"{conversation_cache_instance.prefix_stream}:*"
+    ])
+    
+    assert await conversation_cache_instance.invalidate_documents_bulk([]) == 0
+    mock_redis_client.delete_patterns.assert_called_once()
 
 @pytest.mark.asyncio
 async def test_invalidate_conversation_caches_all(conversation_cache_instance, mock_redis_client):
-    mock_redis_client.delete_pattern.side_effect = [10, 20, 5]
+    mock_redis_client.delete_pattern.side_effect = [10, 4, 20, 5]
     
     deleted_count = await conversation_cache_instance.invalidate_conversation_caches()
-    assert deleted_count == 35
-    assert mock_redis_client.delete_pattern.call_count == 3
+    assert deleted_count == 39
+    assert mock_redis_client.delete_pattern.call_count == 4
 
 @pytest.mark.asyncio
 async def test_get_cache_stats(conversation_cache_instance, mock_redis_client):
-    mock_redis_client.count_keys.side_effect = [10, 5, 2, 3] # Mock counts for each prefix
+    mock_redis_client.count_keys.side_effect = [10, 5, 2, 3, 4] # Mock counts for each prefix
     
     stats = await conversation_cache_instance.get_cache_stats()
     assert stats["query_results"] == 10
     assert stats["conversation_histories"] == 5
     assert stats["model_responses"] == 2
     assert stats["conversation_contexts"] == 3
-    assert stats["total_conversation_cache_size"] == 20
-    assert mock_redis_client.count_keys.call_count == 4
+    assert stats["stream_replays"] == 4
+    assert stats["total_conversation_cache_size"] == 24
+    assert mock_redis_client.count_keys.call_count == 5
 
 @pytest.mark.asyncio
 async def test_get_conversation_cache(mock_redis_client):
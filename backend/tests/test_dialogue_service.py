@@ -337,4 +337,65 @@ async def test_dialogue_service_integration(mock_dialogue_service: DialogueServi
     assert avg_search_time >= 0 # Time should be non-negative
     print(f"⚡ Average search time: {avg_search_time:.3f}s")
     
-    print("\n🎉 All tests completed!")
\ No newline at end of file
+    print("\n🎉 All tests completed!")
+
+@pytest.mark.asyncio
+async def test_process_query_coalesces_identical_concurrent_queries():
+    """Identical concurrent queries share one pipeline run."""
+    calls = 0
+
+    async def slow_pipeline(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"response": "shared answer", "citations": []}
+
+    with patch.object(dialogue_service, "_run_query_pipeline", side_effect=slow_pipeline):
+        results = await asyncio.gather(*(
+            dialogue_service.process_query(query="What is FastAPI?", user_id=1)
+            for _ in range(5)
+        ))
+        # A different query is not coalesced with the first batch
+        await dialogue_service.process_query(query="Another question", user_id=1)
+
+    assert calls == 2
+    assert all(result["response"] == "shared answer" for result in results)
+
+
+@pytest.mark.asyncio
+async def test_process_query_coalesced_error_propagates_to_all_callers():
+    """A failing pipeline fails every joined caller and is not kept in flight."""
+    async def failing_pipeline(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        raise Exception("Failed to process query: LLM down")
+
+    with patch.object(dialogue_service, "_run_query_pipeline", side_effect=failing_pipeline):
+        results = await asyncio.gather(
+            *(dialogue_service.process_query(query="boom") for _ in range(3)),
+            return_exceptions=True
+        )
+
+    assert all(isinstance(result, Exception) for result in results)
+    from backend.services.dialogue_service import _INFLIGHT
+    assert not _INFLIGHT
+
+
+@pytest.mark.asyncio
+async def test_process_query_stream_emits_phase_and_ttft():
+    """Retrieval completion is signalled and the first token carries ttft_ms."""
+    async def fake_stream(*args, **kwargs):
+        yield "Hello"
+        yield " world"
+
+    with patch.object(dialogue_service, "search_relevant_fragments", AsyncMock(return_value=["fragment"])), \
+         patch.object(dialogue_service, "generate_context_from_fragments", AsyncMock(return_value=("context", []))), \
+         patch.object(dialogue_service, "prepare_dialogue_prompt", AsyncMock(return_value="prompt")), \
+         patch.object(dialogue_service.llm_service, "stream_generate_response", side_effect=fake_stream):
+        chunks = [chunk async for chunk in dialogue_service.process_query_stream(query="hi")]
+
+    types = [chunk["type"] for chunk in chunks]
+    assert types.index("phase") < types.index("chunk")
+    token_chunks = [chunk for chunk in chunks if chunk["type"] == "chunk"]
+    assert token_chunks[0]["ttft_ms"] >= 0
+    assert "ttft_ms" not in token_chunks[1]
+    assert chunks[-1]["response"] == "Hello world"
@@ -52,13 +52,13 @@ def sample_document_model():
 @pytest.mark.asyncio
 async def test_make_list_cache_key(document_cache_instance):
     key = document_cache_instance._make_list_cache_key(user_id=1, search="test")
-    assert key.startswith("docs:list:1:")
-    assert len(key) > len("docs:list:1:")
+    assert key.startswith("docs:list:{u:1}:")
+    assert len(key) > len("docs:list:{u:1}:")
 
 @pytest.mark.asyncio
 async def test_make_stats_cache_key(document_cache_instance):
     key = document_cache_instance._make_stats_cache_key(user_id=1)
-    assert key == "docs:stats:1"
+    assert key == "docs:stats:{u:1}"
 
 @pytest.mark.asyncio
 async def test_serialize_document(document_cache_instance, sample_document_model):
@@ -181,7 +181,7 @@ async def test_invalidate_user_list_cache(document_cache_instance, mock_redis_cl
     
     deleted_count = await document_cache_instance.invalidate_user_list_cache(123)
     assert deleted_count == 5
-    mock_redis_client.delete_pattern.assert_called_once_with(f"docs:list:123:*")
+    mock_redis_client.delete_pattern.assert_called_once_with("docs:list:{u:123}:*")
 
 @pytest.mark.asyncio
 async def test_invalidate_user_caches(document_cache_instance, mock_redis_client):
@@ -191,7 +191,7 @@ async def test_invalidate_user_caches(document_cache_instance, mock_redis_client
     results = await document_cache_instance.invalidate_user_caches(123)
     assert results["document_lists"] == 3
     assert results["document_stats"] == 1
-    mock_redis_client.delete_pattern.assert_called_once_with(f"docs:list:123:*")
+    mock_redis_client.delete_pattern.assert_called_once_with("docs:list:{u:123}:*")
     mock_redis_client.delete.assert_called_once_with(document_cache_instance._make_stats_cache_key(123))
 
 @pytest.mark.asyncio
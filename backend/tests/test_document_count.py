@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.database import Base
+import backend.models  # noqa: F401  (register all tables)
+from backend.models.user import User
+from backend.models.document import Document, DOCUMENT_STATUS_READY, DOCUMENT_STATUS_DELETED
+from backend.routers import documents
+from backend.services.document_cache import document_cache
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user_with_documents(db):
+    user = User(username="u", email="u@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    for i in range(3):
+        db.add(Document(
+            title=f"d{i}", original_filename="f.pdf", file_path="p", file_size=10, file_hash=f"h{i}",
+            mime_type="application/pdf", document_type="PDF", status=DOCUMENT_STATUS_READY, owner_id=user.id
+        ))
+    db.commit()
+    return user
+
+
+def _list_total(db, user_id, exact_count=False):
+    query = document_cache.filtered_list_query(db, user_id)
+    return document_cache.list_total_count(db, user_id, query, filtered=False, exact_count=exact_count)
+
+
+def test_soft_delete_excluded_from_list_total(db, user_with_documents):
+    """Soft-deleted documents leave the owner's counter, matching the exact count."""
+    user_id = user_with_documents.id
+    doc_ids = [doc_id for (doc_id,) in db.query(Document.id).order_by(Document.id)]
+    assert _list_total(db, user_id) == 3
+
+    asyncio.run(documents.delete_document(doc_ids[0], db, user_id, permanent=False))
+    assert _list_total(db, user_id) == _list_total(db, user_id, exact_count=True) == 2
+
+    # Hard-deleting an already soft-deleted document leaves the counter alone
+    asyncio.run(documents.delete_document(doc_ids[0], db, user_id, permanent=True))
+    assert _list_total(db, user_id) == 2
+
+    # Bulk soft delete skips documents that are already deleted
+    asyncio.run(documents.bulk_delete_documents(doc_ids[1:], db, user_id, permanent=False))
+    asyncio.run(documents.bulk_delete_documents(doc_ids[1:], db, user_id, permanent=True))
+    assert _list_total(db, user_id) == _list_total(db, user_id, exact_count=True) == 0
+
+
+def test_orm_status_change_adjusts_counter(db, user_with_documents):
+    """ORM status changes into and out of DELETED move the counter."""
+    user_id = user_with_documents.id
+    document = db.query(Document).first()
+
+    document.status = DOCUMENT_STATUS_DELETED
+    db.commit()
+    assert _list_total(db, user_id) == 2
+
+    document.status = DOCUMENT_STATUS_READY
+    db.commit()
+    assert _list_total(db, user_id) == 3
@@ -0,0 +1,83 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.database import Base
+import backend.models  # noqa: F401  (register all tables)
+from backend.models.user import User
+from backend.models.document import Document, DOCUMENT_STATUS_READY
+from backend.routers import documents
+from backend.schemas.document import DocumentUpdateRequest
+from backend.services.document_cache import document_cache
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_update_invalidates_lists_sorted_by_updated_at(db):
+    """An edit drops lists sorted by updated_at even when they did not hold the document."""
+    user = User(username="u", email="u@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    document = Document(
+        title="old", original_filename="f.pdf", file_path="p", file_size=10, file_hash="h",
+        mime_type="application/pdf", document_type="PDF", status=DOCUMENT_STATUS_READY, owner_id=user.id
+    )
+    db.add(document)
+    db.commit()
+
+    # A list sorted by updated_at is indexed under that column
+    assert 'updated_at' in document_cache._list_dependency_columns(None, None, None, None, 'updated_at')
+
+    with patch.object(document_cache, "invalidate_lists_for_change", AsyncMock(return_value=0)) as invalidate, \
+         patch.object(document_cache, "invalidate_document_cache", AsyncMock(return_value=True)), \
+         patch.object(documents, "get_conversation_cache") as get_conversation_cache:
+        get_conversation_cache.return_value.invalidate_conversation_caches = AsyncMock(return_value=0)
+        response = asyncio.run(documents.update_document(
+            document.id, DocumentUpdateRequest(title="new"), db, user.id, {}
+        ))
+
+    # Built from the RETURNING row, read by key
+    assert response.id == document.id
+    assert response.title == "new"
+    assert response.file_size_display == "10 B"
+    _, document_ids, columns = invalidate.call_args.args
+    assert document_ids == [document.id]
+    assert set(columns) == {'title', 'updated_at'}
+
+
+def test_document_list_keeps_cached_timestamps_as_strings(db):
+    """List entries come back in cached form on a miss and a hit, with no datetime parsing."""
+    user = User(username="u", email="u@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.add(Document(
+        title="d", original_filename="f.pdf", file_path="p", file_size=10, file_hash="h",
+        mime_type="application/pdf", document_type="PDF", status=DOCUMENT_STATUS_READY, owner_id=user.id
+    ))
+    db.commit()
+
+    stored = {}
+    redis_client = AsyncMock()
+    redis_client.get_json.side_effect = lambda key: stored.get(key)
+    redis_client.set_json.side_effect = lambda key, value, ttl=None: stored.setdefault(key, value)
+
+    with patch.object(document_cache, "_redis_client", redis_client), \
+         patch.object(document_cache, "_index_list_entry", AsyncMock()), \
+         patch.object(document_cache, "_deserialize_document") as deserialize:
+        miss = asyncio.run(document_cache.get_document_list(db, user.id))
+        hit = asyncio.run(document_cache.get_document_list(db, user.id))
+
+    assert isinstance(miss["documents"][0]["created_at"], str)
+    assert hit["documents"] == miss["documents"]
+    deserialize.assert_not_called()
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.database import Base
+import backend.models  # noqa: F401  (register all tables)
+from backend.models.user import User
+from backend.models.document import Document, DocumentChunk
+from backend.services.hybrid_search import HybridSearchEngine
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_keyword_chunks_load_in_worker_thread(db):
+    """The chunk fetch runs off the event loop thread on its own session."""
+    user = User(username="u", email="u@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    document = Document(
+        title="d", original_filename="f.txt", file_path="p", file_size=10, file_hash="h",
+        mime_type="text/plain", document_type="TXT", status="READY", owner_id=user.id
+    )
+    db.add(document)
+    db.commit()
+    db.add(DocumentChunk(document_id=document.id, chunk_index=0, content="alpha beta", token_count=2))
+    db.commit()
+
+    engine = HybridSearchEngine()
+    load = engine._load_keyword_chunks
+    threads = []
+
+    def record_thread(*args):
+        threads.append(threading.get_ident())
+        return load(*args)
+
+    with patch.object(engine, "_load_keyword_chunks", side_effect=record_thread):
+        chunks = asyncio.run(engine._get_chunks_for_keyword_search(user.id, None, db))
+
+    assert [chunk["content"] for chunk in chunks] == ["alpha beta"]
+    assert threads and threads[0] != threading.get_ident()
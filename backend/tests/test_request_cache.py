@@ -0,0 +1,24 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.deps.request_cache import get_request_cache
+
+
+def test_request_cache_is_shared_within_a_request_only():
+    app = FastAPI()
+    loads = []
+
+    def load(cache=Depends(get_request_cache)):
+        if "value" not in cache:
+            loads.append(1)
+            cache["value"] = len(loads)
+        return cache["value"]
+
+    @app.get("/")
+    async def endpoint(first=Depends(load), cache=Depends(get_request_cache)):
+        return {"first": first, "again": load(cache)}
+
+    client = TestClient(app)
+    assert client.get("/").json() == {"first": 1, "again": 1}
+    # A new request starts with an empty cache
+    assert client.get("/").json() == {"first": 2, "again": 2}
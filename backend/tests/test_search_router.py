@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.database import get_db
+from backend.routers import search
+
+
+@pytest.fixture
+def db():
+    # Document metadata lookups return one row for document 7
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [
+        SimpleNamespace(id=7, title="Guide", document_type="PDF")
+    ]
+    return session
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(search.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_semantic_search_queries_qdrant_with_cached_embedding(client):
+    """A cache miss searches Qdrant once with the shared query embedding."""
+    point = SimpleNamespace(id="p1", score=0.9, payload={
+        "document_id": 7, "user_id": 1, "chunk_index": 0,
+        "content": "hello world", "token_count": 2, "chunk_type": "paragraph", "section_header": None
+    })
+    qdrant_client = MagicMock()
+    qdrant_client.query_points.return_value = SimpleNamespace(points=[point])
+    service = search.embedding_service_instance
+
+    with patch.object(search.search_cache, "get_semantic_search_response_raw", AsyncMock(return_value=(None, False))), \
+         patch.object(search.search_cache, "cache_semantic_search_response", AsyncMock(return_value=True)), \
+         patch.object(search.search_cache, "get_query_embedding", AsyncMock(return_value=[0.1, 0.2])), \
+         patch.object(service, "get_embedding", AsyncMock()) as get_embedding, \
+         patch.object(service, "qdrant_client", qdrant_client), \
+         patch.object(service, "_qdrant_client_initialized", True):
+        response = client.post("/search/semantic", json={"query": "hello", "score_threshold": 0.5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_results"] == 1
+    assert body["results"][0]["document_title"] == "Guide"
+    get_embedding.assert_not_called()
+    kwargs = qdrant_client.query_points.call_args.kwargs
+    assert kwargs["query"] == [0.1, 0.2]
+    assert kwargs["score_threshold"] == 0.5
+    # Scoped to the default user resolved from the (missing) credentials
+    assert kwargs["query_filter"].must[0].match.value == 1
+
+
+def test_search_rejects_explicit_user_id(client):
+    """The user comes from the credentials; a user_id parameter or body field is refused."""
+    assert client.post("/search/semantic?user_id=2", json={"query": "hello"}).status_code == 400
+    assert client.get("/search/compare/7?query=hello&user_id=2").status_code == 400
+    assert client.post("/search/semantic", json={"query": "hello", "user_id": 2}).status_code == 422
+    assert client.post("/search/hybrid", json={"query": "hello", "user_id": 2}).status_code == 422
+
+
+def test_document_chunks_page_and_title_lookup(client):
+    """A cache miss returns the Qdrant page with the title read on its own session."""
+    page = {"total_chunks": 1, "chunks": [{"chunk_index": 0}], "has_more": False, "next_cursor": None}
+    service = search.embedding_service_instance
+
+    with patch.object(search.search_cache, "get_document_chunks", AsyncMock(return_value=None)), \
+         patch.object(search.search_cache, "cache_document_chunks", AsyncMock(return_value=True)), \
+         patch.object(search, "_get_document_title", return_value="Guide"), \
+         patch.object(service, "get_document_chunks_page", AsyncMock(return_value=page)):
+        response = client.get("/search/documents/7/chunks")
+        assert response.status_code == 200
+        assert response.json()["document_title"] == "Guide"
+
+        with patch.object(search, "_get_document_title", return_value=None):
+            assert client.get("/search/documents/8/chunks").status_code == 404
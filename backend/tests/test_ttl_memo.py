@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from backend.utils.ttl_memo import async_ttl_cache
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_serves_from_memory_within_ttl():
+    """Repeated calls inside the TTL hit the wrapped function once."""
+    backend_call = AsyncMock(return_value={"status": "success"})
+
+    @async_ttl_cache(ttl=60)
+    async def stats():
+        return await backend_call()
+
+    assert await stats() == {"status": "success"}
+    assert await stats() == {"status": "success"}
+    assert backend_call.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_expires():
+    """Entries are recomputed once the TTL has elapsed."""
+    backend_call = AsyncMock(side_effect=[1, 2])
+
+    @async_ttl_cache(ttl=0)
+    async def stats():
+        return await backend_call()
+
+    assert await stats() == 1
+    assert await stats() == 2
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_keys_by_arguments():
+    """Different arguments, including list query params, get separate entries."""
+    backend_call = AsyncMock(side_effect=lambda patterns: len(patterns))
+
+    @async_ttl_cache(ttl=60)
+    async def analyze(patterns):
+        return await backend_call(patterns)
+
+    assert await analyze(patterns=["doc:*"]) == 1
+    assert await analyze(patterns=["doc:*", "search:*"]) == 2
+    assert await analyze(patterns=["doc:*"]) == 1
+    assert backend_call.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_coalesces_concurrent_callers():
+    """Concurrent callers share one in-flight computation."""
+    calls = 0
+
+    @async_ttl_cache(ttl=60)
+    async def slow_stats():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(slow_stats() for _ in range(5)))
+    assert results == [1] * 5
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_async_ttl_cache_does_not_cache_exceptions():
+    """Failures propagate and the next call retries."""
+    backend_call = AsyncMock(side_effect=[RuntimeError("redis down"), "ok"])
+
+    @async_ttl_cache(ttl=60)
+    async def stats():
+        return await backend_call()
+
+    with pytest.raises(RuntimeError):
+        await stats()
+    assert await stats() == "ok"
+    stats.cache_clear()
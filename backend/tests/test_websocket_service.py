@@ -1,8 +1,10 @@
 import pytest
 import json
+import orjson
 from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
 from fastapi import WebSocket, WebSocketDisconnect
-from backend.services.websocket_service import WebSocketManager, ProgressType
+from backend.services.websocket_service import WebSocketManager, ProgressType, PROGRESS_CHANNEL
 
 @pytest.fixture
 def websocket_manager():
@@ -82,7 +84,7 @@ async def test_send_personal_message_success(websocket_manager, mock_websocket):
     """Test sending a personal message successfully."""
     message = {"test": "message"}
     await websocket_manager.send_personal_message(message, mock_websocket)
-    mock_websocket.send_text.assert_called_once_with(json.dumps(message))
+    mock_websocket.send_text.assert_called_once_with(orjson.dumps(message).decode())
 
 @pytest.mark.asyncio
 async def test_send_personal_message_exception(websocket_manager, mock_websocket, capsys):
@@ -101,7 +103,43 @@ async def test_send_message_to_user_single_connection(websocket_manager, mock_we
     websocket_manager.active_connections[user_id] = [mock_websocket]
     
     await websocket_manager.send_message_to_user(message, user_id)
-    mock_websocket.send_text.assert_called_once_with(json.dumps(message))
+    mock_websocket.send_text.assert_called_once_with(orjson.dumps(message).decode())
+
+@pytest.mark.asyncio
+async def test_send_message_to_user_via_relay(websocket_manager, mock_websocket):
+    """Test that a relay publishes messages instead of sending them locally."""
+    user_id = 1
+    message = {"data": "hello"}
+    websocket_manager.active_connections[user_id] = [mock_websocket]
+    websocket_manager.relay = AsyncMock()
+    
+    await websocket_manager.send_message_to_user(message, user_id)
+    
+    mock_websocket.send_text.assert_not_called()
+    channel, payload = websocket_manager.relay.publish.call_args.args
+    assert channel == PROGRESS_CHANNEL
+    assert json.loads(payload) == {"user_id": user_id, "message": message}
+
+@pytest.mark.asyncio
+async def test_listen_for_progress_delivers_locally(websocket_manager, mock_websocket):
+    """Test that relayed progress reaches this process's connections."""
+    user_id = 1
+    message = {"data": "hello"}
+    websocket_manager.active_connections[user_id] = [mock_websocket]
+    delivered = asyncio.Event()
+    mock_websocket.send_text.side_effect = lambda text: delivered.set()
+    
+    async def listen(channel):
+        yield json.dumps({"user_id": user_id, "message": message})
+        await asyncio.Event().wait()
+    
+    redis_client = MagicMock()
+    redis_client.listen = listen
+    listener = asyncio.create_task(websocket_manager.listen_for_progress(redis_client))
+    await asyncio.wait_for(delivered.wait(), timeout=1)
+    listener.cancel()
+    
+    mock_websocket.send_text.assert_called_once_with(orjson.dumps(message).decode())
 
 @pytest.mark.asyncio
 async def test_send_message_to_user_multiple_connections(websocket_manager, mock_websocket):
@@ -112,8 +150,8 @@ async def test_send_message_to_user_multiple_connections(websocket_manager, mock
     websocket_manager.active_connections[user_id] = [mock_websocket, mock_websocket_2]
     
     await websocket_manager.send_message_to_user(message, user_id)
-    mock_websocket.send_text.assert_called_once_with(json.dumps(message))
-    mock_websocket_2.send_text.assert_called_once_with(json.dumps(message))
+    mock_websocket.send_text.assert_called_once_with(orjson.dumps(message).decode())
+    mock_websocket_2.send_text.assert_called_once_with(orjson.dumps(message).decode())
 
 @pytest.mark.asyncio
 async def test_send_message_to_user_handles_disconnected(websocket_manager, mock_websocket):
@@ -156,6 +194,41 @@ async def test_send_upload_progress(websocket_manager, mock_websocket):
     assert sent_message["total_bytes"] == total_bytes
     assert sent_message["timestamp"] == 12345.67
 
+@pytest.mark.asyncio
+async def test_send_upload_progress_coalesces_updates(websocket_manager, mock_websocket):
+    """Test that rapid upload updates are held back and only the latest is flushed."""
+    user_id = 1
+    document_id = 101
+    websocket_manager.active_connections[user_id] = [mock_websocket]
+    
+    for progress_percent in range(10, 20):
+        await websocket_manager.send_upload_progress(user_id, document_id, progress_percent, "Uploading")
+    assert mock_websocket.send_text.call_count == 1
+    
+    await websocket_manager._flush_task
+    assert mock_websocket.send_text.call_count == 2
+    sent_message = json.loads(mock_websocket.send_text.call_args[0][0])
+    assert sent_message["progress_percent"] == 19
+    
+    # Completion is never held back
+    await websocket_manager.send_upload_progress(user_id, document_id, 100, "Upload completed")
+    assert mock_websocket.send_text.call_count == 3
+    assert not websocket_manager._upload_progress_sent
+
+@pytest.mark.asyncio
+async def test_send_upload_progress_without_document_id_is_not_coalesced(websocket_manager, mock_websocket):
+    """Test that updates for uploads without a document yet are always sent."""
+    user_id = 1
+    websocket_manager.active_connections[user_id] = [mock_websocket]
+    
+    # Two concurrent uploads both report document_id 0
+    await websocket_manager.send_upload_progress(user_id, 0, 10, "Uploading a.pdf")
+    await websocket_manager.send_upload_progress(user_id, 0, 11, "Uploading b.pdf")
+    assert mock_websocket.send_text.call_count == 2
+    assert not websocket_manager._upload_progress_sent
+    assert not websocket_manager._pending_upload_progress
+    assert websocket_manager._flush_task is None
+
 @pytest.mark.asyncio
 async def test_send_processing_progress(websocket_manager, mock_websocket):
     """Test sending processing progress messages."""
@@ -0,0 +1,26 @@
+"""
+Coarse wall-clock timestamps for API responses.
+
+Response payloads only need a human-readable "timestamp" field, so the ISO
+string is rebuilt at most every ``ISO_RESOLUTION`` seconds instead of
+constructing a new datetime for every response.
+"""
+
+import time
+from datetime import datetime
+
+# Resolution of the cached timestamp in seconds
+ISO_RESOLUTION = 0.1
+
+_last_refresh = float("-inf")
+_cached_iso = ""
+
+
+def now_iso() -> str:
+    """Current UTC time as an ISO 8601 string, accurate to ``ISO_RESOLUTION``."""
+    global _last_refresh, _cached_iso
+    t = time.monotonic()
+    if t - _last_refresh > ISO_RESOLUTION:
+        _last_refresh = t
+        _cached_iso = datetime.utcnow().isoformat()
+    return _cached_iso
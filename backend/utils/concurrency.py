@@ -0,0 +1,44 @@
+"""
+Bounded fan-out for independent async probes.
+
+Health and stats endpoints query several backends at once. Running them
+through a semaphore-bounded TaskGroup caps how hard a degraded backend gets
+hit by concurrent dashboards, and cancelling the request (e.g. the client
+disconnects) cancels every probe still in flight.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+# Default maximum number of probes running at the same time
+DEFAULT_FANOUT_LIMIT = 8
+
+
+async def bounded_gather(
+    *factories: Callable[[], Awaitable[Any]],
+    limit: int = DEFAULT_FANOUT_LIMIT,
+    timeout: Optional[float] = None,
+) -> List[Any]:
+    """
+    Run the given coroutine factories with at most ``limit`` in flight.
+    
+    Results are returned in the order of ``factories``. Like
+    ``asyncio.gather(..., return_exceptions=True)``, a failing or timed-out
+    probe yields its exception instead of aborting the others; cancellation
+    of the caller still propagates to all pending probes.
+    """
+    sem = asyncio.Semaphore(limit)
+    
+    async def guarded(factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with sem:
+            try:
+                if timeout is None:
+                    return await factory()
+                return await asyncio.wait_for(factory(), timeout)
+            except Exception as e:
+                return e
+    
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(guarded(factory)) for factory in factories]
+    
+    return [task.result() for task in tasks]
@@ -0,0 +1,16 @@
+"""
+Human-readable formatting shared by the API layer and write paths.
+"""
+
+# (unit, power-of-two shift) indexed by (bit_length - 1) // 10
+_SIZE_UNITS = (("B", 0), ("KB", 10), ("MB", 20), ("GB", 30))
+
+
+def format_file_size(size_bytes: int) -> str:
+    """Format a byte count as B/KB/MB/GB."""
+    # The unit follows from the bit length: no float division or comparison ladder
+    index = min(3, max(0, (size_bytes.bit_length() - 1) // 10))
+    unit, shift = _SIZE_UNITS[index]
+    if index == 0:
+        return f"{size_bytes} B"
+    return f"{size_bytes / (1 << shift):.1f} {unit}"
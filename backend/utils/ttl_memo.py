@@ -0,0 +1,63 @@
+"""
+In-process TTL memoization for async callables.
+
+Used for read-mostly endpoints (cache dashboards, server info) that are polled
+every few seconds: results are served from memory for a short TTL, and
+concurrent callers for the same key share a single in-flight computation.
+"""
+
+import asyncio
+import functools
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn list/dict/set arguments (e.g. query params) into hashable keys."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def async_ttl_cache(ttl: float = 2.0) -> Callable:
+    """
+    Memoize an async function's result for `ttl` seconds.
+    
+    Entries are keyed by function name and arguments. Exceptions are never
+    cached. The wrapper exposes `cache_clear()` for tests and manual resets.
+    """
+    def decorator(func: Callable) -> Callable:
+        entries: Dict[Hashable, Tuple[float, Any]] = {}
+        locks: Dict[Hashable, asyncio.Lock] = {}
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (func.__qualname__, _freeze(args), _freeze(kwargs))
+
+            entry = entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            lock = locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                # Another caller may have refreshed the entry while we waited
+                entry = entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    return entry[1]
+
+                value = await func(*args, **kwargs)
+                entries[key] = (time.monotonic() + ttl, value)
+                return value
+
+        def cache_clear() -> None:
+            entries.clear()
+            locks.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator